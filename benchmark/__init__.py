@@ -0,0 +1 @@
+# Pacote benchmark - Scripts de medição de desempenho do projeto
@@ -0,0 +1,174 @@
+"""
+Teste de carga: latência das rotas com tráfego misto
+
+Dispara requisições concorrentes (páginas públicas, login e painel do
+personal) contra a aplicação em processo, sobre uma cópia temporária do
+banco, e mede p50/p95/p99. Uma fração das requisições de /planos simula
+uma consulta lenta (--lenta-ms), para mostrar o efeito de uma query lenta
+sobre as demais requisições do mesmo worker.
+
+O cenário roda duas vezes: com os repositórios chamados direto no event
+loop (comportamento antigo) e com a camada assíncrona de data.repo_async.
+
+Requer httpx (pip install httpx).
+
+Uso:
+    python -m benchmark.bench_async_latency --requisicoes 400 --concorrencia 20
+"""
+import argparse
+import asyncio
+import contextvars
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+SENHA = "bench123"
+
+ROTAS_PUBLICAS = ["/", "/planos", "/pagamento?plano_id=2", "/login", "/sobre"]
+ROTAS_PERSONAL = ["/personal/dashboard", "/personal/alunos", "/personal/treinos",
+                  "/personal/avaliacoes", "/personal/progressos"]
+
+
+def _preparar_banco(origem: str, destino: str) -> str:
+    """Copia o banco e define uma senha conhecida para um profissional"""
+    from util.security import criar_hash_senha
+
+    shutil.copy(origem, destino)
+    conn = sqlite3.connect(destino)
+    linha = conn.execute(
+        "SELECT email FROM usuario WHERE perfil = 'profissional' ORDER BY id LIMIT 1"
+    ).fetchone()
+    if not linha:
+        conn.close()
+        raise SystemExit("O banco de origem não tem nenhum usuário profissional")
+    conn.execute("UPDATE usuario SET senha = ? WHERE email = ?", (criar_hash_senha(SENHA), linha[0]))
+    conn.commit()
+    conn.close()
+    return linha[0]
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def _executar_cenario(app, email: str, requisicoes: int, concorrencia: int) -> dict:
+    import httpx
+
+    transporte = httpx.ASGITransport(app=app)
+    latencias = {"publica": [], "personal": [], "lenta": []}
+    erros = 0
+
+    # O startup aplica as migrações (tabela sessao do login) e o shutdown fecha os pools
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transporte, base_url="http://bench") as personal:
+        await personal.post("/login_profissional", data={"email": email, "senha": SENHA})
+
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as anonimo:
+            fila = asyncio.Queue()
+            for i in range(requisicoes):
+                fila.put_nowait(i)
+
+            async def trabalhador():
+                nonlocal erros
+                while not fila.empty():
+                    i = fila.get_nowait()
+                    if i % 10 == 0:
+                        tipo, cliente, rota = "lenta", anonimo, "/planos"
+                    elif i % 2 == 0:
+                        tipo, cliente, rota = "personal", personal, ROTAS_PERSONAL[i % len(ROTAS_PERSONAL)]
+                    else:
+                        tipo, cliente, rota = "publica", anonimo, ROTAS_PUBLICAS[i % len(ROTAS_PUBLICAS)]
+                    inicio = time.perf_counter()
+                    resposta = await cliente.get(rota, headers={"X-Bench-Lenta": "1" if tipo == "lenta" else "0"})
+                    latencias[tipo].append((time.perf_counter() - inicio) * 1000)
+                    if resposta.status_code >= 400:
+                        erros += 1
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+            duracao = time.perf_counter() - inicio
+
+    rapidas = latencias["publica"] + latencias["personal"]
+    return {
+        "req_s": requisicoes / duracao,
+        "p50": statistics.median(rapidas),
+        "p95": _percentil(rapidas, 95),
+        "p99": _percentil(rapidas, 99),
+        "p99_lenta": _percentil(latencias["lenta"], 99) if latencias["lenta"] else 0.0,
+        "erros": erros,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência das rotas sob tráfego misto")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem da cópia")
+    parser.add_argument("--requisicoes", type=int, default=400)
+    parser.add_argument("--concorrencia", type=int, default=20)
+    parser.add_argument("--lenta-ms", type=float, default=50, help="Atraso da consulta lenta simulada")
+    args = parser.parse_args()
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise SystemExit("Este teste de carga requer httpx: pip install httpx")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "bench.db")
+        origem = os.path.abspath(args.banco)
+        os.environ["DB_PATH"] = caminho
+        os.environ.setdefault("LOG_NIVEL", "WARNING")
+        sys.path.insert(0, os.getcwd())
+        email = _preparar_banco(origem, caminho)
+
+        import util.db_async as db_async
+        from data.repo import plano_repo
+        from main import app
+
+        # Consulta lenta simulada: bloqueia a thread que a executa
+        obter_todos_original = plano_repo.obter_todos
+        lenta = contextvars.ContextVar("lenta", default=False)
+
+        def obter_todos_lento():
+            if lenta.get():
+                time.sleep(args.lenta_ms / 1000)
+            return obter_todos_original()
+
+        plano_repo.obter_todos = obter_todos_lento
+
+        @app.middleware("http")
+        async def marcar_lenta(request, call_next):
+            lenta.set(request.headers.get("X-Bench-Lenta") == "1")
+            return await call_next(request)
+
+        executar_original = db_async.executar
+
+        async def executar_no_loop(funcao, *a, **kw):
+            return funcao(*a, **kw)
+
+        cenarios = [
+            ("Repositórios no event loop", executar_no_loop),
+            ("data.repo_async (pool de threads)", executar_original),
+        ]
+        print(f"Requisições: {args.requisicoes} | Concorrência: {args.concorrencia} | "
+              f"Consulta lenta: {args.lenta_ms:.0f} ms em 10% das requisições")
+        for nome, executar in cenarios:
+            db_async.executar = executar
+            r = asyncio.run(_executar_cenario(app, email, args.requisicoes, args.concorrencia))
+            print(f"{nome:35} {r['req_s']:7.1f} req/s  p50={r['p50']:7.1f}ms  "
+                  f"p95={r['p95']:7.1f}ms  p99={r['p99']:7.1f}ms  "
+                  f"(lentas p99={r['p99_lenta']:.1f}ms, erros={r['erros']})")
+        db_async.executar = executar_original
+        db_async.encerrar_executor()
+
+        from util.db_util import fechar_conexoes
+        fechar_conexoes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Teste de carga: hashing de senhas (bcrypt) no pool de senhas
+
+1. Escalonamento: verifica --verificacoes senhas com o pool de senhas
+   configurado com 1, 2, 4... threads até o número de núcleos. Como o
+   bcrypt libera o GIL, a vazão deve crescer com os núcleos.
+2. Rajada de logins: dispara logins concorrentes contra a aplicação em
+   processo (cópia temporária do banco) enquanto outro cliente acessa uma
+   página pública, e mede a latência dessa página. Roda com o bcrypt no
+   event loop (comportamento antigo) e com o pool, e conta as respostas
+   503 quando a fila do pool enche.
+
+Requer httpx (pip install httpx).
+
+Uso:
+    python -m benchmark.bench_login --verificacoes 64 --logins 40
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+SENHA = "bench123"
+
+
+def _preparar_banco(origem: str, destino: str) -> str:
+    """Copia o banco e define uma senha conhecida para um cliente"""
+    from util.security import criar_hash_senha
+
+    shutil.copy(origem, destino)
+    conn = sqlite3.connect(destino)
+    linha = conn.execute("SELECT email FROM usuario WHERE perfil = 'cliente' ORDER BY id LIMIT 1").fetchone()
+    if not linha:
+        conn.close()
+        raise SystemExit("O banco de origem não tem nenhum cliente")
+    conn.execute("UPDATE usuario SET senha = ? WHERE email = ?", (criar_hash_senha(SENHA), linha[0]))
+    conn.commit()
+    conn.close()
+    return linha[0]
+
+
+def _configurar_pool(threads: int, fila_maxima: int) -> None:
+    from util import security
+
+    security.encerrar_executor_senha()
+    security.SENHA_THREADS = threads
+    security.SENHA_FILA_MAXIMA = fila_maxima
+
+
+async def _medir_vazao(verificacoes: int) -> float:
+    from util.security import criar_hash_senha, verificar_senha_async
+
+    senha_hash = criar_hash_senha(SENHA)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(verificar_senha_async(SENHA, senha_hash) for _ in range(verificacoes)))
+    return verificacoes / (time.perf_counter() - inicio)
+
+
+async def _rajada_logins(app, email: str, logins: int) -> dict:
+    import httpx
+
+    transporte = httpx.ASGITransport(app=app)
+    status = []
+    latencias_pagina = []
+
+    # O startup aplica as migrações (tabela sessao do login) e o shutdown fecha os pools
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        async def login():
+            resposta = await cliente.post("/login_cliente", data={"email": email, "senha": SENHA})
+            status.append(resposta.status_code)
+
+        async def sondar(terminou: asyncio.Event):
+            # A latência conta a partir do horário agendado (a cada 20 ms), então
+            # o tempo em que o event loop ficou bloqueado também entra na medida
+            agendado = time.perf_counter()
+            while not terminou.is_set():
+                await asyncio.sleep(max(0.0, agendado - time.perf_counter()))
+                await cliente.get("/sobre")
+                latencias_pagina.append((time.perf_counter() - agendado) * 1000)
+                agendado += 0.02
+
+        terminou = asyncio.Event()
+        sonda = asyncio.create_task(sondar(terminou))
+        await asyncio.sleep(0)
+        inicio = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        duracao = time.perf_counter() - inicio
+        terminou.set()
+        await sonda
+
+    latencias_pagina.sort()
+    return {
+        "logins_s": logins / duracao,
+        "ok": sum(1 for s in status if s < 400),
+        "recusados": status.count(503),
+        "pagina_p50": statistics.median(latencias_pagina),
+        "pagina_p99": latencias_pagina[min(len(latencias_pagina) - 1, int(len(latencias_pagina) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão do bcrypt e logins em rajada")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem da cópia")
+    parser.add_argument("--verificacoes", type=int, default=64)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--fila", type=int, default=16, help="SENHA_FILA_MAXIMA na rajada de logins")
+    args = parser.parse_args()
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise SystemExit("Este teste de carga requer httpx: pip install httpx")
+
+    nucleos = os.cpu_count() or 1
+    print(f"Núcleos: {nucleos}")
+    threads = 1
+    while True:
+        _configurar_pool(threads, args.verificacoes)
+        vazao = asyncio.run(_medir_vazao(args.verificacoes))
+        print(f"  {threads:2} thread(s): {vazao:7.1f} verificações/s")
+        if threads >= nucleos:
+            break
+        threads = min(threads * 2, nucleos)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "bench.db")
+        os.environ["DB_PATH"] = caminho
+        os.environ.setdefault("LOG_NIVEL", "WARNING")
+        sys.path.insert(0, os.getcwd())
+        email = _preparar_banco(os.path.abspath(args.banco), caminho)
+
+        from main import app
+        from util import security
+
+        # routes/__init__.py reexporta a função de mesmo nome; o módulo vem de sys.modules
+        register_auth_routes = sys.modules["routes.register_auth_routes"]
+
+        verificar_no_pool = register_auth_routes.verificar_senha_async
+
+        async def verificar_no_loop(senha_plana, senha_hash):
+            return security.verificar_senha(senha_plana, senha_hash)
+
+        cenarios = [
+            ("bcrypt no event loop", verificar_no_loop, args.logins),
+            ("Pool de senhas", verificar_no_pool, args.logins),
+            (f"Pool de senhas (fila de {args.fila})", verificar_no_pool, args.fila),
+        ]
+        print(f"\nRajada de {args.logins} logins com /sobre sendo acessada em paralelo")
+        for nome, verificar, fila in cenarios:
+            _configurar_pool(nucleos, fila)
+            register_auth_routes.verificar_senha_async = verificar
+            r = asyncio.run(_rajada_logins(app, email, args.logins))
+            print(f"{nome:32} {r['logins_s']:6.1f} logins/s  ok={r['ok']:3}  503={r['recusados']:3}  "
+                  f"/sobre p50={r['pagina_p50']:6.1f}ms p99={r['pagina_p99']:7.1f}ms")
+        register_auth_routes.verificar_senha_async = verificar_no_pool
+        security.encerrar_executor_senha()
+
+        from util.db_util import fechar_conexoes
+        fechar_conexoes()
+
+
+if __name__ == "__main__":
+    main()
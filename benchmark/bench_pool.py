@@ -0,0 +1,84 @@
+"""
+Benchmark do pool de conexões
+
+Compara consultas por segundo abrindo uma conexão nova a cada consulta
+(comportamento antigo de get_connection) com o pool de util.db_util.
+Roda sobre uma cópia temporária do banco para não alterar dados.db.
+
+Uso:
+    python -m benchmark.bench_pool --consultas 5000 --threads 4
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+CONSULTA = "SELECT id, nome, email, perfil FROM usuario WHERE id = ?"
+
+
+def _executar_em_threads(funcao, consultas: int, threads: int) -> float:
+    por_thread = consultas // threads
+    trabalhadores = [
+        threading.Thread(target=funcao, args=(por_thread,)) for _ in range(threads)
+    ]
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    return (por_thread * threads) / (time.perf_counter() - inicio)
+
+
+def medir_sem_pool(caminho: str, consultas: int, threads: int) -> float:
+    def trabalho(n):
+        for i in range(n):
+            conn = sqlite3.connect(caminho)
+            conn.row_factory = sqlite3.Row
+            with conn:
+                conn.execute(CONSULTA, (i % 50 + 1,)).fetchone()
+            conn.close()
+    return _executar_em_threads(trabalho, consultas, threads)
+
+
+def medir_com_pool(caminho: str, consultas: int, threads: int) -> float:
+    from util.db_util import PoolConexoes
+
+    pool = PoolConexoes(caminho, tamanho=threads)
+
+    def trabalho(n):
+        for i in range(n):
+            with pool.conexao() as conn:
+                conn.execute(CONSULTA, (i % 50 + 1,)).fetchone()
+
+    try:
+        return _executar_em_threads(trabalho, consultas, threads)
+    finally:
+        pool.fechar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pool de conexões SQLite")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem da cópia")
+    parser.add_argument("--consultas", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "bench.db")
+        shutil.copy(args.banco, caminho)
+
+        antes = medir_sem_pool(caminho, args.consultas, args.threads)
+        depois = medir_com_pool(caminho, args.consultas, args.threads)
+
+    print(f"Consultas: {args.consultas} | Threads: {args.threads}")
+    print(f"Sem pool: {antes:10.0f} consultas/s")
+    print(f"Com pool: {depois:10.0f} consultas/s")
+    print(f"Ganho:    {depois / antes:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Teste de carga: latência das primeiras páginas de um processo novo (templates)
+
+Cada rodada sobe um processo Python novo, importa a aplicação e mede o
+tempo da primeira requisição a algumas páginas públicas, em três cenários:
+
+1. Sem bytecode em disco: cada template é compilado na primeira vez que
+   uma página o usa.
+2. Bytecode em disco (TEMPLATES_CACHE_DIR) de uma execução anterior.
+3. Bytecode em disco + pré-compilação no startup (precompilar_templates):
+   o custo sai das requisições e vai para o startup.
+
+Requer httpx (pip install httpx).
+
+Uso:
+    python -m benchmark.bench_templates --repeticoes 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGINAS = ["/", "/planos", "/sobre", "/login", "/cadastro_cliente", "/cadastro_profissional"]
+
+
+def _filho(precompilar: bool) -> None:
+    """Executado no processo novo: importa a aplicação e mede as primeiras requisições"""
+    inicio = time.perf_counter()
+    from fastapi.testclient import TestClient
+    from main import app
+    from util.template_util import precompilar_templates
+    importacao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    if precompilar:
+        precompilar_templates()
+    startup = time.perf_counter() - inicio
+
+    # Sem o "with": os eventos de startup (migrações, worker de email) não rodam
+    cliente = TestClient(app)
+    primeiras = {}
+    for pagina in PAGINAS:
+        inicio = time.perf_counter()
+        resposta = cliente.get(pagina)
+        primeiras[pagina] = (time.perf_counter() - inicio) * 1000
+        if resposta.status_code != 200:
+            raise SystemExit(f"{pagina} respondeu {resposta.status_code}")
+    inicio = time.perf_counter()
+    cliente.get(PAGINAS[0])
+    quente = (time.perf_counter() - inicio) * 1000
+
+    print(json.dumps({
+        "importacao": importacao * 1000,
+        "startup": startup * 1000,
+        "primeiras": primeiras,
+        "quente": quente,
+    }))
+
+
+def _rodar(ambiente: dict, precompilar: bool) -> dict:
+    comando = [sys.executable, "-m", "benchmark.bench_templates", "--filho"]
+    if precompilar:
+        comando.append("--precompilar")
+    saida = subprocess.run(comando, env=ambiente, capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência das primeiras páginas de um processo novo")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem da cópia")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--precompilar", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        _filho(args.precompilar)
+        return
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise SystemExit("Este teste de carga requer httpx: pip install httpx")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        banco = os.path.join(tmp, "bench.db")
+        shutil.copy(args.banco, banco)
+        cache = os.path.join(tmp, "jinja")
+        base = dict(os.environ, DB_PATH=banco, PYTHONPATH=os.getcwd(), TEMPLATES_AUTO_RELOAD="false")
+
+        cenarios = [
+            ("Sem bytecode em disco", dict(base, TEMPLATES_CACHE_DIR=""), False),
+            ("Bytecode em disco", dict(base, TEMPLATES_CACHE_DIR=cache), False),
+            ("Bytecode + pré-compilação", dict(base, TEMPLATES_CACHE_DIR=cache), True),
+        ]
+        # Uma rodada para gravar o bytecode usado pelos cenários 2 e 3
+        _rodar(dict(base, TEMPLATES_CACHE_DIR=cache), True)
+
+        print(f"Primeira requisição de cada página em um processo novo (mediana de {args.repeticoes} rodadas)")
+        for nome, ambiente, precompilar in cenarios:
+            rodadas = [_rodar(ambiente, precompilar) for _ in range(args.repeticoes)]
+            startup = statistics.median(r["startup"] for r in rodadas)
+            total = statistics.median(sum(r["primeiras"].values()) for r in rodadas)
+            primeira = statistics.median(r["primeiras"][PAGINAS[0]] for r in rodadas)
+            quente = statistics.median(r["quente"] for r in rodadas)
+            print(f"{nome:28} startup={startup:6.1f}ms  primeira '/'={primeira:6.1f}ms  "
+                  f"{len(PAGINAS)} páginas={total:6.1f}ms  '/' aquecida={quente:5.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Teste de carga reprodutível das rotas (públicas, autenticação, admin e personal)
+
+Semeia uma cópia temporária do banco com uma população sintética
+(benchmark/populacao.py, determinística pela semente), ou usa a cópia de
+um banco gerado por benchmark/gerar_dados.py (--fixture), e mede cada rota
+GET dos módulos de routes/: vazão, p50/p95/p99 (no cliente) e o número
+de consultas SQL por requisição (cabeçalho X-DB-Queries). As rotas com
+sessão usam o primeiro admin e o primeiro personal da população.
+
+Modos:
+- em processo (padrão): httpx.ASGITransport sobre a aplicação, com o
+  startup/shutdown da aplicação;
+- HTTP (--workers N): sobe N workers uvicorn em uma porta local e mede
+  pela rede, como em produção com vários workers.
+
+A aplicação roda com DEBUG=False e logs em WARNING, salvo se essas
+variáveis já estiverem no ambiente.
+
+Com --baseline, o resultado é comparado a um JSON gravado antes (com os
+mesmos parâmetros) e o script termina com erro, para uso em CI, se:
+- alguma rota respondeu com status diferente de 200;
+- o número de consultas de uma rota aumentou;
+- o p95 piorou mais que --tolerancia (e mais que --folga-ms) ou a vazão
+  caiu mais que --tolerancia.
+Os tempos dependem da máquina: grave a baseline (--gravar-baseline) na
+mesma máquina do CI.
+
+Requer httpx (pip install httpx).
+
+Uso:
+    python -m benchmark.carga --requisicoes 100 --concorrencia 4
+    python -m benchmark.carga --workers 4 --baseline benchmark/baseline_carga.json
+    python -m benchmark.carga --gravar-baseline benchmark/baseline_carga.json
+    python -m benchmark.carga --fixture .cache/fixtures/grande.db --requisicoes 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmark.gerar_dados import adicionar_argumentos_populacao, ler_descricao, populacao_dos_argumentos
+from benchmark.populacao import SENHA, Populacao, obter_referencias, semear
+
+# Módulo de routes/ -> (sessão usada, caminhos); {campos} vêm das referências da população.
+# Fora da lista: rotas com efeito colateral (POST, envio de email) e as que hoje falham ao
+# renderizar: templates que não existem (/perfil, /admin/usuarios/novo e editar,
+# /personal/avaliacoes/{avaliacao_id}) e /personal/alunos/{aluno_id} (data como texto no template)
+ROTAS = {
+    "publicas": ("anonimo", [
+        "/", "/sobre", "/suporte", "/planos", "/pagamento?plano_id={plano_id}",
+    ]),
+    "auth": ("anonimo", [
+        "/login", "/login_cliente", "/login_profissional", "/login_admin",
+        "/cadastro_cliente", "/cadastro_profissional", "/recuperar_senha",
+    ]),
+    "admin": ("admin", [
+        "/admin", "/admin/planos", "/admin/planos/novo", "/admin/planos/editar/{plano_id}",
+        "/admin/profissionais", "/admin/profissionais/pendentes",
+        "/admin/usuarios",
+    ]),
+    "personal": ("personal", [
+        "/personal/dashboard", "/personal/perfil",
+        "/personal/alunos", "/personal/alunos/novo",
+        "/personal/alunos/{aluno_id}/editar",
+        "/personal/treinos", "/personal/treinos/novo", "/personal/treinos/{treino_id}/editar",
+        "/personal/avaliacoes", "/personal/avaliacoes/nova",
+        "/personal/avaliacoes/{avaliacao_id}/editar",
+        "/personal/progressos", "/personal/progressos/novo",
+        "/personal/progressos/{progresso_id}", "/personal/progressos/{progresso_id}/editar",
+    ]),
+}
+
+LOGINS = {"admin": ("/login_admin", "email_admin"), "personal": ("/login_profissional", "email_personal")}
+PERCENTIS = (50, 95, 99)
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def _medir_rota(cliente, caminho: str, requisicoes: int, concorrencia: int, aquecimento: int) -> dict:
+    for _ in range(aquecimento):
+        await cliente.get(caminho)
+
+    latencias = []
+    consultas = Counter()
+    status = {}
+    restantes = requisicoes
+
+    async def trabalhador():
+        nonlocal restantes
+        while restantes > 0:
+            restantes -= 1
+            inicio = time.perf_counter()
+            resposta = await cliente.get(caminho)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            status[resposta.status_code] = status.get(resposta.status_code, 0) + 1
+            if "x-db-queries" in resposta.headers:
+                consultas[int(resposta.headers["x-db-queries"])] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "req_s": round(requisicoes / duracao, 1),
+        **{f"p{p}_ms": round(_percentil(latencias, p), 2) for p in PERCENTIS},
+        # Contagem mais frequente: com cache (páginas do visitante, estatísticas) só a primeira
+        # requisição de cada worker vai ao banco
+        "consultas": consultas.most_common(1)[0][0] if consultas else None,
+        "status": {str(codigo): quantidade for codigo, quantidade in sorted(status.items())},
+    }
+
+
+async def _executar(criar_cliente, referencias: dict, args) -> dict:
+    clientes = {}
+    try:
+        for sessao in ("anonimo", "admin", "personal"):
+            cliente = clientes[sessao] = criar_cliente()
+            if sessao in LOGINS:
+                rota_login, campo_email = LOGINS[sessao]
+                resposta = await cliente.post(rota_login, data={"email": referencias[campo_email], "senha": SENHA})
+                if resposta.status_code != 303:
+                    raise SystemExit(f"Login de {sessao} falhou ({resposta.status_code})")
+
+        resultado = {}
+        for modulo, (sessao, caminhos) in ROTAS.items():
+            for modelo in caminhos:
+                medida = await _medir_rota(clientes[sessao], modelo.format(**referencias),
+                                           args.requisicoes, args.concorrencia, args.aquecimento)
+                resultado[modelo] = {"modulo": modulo, **medida}
+        return resultado
+    finally:
+        for cliente in clientes.values():
+            await cliente.aclose()
+
+
+def _configurar_ambiente(ambiente, caminho: str) -> None:
+    ambiente["DB_PATH"] = caminho
+    ambiente["DB_CONTAR_CONSULTAS"] = "true"
+    # Sem recarga de templates e logs de depuração: mais perto de produção
+    ambiente.setdefault("DEBUG", "False")
+    ambiente.setdefault("LOG_NIVEL", "WARNING")
+
+
+async def _em_processo(referencias: dict, args) -> dict:
+    import httpx
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        # Exceção na rota vira 500 no resultado, como no servidor
+        transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        return await _executar(
+            lambda: httpx.AsyncClient(transport=transporte, base_url="http://bench"), referencias, args
+        )
+
+
+async def _aguardar_servidor(url: str, processos: list, segundos: float = 60) -> None:
+    import httpx
+
+    fim = time.monotonic() + segundos
+    async with httpx.AsyncClient(base_url=url) as cliente:
+        while time.monotonic() < fim:
+            for processo in processos:
+                if processo.poll() is not None:
+                    raise SystemExit(f"Worker terminou com código {processo.returncode}")
+            try:
+                if (await cliente.get("/sobre")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit("O servidor não respondeu a tempo")
+
+
+def _servir(descritor: int) -> None:
+    """Worker do modo HTTP: uvicorn sobre o socket herdado do processo do teste"""
+    import uvicorn
+
+    # Com fileno o protocolo (TCP) é detectado e o asyncio liga o TCP_NODELAY nas conexões
+    sock = socket.socket(fileno=descritor)
+    uvicorn.Server(uvicorn.Config("main:app", log_level="warning", access_log=False)).run(sockets=[sock])
+
+
+async def _por_http(referencias: dict, args, caminho: str) -> dict:
+    """
+    Sobe args.workers processos uvicorn aceitando conexões no mesmo socket
+
+    Faz o mesmo que `uvicorn --workers N`, mas com o socket criado aqui: o
+    de `--workers` não tem o protocolo TCP definido, o asyncio não liga o
+    TCP_NODELAY e cada resposta em conexão reaproveitada espera ~40 ms
+    (Nagle + ACK atrasado), o que esconderia o tempo das rotas.
+    """
+    import httpx
+
+    ambiente = dict(os.environ)
+    _configurar_ambiente(ambiente, caminho)
+    ouvinte = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    ouvinte.bind(("127.0.0.1", 0))
+    ouvinte.listen(2048)
+    url = f"http://127.0.0.1:{ouvinte.getsockname()[1]}"
+    comando = [sys.executable, "-m", "benchmark.carga", "--servidor-fd", str(ouvinte.fileno())]
+    processos = [
+        subprocess.Popen(comando, env=ambiente, pass_fds=(ouvinte.fileno(),))
+        for _ in range(args.workers)
+    ]
+    try:
+        await _aguardar_servidor(url, processos)
+        limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+        return await _executar(lambda: httpx.AsyncClient(base_url=url, limits=limites), referencias, args)
+    finally:
+        for processo in processos:
+            processo.terminate()
+        for processo in processos:
+            try:
+                processo.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                processo.kill()
+        ouvinte.close()
+
+
+def _comparar(resultado: dict, baseline: dict, tolerancia: float, folga_ms: float) -> list[str]:
+    falhas = []
+    for rota, medida in resultado["rotas"].items():
+        erros = {codigo: n for codigo, n in medida["status"].items() if codigo != "200"}
+        if erros:
+            falhas.append(f"{rota}: respostas com erro {erros}")
+
+    for rota, base in baseline["rotas"].items():
+        medida = resultado["rotas"].get(rota)
+        if medida is None:
+            falhas.append(f"{rota}: rota da baseline não foi medida")
+            continue
+        if base["consultas"] is not None and (medida["consultas"] or 0) > base["consultas"]:
+            falhas.append(f"{rota}: {medida['consultas']} consultas (baseline {base['consultas']})")
+        limite_p95 = max(base["p95_ms"] * (1 + tolerancia), base["p95_ms"] + folga_ms)
+        if medida["p95_ms"] > limite_p95:
+            falhas.append(f"{rota}: p95 {medida['p95_ms']:.1f} ms (baseline {base['p95_ms']:.1f} ms)")
+        if medida["req_s"] < base["req_s"] * (1 - tolerancia):
+            falhas.append(f"{rota}: {medida['req_s']:.0f} req/s (baseline {base['req_s']:.0f} req/s)")
+    return falhas
+
+
+def _imprimir(resultado: dict) -> None:
+    print(f"{'Rota':46} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL':>4}  status")
+    modulo_atual = None
+    for rota, medida in resultado["rotas"].items():
+        if medida["modulo"] != modulo_atual:
+            modulo_atual = medida["modulo"]
+            print(f"[{modulo_atual}]")
+        consultas = "-" if medida["consultas"] is None else medida["consultas"]
+        status = " ".join(f"{codigo}x{n}" for codigo, n in medida["status"].items())
+        print(f"  {rota:44} {medida['req_s']:8.0f} {medida['p50_ms']:8.2f} {medida['p95_ms']:8.2f} "
+              f"{medida['p99_ms']:8.2f} {consultas:>4}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga reprodutível de todas as rotas")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem do schema e dos planos")
+    parser.add_argument("--fixture", help="Banco já populado por benchmark.gerar_dados (ignora as opções "
+                                          "de população)")
+    adicionar_argumentos_populacao(parser, Populacao())
+    parser.add_argument("--requisicoes", type=int, default=100, help="Requisições medidas por rota")
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--aquecimento", type=int, default=5, help="Requisições não medidas antes de cada rota")
+    parser.add_argument("--workers", type=int, default=0, help="Workers do uvicorn (0 = em processo, sem HTTP)")
+    parser.add_argument("--baseline", help="JSON de referência; termina com erro se houver regressão")
+    parser.add_argument("--gravar-baseline", help="Grava o resultado como nova baseline neste arquivo")
+    parser.add_argument("--tolerancia", type=float, default=0.5,
+                        help="Piora relativa aceita no p95 e na vazão (0.5 = 50%%)")
+    parser.add_argument("--folga-ms", type=float, default=2.0, help="Piora absoluta do p95 sempre aceita")
+    parser.add_argument("--servidor-fd", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.servidor_fd is not None:
+        _servir(args.servidor_fd)
+        return
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise SystemExit("Este teste de carga requer httpx: pip install httpx")
+
+    if args.fixture:
+        populacao = Populacao(**ler_descricao(args.fixture)["populacao"])
+    else:
+        populacao = populacao_dos_argumentos(args)
+    parametros = {
+        **populacao.como_dict(),
+        "requisicoes": args.requisicoes,
+        "concorrencia": args.concorrencia,
+        "workers": args.workers,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        if baseline["parametros"] != parametros:
+            raise SystemExit(f"A baseline foi gravada com outros parâmetros: {baseline['parametros']}")
+
+    # Sempre sobre uma cópia: as rotas gravam sessões e a população é substituída
+    origem = os.path.abspath(args.fixture or args.banco)
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "carga.db")
+        shutil.copy(origem, caminho)
+        sys.path.insert(0, os.getcwd())
+        if args.workers == 0:
+            # Antes de qualquer import da aplicação, que lê as configurações na importação
+            _configurar_ambiente(os.environ, caminho)
+        if args.fixture:
+            referencias = obter_referencias(caminho)
+        else:
+            try:
+                referencias = semear(caminho, populacao)
+            except ValueError as e:
+                raise SystemExit(str(e))
+
+        if args.workers > 0:
+            rotas = asyncio.run(_por_http(referencias, args, caminho))
+        else:
+            rotas = asyncio.run(_em_processo(referencias, args))
+
+    resultado = {"parametros": parametros, "rotas": rotas}
+    _imprimir(resultado)
+
+    if args.gravar_baseline:
+        with open(args.gravar_baseline, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write("\n")
+        print(f"Baseline gravada em {args.gravar_baseline}")
+
+    if baseline is not None:
+        falhas = _comparar(resultado, baseline, args.tolerancia, args.folga_ms)
+        if falhas:
+            raise SystemExit("\n".join(["Regressão em relação à baseline:"] + falhas))
+        print("OK: sem regressão em relação à baseline")
+
+
+if __name__ == "__main__":
+    main()
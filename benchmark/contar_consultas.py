@@ -0,0 +1,176 @@
+"""
+Regressão de número de consultas nas páginas do personal
+
+Cria alunos (com treino, avaliação e progresso) para um personal em uma
+cópia temporária do banco e conta as consultas SQL de cada página de
+listagem. O número de consultas não pode crescer com o número de alunos
+nem passar do limite; caso contrário o script termina com erro, para uso
+em CI.
+
+Requer httpx (pip install httpx).
+
+Uso:
+    python -m benchmark.contar_consultas --alunos 200 --limite 10
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+SENHA = "bench123"
+REPETICOES = 3
+
+ROTAS = [
+    "/personal/dashboard",
+    "/personal/alunos",
+    "/personal/alunos/novo",
+    "/personal/treinos",
+    "/personal/treinos/novo",
+    "/personal/avaliacoes",
+    "/personal/avaliacoes/nova",
+    "/personal/progressos",
+    "/personal/progressos/novo",
+]
+
+
+def _preparar_banco(origem: str, destino: str, alunos: int) -> str:
+    """Copia o banco e cria `alunos` alunos para o primeiro personal"""
+    from util.security import criar_hash_senha
+
+    shutil.copy(origem, destino)
+    conn = sqlite3.connect(destino)
+    linha = conn.execute(
+        "SELECT p.id, u.email FROM personal p "
+        "INNER JOIN usuario u ON u.id = p.profissional_id ORDER BY p.id LIMIT 1"
+    ).fetchone()
+    if not linha:
+        conn.close()
+        raise SystemExit("O banco de origem não tem nenhum personal cadastrado")
+    personal_id, email = linha
+    conn.execute("UPDATE usuario SET senha = ? WHERE email = ?", (criar_hash_senha(SENHA), email))
+
+    for i in range(alunos):
+        cursor = conn.execute(
+            "INSERT INTO usuario (nome, email, senha, perfil) VALUES (?, ?, ?, 'cliente')",
+            (f"Aluno Carga {i:04d}", f"aluno.carga{i}@exemplo.com", "x"),
+        )
+        usuario_id = cursor.lastrowid
+        conn.execute("INSERT INTO cliente (id) VALUES (?)", (usuario_id,))
+        cursor = conn.execute(
+            "INSERT INTO personal_aluno (personal_id, aluno_id, data_inicio, status, objetivo) "
+            "VALUES (?, ?, '2025-01-01 00:00:00', 'ativo', 'Hipertrofia')",
+            (personal_id, usuario_id),
+        )
+        personal_aluno_id = cursor.lastrowid
+        conn.execute(
+            "INSERT INTO treino_personalizado (personal_aluno_id, nome, objetivo, nivel_dificuldade) "
+            "VALUES (?, 'Treino A', 'Hipertrofia', 'Iniciante')",
+            (personal_aluno_id,),
+        )
+        conn.execute(
+            "INSERT INTO avaliacao_fisica (personal_aluno_id, data_avaliacao, peso, imc) "
+            "VALUES (?, '2025-02-01', 80, 24.5)",
+            (personal_aluno_id,),
+        )
+        conn.execute(
+            "INSERT INTO progresso_aluno (personal_aluno_id, data_registro, peso, energia) "
+            "VALUES (?, '2025-02-15', 79, 7)",
+            (personal_aluno_id,),
+        )
+    conn.commit()
+    conn.close()
+    return email
+
+
+async def _contar(app, email: str) -> dict:
+    import httpx
+    from util.db_util import contar_consultas
+
+    resultado = {}
+    transporte = httpx.ASGITransport(app=app)
+    # O startup aplica as migrações (tabela sessao do login) e o shutdown fecha os pools
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        await cliente.post("/login_profissional", data={"email": email, "senha": SENHA})
+        for rota in ROTAS:
+            # Menor contagem entre repetições: a primeira requisição enche os caches
+            # (contexto do profissional, estatísticas) e gravações de outras conexões
+            # do pool fazem o cache de catálogo reler as versões
+            totais = []
+            for _ in range(REPETICOES):
+                with contar_consultas() as contador:
+                    resposta = await cliente.get(rota)
+                if resposta.status_code != 200:
+                    raise SystemExit(f"{rota} retornou {resposta.status_code}")
+                totais.append(contador.total)
+            resultado[rota] = min(totais)
+    return resultado
+
+
+def _medir(origem: str, alunos: int) -> dict:
+    """Roda as rotas em um processo novo para usar um DB_PATH próprio"""
+    import json
+    import subprocess
+
+    saida = subprocess.run(
+        [sys.executable, "-m", "benchmark.contar_consultas", "--banco", origem,
+         "--alunos", str(alunos), "--interno"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regressão de consultas N+1 nas páginas do personal")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem da cópia")
+    parser.add_argument("--alunos", type=int, default=200)
+    parser.add_argument("--limite", type=int, default=10, help="Máximo de consultas por página")
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise SystemExit("Esta verificação requer httpx: pip install httpx")
+
+    origem = os.path.abspath(args.banco)
+
+    if args.interno:
+        import json
+
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = os.path.join(tmp, "consultas.db")
+            os.environ["DB_PATH"] = caminho
+            os.environ.setdefault("LOG_NIVEL", "WARNING")
+            sys.path.insert(0, os.getcwd())
+            email = _preparar_banco(origem, caminho, args.alunos)
+            from main import app
+            from util.db_util import fechar_conexoes
+
+            resultado = asyncio.run(_contar(app, email))
+            fechar_conexoes()
+        print(json.dumps(resultado))
+        return
+
+    poucos = _medir(origem, 1)
+    muitos = _medir(origem, args.alunos)
+
+    falhas = []
+    print(f"{'Rota':30} {'1 aluno':>8} {f'{args.alunos} alunos':>12}")
+    for rota in ROTAS:
+        print(f"{rota:30} {poucos[rota]:8} {muitos[rota]:12}")
+        if muitos[rota] > poucos[rota]:
+            falhas.append(f"{rota}: consultas crescem com o número de alunos")
+        if muitos[rota] > args.limite:
+            falhas.append(f"{rota}: {muitos[rota]} consultas (limite {args.limite})")
+
+    if falhas:
+        raise SystemExit("\n".join(["Regressão de consultas:"] + falhas))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Gerador de bancos grandes com população sintética
+
+Copia o schema e os planos de um banco (padrão: dados.db) para o arquivo
+de saída e carrega uma população referencialmente consistente com o
+carregador de benchmark/populacao.py: executemany por tabela, uma
+transação por lote, índices secundários recriados no final e ANALYZE.
+Com os padrões são ~100 mil usuários, ~1 milhão de avaliações físicas
+e ~2 milhões de registros de progresso.
+
+O resultado é determinístico pela semente. Ao lado do banco fica um
+<saida>.json com a população e as linhas por tabela, lido pelo teste de
+carga (--fixture). O banco de origem nunca é alterado.
+
+Uso:
+    python -m benchmark.gerar_dados --saida .cache/fixtures/grande.db
+    python -m benchmark.gerar_dados --clientes 20000 --progressos-por-aluno 50 --saida /tmp/progressos.db
+
+Reaproveitando o banco gerado:
+    DB_PATH=.cache/fixtures/grande.db python -m util.migracoes     (índices e EXPLAIN QUERY PLAN)
+    python -m benchmark.carga --fixture .cache/fixtures/grande.db
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+from benchmark.populacao import LOTE_PADRAO, Populacao, carregar
+
+PADRAO = Populacao(
+    admins=5,
+    profissionais=500,
+    personais=1500,
+    clientes=98_000,
+    alunos_por_personal=60,
+    treinos_por_aluno=3,
+    avaliacoes_por_aluno=12,
+    progressos_por_aluno=24,
+)
+
+
+def adicionar_argumentos_populacao(parser: argparse.ArgumentParser, padrao: Populacao) -> None:
+    """Opções de tamanho da população (também usadas por benchmark/carga.py)"""
+    parser.add_argument("--admins", type=int, default=padrao.admins)
+    parser.add_argument("--profissionais", type=int, default=padrao.profissionais,
+                        help="Profissionais sem cadastro de personal")
+    parser.add_argument("--personais", type=int, default=padrao.personais)
+    parser.add_argument("--clientes", type=int, default=padrao.clientes)
+    parser.add_argument("--alunos-por-personal", type=int, default=padrao.alunos_por_personal)
+    parser.add_argument("--treinos-por-aluno", type=int, default=padrao.treinos_por_aluno)
+    parser.add_argument("--avaliacoes-por-aluno", type=int, default=padrao.avaliacoes_por_aluno)
+    parser.add_argument("--progressos-por-aluno", type=int, default=padrao.progressos_por_aluno)
+    parser.add_argument("--semente", type=int, default=padrao.semente)
+
+
+def populacao_dos_argumentos(args) -> Populacao:
+    return Populacao(
+        admins=args.admins, profissionais=args.profissionais, personais=args.personais,
+        clientes=args.clientes, alunos_por_personal=args.alunos_por_personal,
+        treinos_por_aluno=args.treinos_por_aluno, avaliacoes_por_aluno=args.avaliacoes_por_aluno,
+        progressos_por_aluno=args.progressos_por_aluno, semente=args.semente,
+    )
+
+
+def ler_descricao(caminho: str) -> dict:
+    """Conteúdo do <banco>.json gravado junto com um banco gerado"""
+    try:
+        with open(f"{caminho}.json", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        raise SystemExit(f"{caminho}.json não encontrado: o banco não foi gerado por benchmark.gerar_dados")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um banco grande com população sintética")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem do schema e dos planos")
+    parser.add_argument("--saida", required=True, help="Arquivo do banco gerado")
+    parser.add_argument("--substituir", action="store_true", help="Sobrescreve a saída se já existir")
+    parser.add_argument("--lote", type=int, default=LOTE_PADRAO, help="Linhas por transação")
+    adicionar_argumentos_populacao(parser, PADRAO)
+    args = parser.parse_args()
+
+    origem = os.path.abspath(args.banco)
+    saida = os.path.abspath(args.saida)
+    if saida == origem:
+        raise SystemExit("A saída não pode ser o banco de origem: a carga apaga os usuários existentes")
+    if os.path.exists(saida) and not args.substituir:
+        raise SystemExit(f"{args.saida} já existe (use --substituir)")
+
+    populacao = populacao_dos_argumentos(args)
+    try:
+        populacao.validar()
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    total = populacao.total_linhas()
+    print(f"Gerando {total:,} linhas em {args.saida} (lotes de {args.lote:,})")
+
+    # Gera em um arquivo temporário: uma carga interrompida não deixa um banco pela metade
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    temporario = f"{saida}.parcial"
+    shutil.copy(origem, temporario)
+    sys.path.insert(0, os.getcwd())
+
+    inicio = time.perf_counter()
+    ultimo_aviso = inicio
+
+    def ao_gravar(contagem: dict) -> None:
+        nonlocal ultimo_aviso
+        agora = time.perf_counter()
+        if agora - ultimo_aviso >= 2:
+            ultimo_aviso = agora
+            gravadas = sum(contagem.values())
+            print(f"  {gravadas:>12,} linhas ({gravadas / total:6.1%}), {gravadas / (agora - inicio):,.0f} linhas/s")
+
+    contagem = carregar(temporario, populacao, lote=args.lote, ao_gravar=ao_gravar)
+    segundos = time.perf_counter() - inicio
+    os.replace(temporario, saida)
+
+    with open(f"{saida}.json", "w", encoding="utf-8") as arquivo:
+        json.dump({"populacao": populacao.como_dict(), "linhas": contagem}, arquivo, indent=2)
+        arquivo.write("\n")
+
+    for tabela, linhas in contagem.items():
+        print(f"  {tabela:22} {linhas:>12,}")
+    gravadas = sum(contagem.values())
+    print(f"{gravadas:,} linhas em {segundos:.1f} s ({gravadas / segundos:,.0f} linhas/s, "
+          f"com índices e ANALYZE); {os.path.getsize(saida) / 1024 ** 2:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+População sintética para os testes de carga e para bancos grandes
+
+carregar() esvazia as tabelas de usuários e de acompanhamento de um
+banco (o schema e os planos vêm do próprio banco, normalmente uma cópia
+do dados.db) e grava uma população determinística a partir da semente:
+admins, profissionais sem cadastro de personal (pendentes e
+nutricionistas), personais, clientes, vínculos personal_aluno e, para
+cada vínculo, treinos, avaliações físicas e registros de progresso.
+Todos os usuários têm a senha SENHA.
+
+As linhas são geradas sob demanda, com os ids atribuídos aqui (as
+tabelas começam vazias), e gravadas em lotes: cada lote é uma transação
+com um executemany por tabela (INSERT de várias linhas por execução), na
+ordem das chaves estrangeiras. Durante a carga os índices secundários
+dessas tabelas são removidos e depois recriados, e ao final o ANALYZE
+atualiza as estatísticas do planejador.
+
+semear() carrega e devolve as referências usadas pelas rotas em
+benchmark/carga.py; benchmark/gerar_dados.py é a linha de comando para
+gerar bancos grandes reaproveitáveis.
+"""
+import random
+import sqlite3
+from itertools import chain, islice, repeat
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, Optional
+
+SENHA = "bench123"
+DOMINIO = "carga.bench"
+LOTE_PADRAO = 50_000
+# Parâmetros por instrução aceitos por qualquer versão do SQLite (SQLITE_MAX_VARIABLE_NUMBER antigo)
+MAXIMO_PARAMETROS = 999
+
+# Tabelas esvaziadas antes de carregar (as que não existirem no banco são ignoradas)
+TABELAS_POPULACAO = (
+    "usuario", "profissional", "cliente", "personal", "personal_aluno", "treino_personalizado",
+    "avaliacao_fisica", "progresso_aluno", "assinatura", "sessao",
+)
+
+# Inserção por tabela, na ordem das chaves estrangeiras (cada lote grava nesta ordem)
+INSERCOES = {
+    "usuario": "INSERT INTO usuario (id, nome, email, senha, perfil, data_cadastro) VALUES (?, ?, ?, ?, ?, ?)",
+    "profissional": "INSERT INTO profissional (id, especialidade, registro_profissional, status, "
+                    "data_solicitacao, aprovado_por) VALUES (?, ?, ?, ?, ?, ?)",
+    "cliente": "INSERT INTO cliente (id) VALUES (?)",
+    "personal": "INSERT INTO personal (id, profissional_id, cref, especialidades, anos_experiencia, "
+                "valor_mensalidade, total_alunos) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "personal_aluno": "INSERT INTO personal_aluno (id, personal_id, aluno_id, data_inicio, status, objetivo) "
+                      "VALUES (?, ?, ?, ?, ?, ?)",
+    "treino_personalizado": "INSERT INTO treino_personalizado (id, personal_aluno_id, nome, objetivo, "
+                            "nivel_dificuldade, duracao_semanas, dias_semana, divisao_treino, status, criado_em) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "avaliacao_fisica": "INSERT INTO avaliacao_fisica (id, personal_aluno_id, data_avaliacao, peso, altura, imc, "
+                        "percentual_gordura, massa_magra, proxima_avaliacao) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "progresso_aluno": "INSERT INTO progresso_aluno (id, personal_aluno_id, data_registro, peso, humor, energia) "
+                       "VALUES (?, ?, ?, ?, ?, ?)",
+}
+_insercoes_agrupadas: dict[str, str] = {}
+
+NOMES = ("Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sabrina", "Thiago", "Valéria", "Yuri")
+SOBRENOMES = ("Almeida", "Barbosa", "Cardoso", "Dias", "Esteves", "Ferreira", "Gomes", "Lima", "Moreira",
+              "Nogueira", "Oliveira", "Pereira", "Ribeiro", "Santos", "Teixeira", "Vieira")
+OBJETIVOS = ("Hipertrofia", "Perda de peso", "Condicionamento", "Força", "Reabilitação")
+NIVEIS = ("Iniciante", "Intermediário", "Avançado")
+HUMORES = ("Ótimo", "Bom", "Regular", "Ruim")
+DIVISOES = ("ABC", "ABCD", "Full body", "Superior/Inferior")
+STATUS_TREINO = ("ativo", "ativo", "pausado")
+
+# Datas a partir de 2025-01-01, já formatadas (formatar a cada linha domina o tempo de geração)
+DATAS = tuple((datetime(2025, 1, 1) + timedelta(days=dia)).strftime("%Y-%m-%d 00:00:00") for dia in range(400))
+DATAS_REGISTRO = DATAS[:300]
+GORDURAS = tuple(decimos / 10 for decimos in range(100, 351))
+VARIACOES_PESO = tuple(range(-40, 41))  # décimos de kg em torno do peso do aluno
+ENERGIAS = tuple(range(1, 11))
+
+
+@dataclass
+class Populacao:
+    """Tamanho da população; alunos_por_personal sai do total de clientes"""
+    admins: int = 1
+    profissionais: int = 4
+    personais: int = 5
+    clientes: int = 200
+    alunos_por_personal: int = 40
+    treinos_por_aluno: int = 2
+    avaliacoes_por_aluno: int = 3
+    progressos_por_aluno: int = 6
+    semente: int = 42
+
+    def validar(self) -> None:
+        if self.admins < 1 or self.personais < 1:
+            raise ValueError("A população precisa de ao menos um admin e um personal")
+        if not 1 <= self.alunos_por_personal <= self.clientes:
+            raise ValueError("alunos_por_personal deve estar entre 1 e o número de clientes")
+        if min(self.treinos_por_aluno, self.avaliacoes_por_aluno, self.progressos_por_aluno) < 1:
+            raise ValueError("Cada aluno precisa de ao menos um treino, uma avaliação e um progresso")
+
+    def como_dict(self) -> dict:
+        return asdict(self)
+
+    def total_linhas(self) -> int:
+        """Linhas gravadas por carregar() com esta população"""
+        usuarios = self.admins + self.profissionais + self.personais + self.clientes
+        # profissional e personal dos personais, profissional dos demais, cliente de cada cliente
+        cadastros = self.profissionais + 2 * self.personais + self.clientes
+        vinculos = self.personais * self.alunos_por_personal
+        por_vinculo = 1 + self.treinos_por_aluno + self.avaliacoes_por_aluno + self.progressos_por_aluno
+        return usuarios + cadastros + vinculos * por_vinculo
+
+
+def _linhas(populacao: Populacao, senha: str) -> Iterator[tuple[str, list]]:
+    """(tabela, linhas) de toda a população, pais antes dos filhos"""
+    rng = random.Random(populacao.semente)
+    aleatorio = rng.random
+    escolher = rng.choice
+    sortear = rng.choices
+    usuario_id = 0
+
+    def usuario(prefixo: str, perfil: str, i: int) -> tuple:
+        nome = f"{escolher(NOMES)} {escolher(SOBRENOMES)} {usuario_id:06d}"
+        return usuario_id, nome, f"{prefixo}{i}@{DOMINIO}", senha, perfil, DATAS[int(aleatorio() * 300)]
+
+    primeiro_admin = usuario_id + 1
+    for i in range(populacao.admins):
+        usuario_id += 1
+        yield "usuario", [usuario("admin", "admin", i)]
+
+    for i in range(populacao.profissionais):
+        usuario_id += 1
+        yield "usuario", [usuario("profissional", "profissional", i)]
+        pendente = i % 2 == 0
+        yield "profissional", [(usuario_id, "Nutricionista", f"CRN-{usuario_id}",
+                                "pendente" if pendente else "aprovado", DATAS[int(aleatorio() * 300)],
+                                None if pendente else primeiro_admin)]
+
+    for personal_id in range(1, populacao.personais + 1):
+        usuario_id += 1
+        yield "usuario", [usuario("personal", "profissional", personal_id - 1)]
+        yield "profissional", [(usuario_id, "Personal Trainer", f"CREF-{usuario_id}", "aprovado",
+                                DATAS[int(aleatorio() * 300)], primeiro_admin)]
+        yield "personal", [(personal_id, usuario_id, f"{usuario_id:06d}-G/ES", escolher(OBJETIVOS),
+                            1 + int(aleatorio() * 19), round(80 + aleatorio() * 220, 2),
+                            populacao.alunos_por_personal)]
+
+    primeiro_cliente = usuario_id + 1
+    for i in range(populacao.clientes):
+        usuario_id += 1
+        yield "usuario", [usuario("cliente", "cliente", i)]
+        yield "cliente", [(usuario_id,)]
+
+    # Avaliações e progressos são a maior parte das linhas: saem em bloco por vínculo,
+    # com os valores sorteados de uma vez (choices) e as tuplas montadas pelo zip
+    avaliacoes = populacao.avaliacoes_por_aluno
+    progressos = populacao.progressos_por_aluno
+    clientes = range(primeiro_cliente, primeiro_cliente + populacao.clientes)
+    vinculo_id = treino_id = avaliacao_id = progresso_id = 0
+    for personal_id in range(1, populacao.personais + 1):
+        for aluno_id in sorted(rng.sample(clientes, populacao.alunos_por_personal)):
+            vinculo_id += 1
+            objetivo = escolher(OBJETIVOS)
+            yield "personal_aluno", [(vinculo_id, personal_id, aluno_id, DATAS[int(aleatorio() * 60)],
+                                      "ativo" if aleatorio() < 0.85 else "inativo", objetivo)]
+            treinos = []
+            for _ in range(populacao.treinos_por_aluno):
+                treino_id += 1
+                treinos.append((
+                    treino_id, vinculo_id, f"Treino {escolher('ABCDE')}", objetivo, escolher(NIVEIS),
+                    4 + int(aleatorio() * 9), 2 + int(aleatorio() * 5), escolher(DIVISOES),
+                    escolher(STATUS_TREINO), DATAS[int(aleatorio() * 300)],
+                ))
+            yield "treino_personalizado", treinos
+
+            # Peso em décimos de kg: (décimos + variação) / 10 já sai com uma casa, sem round()
+            decimos = 550 + int(aleatorio() * 550)
+            peso = decimos / 10
+            altura = round(1.55 + aleatorio() * 0.4, 2)
+            imc = round(peso / altura ** 2, 1)
+            gorduras = sortear(GORDURAS, k=avaliacoes)
+            yield "avaliacao_fisica", list(zip(
+                range(avaliacao_id + 1, avaliacao_id + avaliacoes + 1), repeat(vinculo_id, avaliacoes),
+                sortear(DATAS_REGISTRO, k=avaliacoes), repeat(peso, avaliacoes), repeat(altura, avaliacoes),
+                repeat(imc, avaliacoes), gorduras, [round(peso * (1 - gordura / 100), 1) for gordura in gorduras],
+                sortear(DATAS, k=avaliacoes),
+            ))
+            avaliacao_id += avaliacoes
+
+            yield "progresso_aluno", list(zip(
+                range(progresso_id + 1, progresso_id + progressos + 1), repeat(vinculo_id, progressos),
+                sortear(DATAS_REGISTRO, k=progressos),
+                [(decimos + variacao) / 10 for variacao in sortear(VARIACOES_PESO, k=progressos)],
+                sortear(HUMORES, k=progressos), sortear(ENERGIAS, k=progressos),
+            ))
+            progresso_id += progressos
+
+
+def _esvaziar(conn: sqlite3.Connection) -> None:
+    existentes = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for tabela in TABELAS_POPULACAO:
+        if tabela in existentes:
+            conn.execute(f"DELETE FROM {tabela}")
+    if "sqlite_sequence" in existentes:
+        conn.executemany("DELETE FROM sqlite_sequence WHERE name = ?", [(t,) for t in TABELAS_POPULACAO])
+
+
+def _remover_indices(conn: sqlite3.Connection) -> list[str]:
+    """Remove os índices secundários das tabelas carregadas e devolve o SQL para recriá-los"""
+    marcadores = ", ".join("?" * len(INSERCOES))
+    indices = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        f"AND tbl_name IN ({marcadores})", tuple(INSERCOES)
+    ).fetchall()
+    for nome, _ in indices:
+        conn.execute(f'DROP INDEX "{nome}"')
+    return [sql for _, sql in indices]
+
+
+def _inserir(conn: sqlite3.Connection, tabela: str, linhas: list) -> None:
+    """
+    Grava as linhas com um INSERT de várias tuplas por execução
+
+    Um executemany de uma linha por vez executa a instrução uma vez por
+    linha; agrupando até MAXIMO_PARAMETROS valores em cada VALUES o custo
+    fixo por execução é dividido entre as linhas. O resto vai pelo INSERT simples.
+    """
+    sql = INSERCOES[tabela]
+    colunas = sql.count("?")
+    por_insert = max(1, MAXIMO_PARAMETROS // colunas)
+    completas = len(linhas) - len(linhas) % por_insert
+    if completas:
+        agrupado = _insercoes_agrupadas.get(tabela)
+        if agrupado is None:
+            tupla = sql[sql.index("VALUES") + len("VALUES"):].strip()
+            agrupado = _insercoes_agrupadas[tabela] = sql + ", " + ", ".join([tupla] * (por_insert - 1))
+        valores = chain.from_iterable(islice(linhas, completas))
+        conn.executemany(agrupado, zip(*[valores] * (colunas * por_insert)))
+    if completas < len(linhas):
+        conn.executemany(sql, linhas[completas:])
+
+
+def carregar(caminho: str, populacao: Populacao, lote: int = LOTE_PADRAO,
+             ao_gravar: Optional[Callable[[dict], None]] = None) -> dict[str, int]:
+    """
+    Substitui a população do banco em `caminho`
+
+    Args:
+        caminho: Banco SQLite já com o schema (cópia do banco da aplicação)
+        populacao: Quantidades e semente
+        lote: Linhas (somando todas as tabelas) por transação
+        ao_gravar: Chamada após cada lote com as linhas gravadas até ali por tabela
+
+    Returns:
+        Linhas gravadas por tabela
+
+    Raises:
+        ValueError: População inválida
+    """
+    from util.security import criar_hash_senha
+
+    populacao.validar()
+    contagem = dict.fromkeys(INSERCOES, 0)
+    pendentes = {tabela: [] for tabela in INSERCOES}
+
+    conn = sqlite3.connect(caminho, isolation_level=None)
+    try:
+        journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        # Banco descartável durante a carga: journal em memória e sem fsync
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+
+        conn.execute("BEGIN")
+        _esvaziar(conn)
+        indices = _remover_indices(conn)
+        conn.execute("COMMIT")
+
+        def gravar():
+            conn.execute("BEGIN")
+            for tabela, linhas in pendentes.items():
+                if linhas:
+                    _inserir(conn, tabela, linhas)
+                    contagem[tabela] += len(linhas)
+                    linhas.clear()
+            conn.execute("COMMIT")
+            if ao_gravar is not None:
+                ao_gravar(contagem)
+
+        quantidade = 0
+        for tabela, linhas in _linhas(populacao, criar_hash_senha(SENHA)):
+            pendentes[tabela].extend(linhas)
+            quantidade += len(linhas)
+            if quantidade >= lote:
+                gravar()
+                quantidade = 0
+        gravar()
+
+        for sql in indices:
+            conn.execute(sql)
+        conn.execute("ANALYZE")
+        conn.execute(f"PRAGMA journal_mode = {journal}")
+    finally:
+        conn.close()
+    return contagem
+
+
+def obter_referencias(caminho: str) -> dict:
+    """
+    Emails e ids usados pelas rotas do teste de carga
+
+    Admin e personal são os primeiros da população; os ids de aluno,
+    treino, avaliação e progresso são do primeiro aluno do personal.
+    """
+    conn = sqlite3.connect(caminho)
+    try:
+        plano = conn.execute("SELECT id FROM plano WHERE ativo = 1 ORDER BY id LIMIT 1").fetchone()
+        vinculo = conn.execute("SELECT MIN(id) FROM personal_aluno WHERE personal_id = 1").fetchone()[0]
+        primeiros = {
+            campo: conn.execute(f"SELECT MIN(id) FROM {tabela} WHERE personal_aluno_id = ?", (vinculo,)).fetchone()[0]
+            for campo, tabela in (("treino_id", "treino_personalizado"), ("avaliacao_id", "avaliacao_fisica"),
+                                  ("progresso_id", "progresso_aluno"))
+        }
+    finally:
+        conn.close()
+
+    if plano is None:
+        raise SystemExit("O banco de origem não tem nenhum plano ativo")
+    if vinculo is None:
+        raise SystemExit("O banco não tem a população sintética (gere com benchmark/gerar_dados.py)")
+    return {
+        "email_admin": f"admin0@{DOMINIO}",
+        "email_personal": f"personal0@{DOMINIO}",
+        "plano_id": plano[0],
+        # As rotas /personal/alunos/{aluno_id} recebem o id do vínculo personal_aluno
+        "aluno_id": vinculo,
+        **primeiros,
+    }
+
+
+def semear(caminho: str, populacao: Populacao) -> dict:
+    """Carrega a população em `caminho` e devolve as referências das rotas"""
+    carregar(caminho, populacao)
+    return obter_referencias(caminho)
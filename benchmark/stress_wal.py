@@ -0,0 +1,114 @@
+"""
+Teste de estresse de leitura/escrita concorrente no SQLite
+
+Simula vários workers do uvicorn (processos) gravando progressos e
+avaliações enquanto outros leem, e conta quantas operações falharam com
+"database is locked". Roda duas vezes sobre cópias temporárias do banco:
+com o journal padrão (rollback) sem busy_timeout e com o perfil de
+desempenho do .env (WAL + busy_timeout).
+
+Uso:
+    python -m benchmark.stress_wal --processos 6 --segundos 5
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+
+def _trabalhador(caminho: str, perfil: dict, escritor: bool, segundos: float, fila) -> None:
+    from util.db_util import PoolConexoes
+
+    pool = PoolConexoes(caminho, tamanho=1, perfil=perfil)
+    operacoes = 0
+    bloqueios = 0
+    fim = time.monotonic() + segundos
+    while time.monotonic() < fim:
+        try:
+            with pool.conexao() as conn:
+                if escritor:
+                    conn.execute(
+                        "INSERT INTO progresso_aluno (personal_aluno_id, data_registro, peso, energia) "
+                        "VALUES (?, CURRENT_TIMESTAMP, ?, ?)",
+                        (1, 70.0 + operacoes % 10, operacoes % 10),
+                    )
+                    conn.execute(
+                        "INSERT INTO avaliacao_fisica (personal_aluno_id, data_avaliacao, peso) "
+                        "VALUES (?, CURRENT_TIMESTAMP, ?)",
+                        (1, 70.0),
+                    )
+                else:
+                    conn.execute(
+                        "SELECT COUNT(*), AVG(peso) FROM progresso_aluno WHERE personal_aluno_id = ?",
+                        (1,),
+                    ).fetchone()
+            operacoes += 1
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            bloqueios += 1
+    pool.fechar()
+    fila.put((escritor, operacoes, bloqueios))
+
+
+def executar(caminho_origem: str, perfil: dict, processos: int, segundos: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "stress.db")
+        shutil.copy(caminho_origem, caminho)
+        if "journal_mode" in perfil:
+            conn = sqlite3.connect(caminho)
+            conn.execute(f"PRAGMA journal_mode = {perfil['journal_mode']}")
+            conn.close()
+
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        trabalhadores = [
+            contexto.Process(
+                target=_trabalhador,
+                args=(caminho, perfil, i % 2 == 0, segundos, fila),
+            )
+            for i in range(processos)
+        ]
+        for p in trabalhadores:
+            p.start()
+        resultados = [fila.get() for _ in trabalhadores]
+        for p in trabalhadores:
+            p.join()
+
+    return {
+        "escritas": sum(ops for escritor, ops, _ in resultados if escritor),
+        "leituras": sum(ops for escritor, ops, _ in resultados if not escritor),
+        "bloqueios": sum(b for _, _, b in resultados),
+    }
+
+
+def main():
+    from util.db_util import PERFIL_DESEMPENHO
+
+    parser = argparse.ArgumentParser(description="Estresse de concorrência no SQLite")
+    parser.add_argument("--banco", default="dados.db", help="Banco usado como origem da cópia")
+    parser.add_argument("--processos", type=int, default=6)
+    parser.add_argument("--segundos", type=float, default=5)
+    args = parser.parse_args()
+
+    # journal_mode fica gravado no arquivo: o banco de origem pode já estar em
+    # WAL (a aplicação o converte no startup), então o cenário padrão o força
+    cenarios = [
+        ("Journal padrão, sem busy_timeout", {"journal_mode": "DELETE", "busy_timeout": 0}),
+        ("Perfil de desempenho (.env)", PERFIL_DESEMPENHO),
+    ]
+    resultados = {}
+    for nome, perfil in cenarios:
+        r = resultados[nome] = executar(args.banco, perfil, args.processos, args.segundos)
+        print(f"{nome:35} escritas={r['escritas']:6} leituras={r['leituras']:7} "
+              f"'database is locked'={r['bloqueios']}")
+
+    if resultados["Perfil de desempenho (.env)"]["bloqueios"] > 0:
+        raise SystemExit("Perfil de desempenho ainda apresentou erros de bloqueio")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, field_validator, model_validator
 from typing import Dict, Optional
 import re
+from util.file_upload import TAMANHO_ASSINATURA, TAMANHO_MAXIMO_FOTO, detectar_tipo_imagem
 
 
 class CadastroProfissionalDTO(BaseModel):
@@ -222,17 +223,19 @@ def validar_foto_registro(arquivo) -> tuple[bool, str | None]:
     if not arquivo or not arquivo.filename:
         return False, 'Foto do registro é obrigatória.'
     
-    # Validar tipo de arquivo
-    if arquivo.content_type not in ['image/jpeg', 'image/png', 'image/jpg']:
-        return False, 'Apenas arquivos JPG ou PNG são permitidos.'
-    
-    # Validar tamanho (5MB)
     try:
+        # Validar tipo pelos primeiros bytes (o content_type vem do navegador)
+        cabecalho = arquivo.file.read(TAMANHO_ASSINATURA)
+        arquivo.file.seek(0)
+        if not detectar_tipo_imagem(cabecalho):
+            return False, 'Apenas arquivos JPG ou PNG são permitidos.'
+        
+        # Validar tamanho (5MB) sem ler o arquivo
         arquivo.file.seek(0, 2)  # Move para o final
         tamanho = arquivo.file.tell()
         arquivo.file.seek(0)  # Volta para o início
         
-        if tamanho > 5 * 1024 * 1024:
+        if tamanho > TAMANHO_MAXIMO_FOTO:
             return False, 'Arquivo muito grande. Tamanho máximo: 5MB.'
     except Exception:
         return False, 'Erro ao validar arquivo. Tente novamente.'
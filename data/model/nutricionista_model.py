@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+
+@dataclass
+class Nutricionista:
+    id: int
+    profissional_id: int  # referência ao Profissional
+    crn: Optional[str] = None  # Registro no Conselho Regional de Nutricionistas
+    especialidades: Optional[str] = None  # Ex: "Esportiva, Clínica, Emagrecimento"
+    biografia: Optional[str] = None
+    anos_experiencia: Optional[int] = None
+    valor_consulta: Optional[float] = None
+    status: str = 'ativo'  # ativo, inativo
+    data_cadastro: Optional[datetime] = None
+    foto_perfil: Optional[str] = None
+    avaliacoes_media: Optional[float] = None  # Média de avaliações dos pacientes
+    total_pacientes: int = 0
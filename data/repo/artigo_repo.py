@@ -1,7 +1,8 @@
-from typing import Optional
-from model.artigo_model import Artigo
-from sql.artigo_sql import *
-from util.db_util import get_connection
+from typing import Optional, Iterable
+from data.model.artigo_model import Artigo
+from data.sql.artigo_sql import *
+from util.cache_util import cache_catalogo
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -9,6 +10,7 @@ def criar_tabela() -> bool:
         cursor.execute(CRIAR_TABELA_ARTIGO)
         return cursor.rowcount > 0
 
+@cache_catalogo.invalida("artigo")
 def inserir(artigo: Artigo) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -21,6 +23,7 @@ def inserir(artigo: Artigo) -> Optional[int]:
         ))
         return cursor.lastrowid
 
+@cache_catalogo.invalida("artigo")
 def alterar(artigo: Artigo) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -33,12 +36,14 @@ def alterar(artigo: Artigo) -> bool:
         ))
         return cursor.rowcount > 0
 
+@cache_catalogo.invalida("artigo")
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR_ARTIGO, (id,))
         return cursor.rowcount > 0
 
+@cache_catalogo.em_cache("artigo")
 def obter_por_id(id: int) -> Optional[Artigo]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -55,6 +60,21 @@ def obter_por_id(id: int) -> Optional[Artigo]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Artigo]:
+    rows = consultar_por_ids(OBTER_POR_IDS_ARTIGO, ids)
+    return {
+        row["id"]: Artigo(
+            id=row["id"],
+            profissional_id=row["profissional_id"],
+            titulo=row["titulo"],
+            conteudo=row["conteudo"],
+            gratuito=row["gratuito"],
+            data_publicacao=row["data_publicacao"]
+        )
+        for row in rows
+    }
+
+@cache_catalogo.em_cache("artigo")
 def obter_todos() -> list[Artigo]:
     with get_connection() as conn:
         cursor = conn.cursor()
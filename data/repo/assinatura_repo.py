@@ -1,7 +1,7 @@
-from typing import Optional
-from model.assinatura_model import Assinatura
-from sql.assinatura_sql import *
-from util.db_util import get_connection
+from typing import Optional, Iterable
+from data.model.assinatura_model import Assinatura
+from data.sql.assinatura_sql import *
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -55,6 +55,20 @@ def obter_por_id(id: int) -> Optional[Assinatura]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Assinatura]:
+    rows = consultar_por_ids(OBTER_POR_IDS_ASSINATURA, ids)
+    return {
+        row["id"]: Assinatura(
+            id=row["id"],
+            cliente_id=row["cliente_id"],
+            plano_id=row["plano_id"],
+            data_inicio=row["data_inicio"],
+            data_fim=row["data_fim"],
+            status=row["status"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[Assinatura]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.avaliacao_fisica_model import AvaliacaoFisica
 from data.sql.avaliacao_fisica_sql import *
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -76,6 +76,25 @@ def obter_por_id(id: int) -> Optional[AvaliacaoFisica]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, AvaliacaoFisica]:
+    rows = consultar_por_ids(OBTER_POR_IDS_AVALIACAO_FISICA, ids)
+    return {
+        row["id"]: AvaliacaoFisica(
+            id=row["id"],
+            personal_aluno_id=row["personal_aluno_id"],
+            data_avaliacao=row["data_avaliacao"],
+            peso=row["peso"],
+            altura=row["altura"],
+            imc=row["imc"],
+            percentual_gordura=row["percentual_gordura"],
+            massa_magra=row["massa_magra"],
+            circunferencias=row["circunferencias"],
+            observacoes=row["observacoes"],
+            proxima_avaliacao=row["proxima_avaliacao"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[AvaliacaoFisica]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -118,3 +137,10 @@ def obter_por_aluno(personal_aluno_id: int) -> list[AvaliacaoFisica]:
             ) for row in rows
         ]
 
+
+def obter_por_personal(personal_id: int) -> list[dict]:
+    """Avaliações de todos os alunos do personal com o nome do aluno, em uma única consulta"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_AVALIACOES_POR_PERSONAL, (personal_id,))
+        return [dict(row) for row in cursor.fetchall()]
@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.cliente_model import Cliente
 from data.sql.cliente_sql import *
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
+from data.repo.estatisticas_repo import invalida_estatisticas_admin
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -9,6 +10,7 @@ def criar_tabela() -> bool:
         cursor.execute(CRIAR_TABELA_CLIENTE)
         return cursor.rowcount > 0
 
+@invalida_estatisticas_admin
 def inserir(cliente: Cliente) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -18,6 +20,7 @@ def inserir(cliente: Cliente) -> Optional[int]:
         ))
         return cursor.lastrowid
 
+@invalida_estatisticas_admin
 def alterar(cliente: Cliente) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -27,6 +30,7 @@ def alterar(cliente: Cliente) -> bool:
         ))
         return cursor.rowcount > 0
 
+@invalida_estatisticas_admin
 def excluir(usuario_id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -45,6 +49,16 @@ def obter_por_id(usuario_id: int) -> Optional[Cliente]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Cliente]:
+    rows = consultar_por_ids(OBTER_POR_IDS_CLIENTE, ids)
+    return {
+        row["id"]: Cliente(
+            usuario_id=row["id"],
+            plano_id=row["plano_id"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[Cliente]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -56,4 +70,11 @@ def obter_todos() -> list[Cliente]:
                 plano_id=row["plano_id"]
             )
             for row in rows
-        ]
\ No newline at end of file
+        ]
+
+def obter_todos_resumo() -> list[dict]:
+    """Id, nome e email de todos os clientes, em uma única consulta"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_TODOS_CLIENTE_RESUMO)
+        return [dict(row) for row in cursor.fetchall()]
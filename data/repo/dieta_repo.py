@@ -1,7 +1,8 @@
-from typing import Optional
-from model.dieta_model import Dieta
-from sql.dieta_sql import *
-from util.db_util import get_connection
+from typing import Optional, Iterable
+from data.model.dieta_model import Dieta
+from data.sql.dieta_sql import *
+from util.cache_util import cache_catalogo
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -9,6 +10,7 @@ def criar_tabela() -> bool:
         cursor.execute(CRIAR_TABELA_DIETA)
         return cursor.rowcount > 0
 
+@cache_catalogo.invalida("dieta")
 def inserir(dieta: Dieta) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -19,6 +21,7 @@ def inserir(dieta: Dieta) -> Optional[int]:
         ))
         return cursor.lastrowid
 
+@cache_catalogo.invalida("dieta")
 def alterar(dieta: Dieta) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -30,12 +33,14 @@ def alterar(dieta: Dieta) -> bool:
         ))
         return cursor.rowcount > 0
 
+@cache_catalogo.invalida("dieta")
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR_DIETA, (id,))
         return cursor.rowcount > 0
 
+@cache_catalogo.em_cache("dieta")
 def obter_por_id(id: int) -> Optional[Dieta]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -50,6 +55,19 @@ def obter_por_id(id: int) -> Optional[Dieta]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Dieta]:
+    rows = consultar_por_ids(OBTER_POR_IDS_DIETA, ids)
+    return {
+        row["id"]: Dieta(
+            id=row["id"],
+            nome=row["nome"],
+            descricao=row["descricao"],
+            gratuito=row["gratuito"]
+        )
+        for row in rows
+    }
+
+@cache_catalogo.em_cache("dieta")
 def obter_todos() -> list[Dieta]:
     with get_connection() as conn:
         cursor = conn.cursor()
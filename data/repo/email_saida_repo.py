@@ -0,0 +1,64 @@
+from typing import List, Optional
+from data.sql.email_saida_sql import *
+from util.db_util import get_connection
+
+def criar_tabela() -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA_EMAIL_SAIDA)
+        cursor.execute(CRIAR_INDICE_EMAIL_SAIDA_FILA)
+        conn.commit()
+        return True
+
+def enfileirar(destinatario: str, assunto: str, mensagem: str) -> Optional[int]:
+    """Coloca uma mensagem (texto MIME completo) na fila de envio"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERIR_EMAIL_SAIDA, (destinatario, assunto, mensagem))
+        conn.commit()
+        return cursor.lastrowid
+
+def reservar_lote(limite: int, prazo_segundos: int) -> List[dict]:
+    """
+    Reserva até `limite` emails prontos para envio
+
+    Os emails ficam com status 'enviando' por `prazo_segundos`; depois disso
+    voltam para a fila se não forem marcados como enviados ou com falha.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(RESERVAR_LOTE_EMAIL_SAIDA, (f"+{prazo_segundos} seconds", limite))
+        rows = cursor.fetchall()
+        conn.commit()
+        return [dict(row) for row in rows]
+
+def marcar_enviado(id: int) -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(MARCAR_ENVIADO_EMAIL_SAIDA, (id,))
+        conn.commit()
+        return cursor.rowcount > 0
+
+def registrar_falha(id: int, erro: str, espera_segundos: int, definitiva: bool = False) -> bool:
+    """Registra uma tentativa com erro; a próxima fica para daqui a `espera_segundos`"""
+    status = "falhou" if definitiva else "pendente"
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(REGISTRAR_FALHA_EMAIL_SAIDA, (status, erro[:500], f"+{espera_segundos} seconds", id))
+        conn.commit()
+        return cursor.rowcount > 0
+
+def adiar(ids: List[int], erro: str, espera_segundos: int) -> int:
+    """Devolve emails à fila para daqui a `espera_segundos` sem contar tentativa"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(ADIAR_EMAIL_SAIDA, [(erro[:500], f"+{espera_segundos} seconds", id) for id in ids])
+        conn.commit()
+        return cursor.rowcount
+
+def contar_por_status() -> dict:
+    """Quantidade de emails por status ('pendente', 'enviando', 'enviado', 'falhou')"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_POR_STATUS_EMAIL_SAIDA)
+        return {row["status"]: row["quantidade"] for row in cursor.fetchall()}
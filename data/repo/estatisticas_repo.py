@@ -0,0 +1,46 @@
+import os
+from functools import wraps
+from data.sql.estatisticas_sql import *
+from util.cache_util import CacheTTL
+from util.db_util import get_connection
+
+# Estatísticas do admin ficam em cache; as escritas em usuário, cliente,
+# profissional e plano chamam invalidar_estatisticas_admin()
+_cache_admin = CacheTTL(ttl_segundos=float(os.getenv("CACHE_ESTATISTICAS_SEGUNDOS", "30")))
+
+def obter_estatisticas_personal(personal_id: int) -> dict:
+    """Totais do dashboard do personal (alunos, alunos ativos, treinos ativos e avaliações)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ESTATISTICAS_DASHBOARD_PERSONAL, (personal_id, personal_id, personal_id))
+        row = cursor.fetchone()
+        return {
+            "total_alunos": row["total_alunos"],
+            "alunos_ativos": row["alunos_ativos"],
+            "total_treinos": row["total_treinos"],
+            "total_avaliacoes": row["total_avaliacoes"]
+        }
+
+def _consultar_estatisticas_admin() -> dict:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ESTATISTICAS_DASHBOARD_ADMIN)
+        return dict(cursor.fetchone())
+
+def obter_estatisticas_admin() -> dict:
+    """Totais do dashboard do admin (usuários, clientes, profissionais, planos e pendentes)"""
+    return dict(_cache_admin.obter("admin", _consultar_estatisticas_admin))
+
+def invalidar_estatisticas_admin() -> None:
+    """Descarta as estatísticas do admin em cache (chamar após inserir/alterar/excluir)"""
+    _cache_admin.invalidar("admin")
+
+def invalida_estatisticas_admin(funcao):
+    """Decorador para funções de escrita: invalida o cache após a transação terminar"""
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            invalidar_estatisticas_admin()
+    return wrapper
@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.nutricionista_model import Nutricionista
 from data.sql.nutricionista_sql import *
-from util.db_util import get_connection
+from util.cache_util import cache_catalogo
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -10,6 +11,7 @@ def criar_tabela() -> bool:
         conn.commit()
         return True
 
+@cache_catalogo.invalida("profissional")
 def inserir(nutricionista: Nutricionista) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -29,6 +31,7 @@ def inserir(nutricionista: Nutricionista) -> Optional[int]:
         conn.commit()
         return cursor.lastrowid
 
+@cache_catalogo.invalida("profissional")
 def alterar(nutricionista: Nutricionista) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -48,6 +51,7 @@ def alterar(nutricionista: Nutricionista) -> bool:
         conn.commit()
         return cursor.rowcount > 0
 
+@cache_catalogo.invalida("profissional")
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -77,6 +81,26 @@ def obter_por_id(id: int) -> Optional[Nutricionista]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Nutricionista]:
+    rows = consultar_por_ids(OBTER_POR_IDS_NUTRICIONISTA, ids)
+    return {
+        row["id"]: Nutricionista(
+            id=row["id"],
+            profissional_id=row["profissional_id"],
+            crn=row["crn"],
+            especialidades=row["especialidades"],
+            biografia=row["biografia"],
+            anos_experiencia=row["anos_experiencia"],
+            valor_consulta=row["valor_consulta"],
+            status=row["status"],
+            data_cadastro=row["data_cadastro"],
+            foto_perfil=row["foto_perfil"],
+            avaliacoes_media=row["avaliacoes_media"],
+            total_pacientes=row["total_pacientes"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[Nutricionista]:
     with get_connection() as conn:
         cursor = conn.cursor()
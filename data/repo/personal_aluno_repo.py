@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.personal_aluno_model import PersonalAluno
 from data.sql.personal_aluno_sql import *
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -66,6 +66,22 @@ def obter_por_id(id: int) -> Optional[PersonalAluno]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, PersonalAluno]:
+    rows = consultar_por_ids(OBTER_POR_IDS_PERSONAL_ALUNO, ids)
+    return {
+        row["id"]: PersonalAluno(
+            id=row["id"],
+            personal_id=row["personal_id"],
+            aluno_id=row["aluno_id"],
+            data_inicio=row["data_inicio"],
+            data_fim=row["data_fim"],
+            status=row["status"],
+            objetivo=row["objetivo"],
+            observacoes=row["observacoes"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[PersonalAluno]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -102,3 +118,11 @@ def obter_alunos_por_personal(personal_id: int) -> list[PersonalAluno]:
                 observacoes=row["observacoes"]
             ) for row in rows
         ]
+
+
+def obter_alunos_detalhados_por_personal(personal_id: int) -> list[dict]:
+    """Alunos do personal já com nome e email do usuário, em uma única consulta"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ALUNOS_DETALHADOS_POR_PERSONAL, (personal_id,))
+        return [dict(row) for row in cursor.fetchall()]
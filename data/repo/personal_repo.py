@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.personal_model import Personal
 from data.sql.personal_sql import *
-from util.db_util import get_connection
+from util.cache_util import cache_catalogo
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -10,6 +11,7 @@ def criar_tabela() -> bool:
         conn.commit()
         return True
 
+@cache_catalogo.invalida("profissional")
 def inserir(personal: Personal) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -29,6 +31,7 @@ def inserir(personal: Personal) -> Optional[int]:
         conn.commit()
         return cursor.lastrowid
 
+@cache_catalogo.invalida("profissional")
 def alterar(personal: Personal) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -48,6 +51,7 @@ def alterar(personal: Personal) -> bool:
         conn.commit()
         return cursor.rowcount > 0
 
+@cache_catalogo.invalida("profissional")
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -78,6 +82,27 @@ def obter_por_id(id: int) -> Optional[Personal]:
         return None
 
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Personal]:
+    rows = consultar_por_ids(OBTER_POR_IDS_PERSONAL, ids)
+    return {
+        row["id"]: Personal(
+            id=row["id"],
+            profissional_id=row["profissional_id"],
+            cref=row["cref"],
+            especialidades=row["especialidades"],
+            biografia=row["biografia"],
+            anos_experiencia=row["anos_experiencia"],
+            valor_mensalidade=row["valor_mensalidade"],
+            status=row["status"],
+            data_cadastro=row["data_cadastro"],
+            foto_perfil=row["foto_perfil"],
+            avaliacoes_media=row["avaliacoes_media"],
+            total_alunos=row["total_alunos"]
+        )
+        for row in rows
+    }
+
+
 def obter_todos() -> list[Personal]:
     with get_connection() as conn:
         cursor = conn.cursor()
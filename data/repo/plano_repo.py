@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.plano_model import Plano
 from data.sql.plano_sql import *
-from util.db_util import get_connection
+from util.cache_util import cache_catalogo
+from util.db_util import consultar_por_ids, get_connection
+from data.repo.estatisticas_repo import invalida_estatisticas_admin
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -9,6 +11,8 @@ def criar_tabela() -> bool:
         cursor.execute(CRIAR_TABELA_PLANO)
         return cursor.rowcount > 0
 
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("plano")
 def inserir(plano: Plano) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -21,6 +25,8 @@ def inserir(plano: Plano) -> Optional[int]:
         conn.commit()
         return cursor.lastrowid
     
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("plano")
 def alterar(plano: Plano) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -35,12 +41,15 @@ def alterar(plano: Plano) -> bool:
         return cursor.rowcount > 0
 
 
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("plano")
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR_PLANO, (id,))
         return cursor.rowcount > 0
 
+@cache_catalogo.em_cache("plano")
 def obter_por_id(id: int) -> Optional[Plano]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -58,6 +67,21 @@ def obter_por_id(id: int) -> Optional[Plano]:
         return None
     
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Plano]:
+    rows = consultar_por_ids(OBTER_POR_IDS_PLANO, ids)
+    return {
+        row["id"]: Plano(
+            id=row["id"],
+            nome=row["nome"],
+            descricao=row["descricao"],
+            preco=row["preco"],
+            duracao_dias=row["duracao_dias"],
+            ativo=row["ativo"]
+        )
+        for row in rows
+    }
+
+@cache_catalogo.em_cache("plano")
 def obter_por_tipo(tipo: str) -> list[Plano]:
     """Obter planos gratuitos ou pagos"""
     with get_connection() as conn:
@@ -79,6 +103,7 @@ def obter_por_tipo(tipo: str) -> list[Plano]:
             ) for row in rows
         ]
 
+@cache_catalogo.em_cache("plano")
 def obter_todos() -> list[Plano]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -1,12 +1,18 @@
-from typing import Optional, List
+import logging
+from typing import Optional, List, Iterable
 from datetime import datetime
 from dataclasses import dataclass
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
+from util.cache_util import cache_catalogo
+from util.paginacao import Pagina, TAMANHO_PAGINA_PADRAO, limitar_tamanho, montar_pagina
+from data.repo.estatisticas_repo import invalida_estatisticas_admin
 from data.model.profissional_model import Profissional
 from data.model.usuario_model import Usuario
 from data.repo import usuario_repo
 from data.sql.profissional_sql import *
 
+logger = logging.getLogger(__name__)
+
 # Função para criar a tabela (chame uma vez no setup)
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -18,6 +24,8 @@ def criar_tabela() -> bool:
 
 # Inserir um novo profissional
 # data/repo/profissional_repo.py - MODIFICAR INSERIR
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("profissional")
 def inserir(prof: Profissional) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -36,6 +44,8 @@ def inserir(prof: Profissional) -> Optional[int]:
         return cursor.lastrowid
 
 # Alterar profissional + dados de usuário
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("profissional")
 def alterar(prof: Profissional, usuario: Usuario) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -57,6 +67,8 @@ def alterar(prof: Profissional, usuario: Usuario) -> bool:
         return cursor.rowcount > 0
 
 # Excluir profissional + usuário
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("profissional")
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -85,6 +97,23 @@ def obter_por_id(id: int) -> Optional[Profissional]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Profissional]:
+    rows = consultar_por_ids(OBTER_POR_IDS_PROFISSIONAL, ids)
+    return {
+        row["id"]: Profissional(
+            id=row["id"],
+            especialidade=row["especialidade"],
+            registro_profissional=row["registro_profissional"] if "registro_profissional" in row.keys() else None,
+            status=row["status"],
+            data_solicitacao=row["data_solicitacao"],
+            data_aprovacao=row["data_aprovacao"],
+            aprovado_por=row["aprovado_por"] if "aprovado_por" in row.keys() else None,
+            cpf_cnpj=row["cpf_cnpj"] if "cpf_cnpj" in row.keys() else None,
+            foto_registro=row["foto_registro"] if "foto_registro" in row.keys() else None
+        )
+        for row in rows
+    }
+
 # Obter todos os profissionais
 def obter_todos() -> List[Profissional]:
     with get_connection() as conn:
@@ -114,6 +143,14 @@ def obter_pendentes() -> list[dict]:
         rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
+# Obter os pendentes mais recentes (resumo do dashboard)
+def obter_pendentes_recentes(limite: int = 5) -> list[dict]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_PENDENTES_RECENTES, (limite,))
+        rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
 # Obter todos com status + nome do admin
 def obter_todos_com_status() -> list[dict]:
     with get_connection() as conn:
@@ -122,6 +159,29 @@ def obter_todos_com_status() -> list[dict]:
         rows = cursor.fetchall()
         return [dict(row) for row in rows]
     
+def obter_pagina_com_status(status: Optional[str] = None, apos_nome: Optional[str] = None,
+                            apos_id: int = 0, tamanho: int = TAMANHO_PAGINA_PADRAO) -> Pagina:
+    """
+    Página de profissionais (com nome, email e quem aprovou) ordenada por (nome, id)
+
+    Args:
+        status: Filtra pelo status ('pendente', 'aprovado', 'rejeitado', 'inativo')
+        apos_nome, apos_id: Cursor do último profissional da página anterior
+        tamanho: Itens por página, limitado a TAMANHO_PAGINA_MAXIMO
+    """
+    tamanho = limitar_tamanho(tamanho)
+    cursor_nome = apos_nome if apos_nome is not None else ""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if status:
+            cursor.execute(OBTER_PAGINA_COM_STATUS_POR_STATUS, (status, cursor_nome, apos_id, tamanho + 1))
+        else:
+            cursor.execute(OBTER_PAGINA_COM_STATUS, (cursor_nome, apos_id, tamanho + 1))
+        rows = [dict(row) for row in cursor.fetchall()]
+        return montar_pagina(rows, tamanho, lambda p: (p["nome"], p["id"]))
+
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("profissional")
 def aprovar(profissional_id: int, admin_id: Optional[int] = None) -> bool:
     if not profissional_id:
         return False
@@ -137,9 +197,11 @@ def aprovar(profissional_id: int, admin_id: Optional[int] = None) -> bool:
 
         cursor.execute(APROVAR_PROFISSIONAL, (admin_id, profissional_id))
         conn.commit()
-        print(f"[ADMIN] Usuario {admin_id} aprovou profissional {profissional_id}")
+        logger.info("Usuario %s aprovou profissional %s", admin_id, profissional_id)
         return cursor.rowcount > 0
 
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("profissional")
 def rejeitar(profissional_id: int, admin_id: Optional[int] = None) -> bool:
     if not profissional_id:
         return False
@@ -153,11 +215,13 @@ def rejeitar(profissional_id: int, admin_id: Optional[int] = None) -> bool:
 
         cursor.execute(REJEITAR_PROFISSIONAL, (admin_id, profissional_id))
         conn.commit()
-        print(f"[ADMIN] Usuario {admin_id} rejeitou profissional {profissional_id}")
+        logger.info("Usuario %s rejeitou profissional %s", admin_id, profissional_id)
         return cursor.rowcount > 0
 
 
 # Desativar profissional (status inativo)
+@invalida_estatisticas_admin
+@cache_catalogo.invalida("profissional")
 def desativar(profissional_id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
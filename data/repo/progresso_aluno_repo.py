@@ -1,9 +1,9 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.progresso_aluno_model import ProgressoAluno
 from data.model.treino_personalizado_model import TreinoPersonalizado
 from data.sql.progresso_aluno_sql import *
 from data.sql.treino_personalizado import OBTER_TODOS_TREINO_PERSONALIZADO
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -72,6 +72,23 @@ def obter_por_id(id: int) -> Optional[ProgressoAluno]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, ProgressoAluno]:
+    rows = consultar_por_ids(OBTER_POR_IDS_PROGRESSO_ALUNO, ids)
+    return {
+        row["id"]: ProgressoAluno(
+            id=row["id"],
+            personal_aluno_id=row["personal_aluno_id"],
+            data_registro=row["data_registro"],
+            peso=row["peso"],
+            medidas=row["medidas"],
+            fotos=row["fotos"],
+            observacoes=row["observacoes"],
+            humor=row["humor"],
+            energia=row["energia"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[ProgressoAluno]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -110,6 +127,13 @@ def obter_por_aluno(personal_aluno_id: int) -> list[ProgressoAluno]:
             ) for row in rows
         ]
 
+def obter_por_personal(personal_id: int) -> list[dict]:
+    """Progressos de todos os alunos do personal com o nome do aluno, em uma única consulta"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_PROGRESSOS_POR_PERSONAL, (personal_id,))
+        return [dict(row) for row in cursor.fetchall()]
+
 def obter_todos() -> list[TreinoPersonalizado]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -0,0 +1,55 @@
+from typing import Optional
+from data.sql.sessao_sql import *
+from util.db_util import get_connection
+
+def criar_tabela() -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA_SESSAO)
+        cursor.execute(CRIAR_INDICE_SESSAO_USUARIO)
+        cursor.execute(CRIAR_INDICE_SESSAO_EXPIRA)
+        return True
+
+def inserir(sid: str, usuario_id: int, duracao_segundos: int) -> None:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERIR_SESSAO, (sid, usuario_id, f"+{duracao_segundos} seconds"))
+        conn.commit()
+
+def obter_com_usuario(sid: str) -> Optional[dict]:
+    """Dados do usuário da sessão e segundos até expirar (None se não existe ou expirou)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_SESSAO_COM_USUARIO, (sid,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+def renovar(sid: str, duracao_segundos: int) -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(RENOVAR_SESSAO, (f"+{duracao_segundos} seconds", sid))
+        conn.commit()
+        return cursor.rowcount > 0
+
+def excluir(sid: str) -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_SESSAO, (sid,))
+        conn.commit()
+        return cursor.rowcount > 0
+
+def excluir_por_usuario(usuario_id: int) -> list[str]:
+    """Revoga todas as sessões de um usuário; retorna os ids excluídos"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_SESSOES_USUARIO, (usuario_id,))
+        sids = [row["sid"] for row in cursor.fetchall()]
+        conn.commit()
+        return sids
+
+def excluir_expiradas() -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_SESSOES_EXPIRADAS)
+        conn.commit()
+        return cursor.rowcount
@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.sessao_treino_model import SessaoTreino
 from data.sql.sessao_treino_sql import *
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -66,6 +66,22 @@ def obter_por_id(id: int) -> Optional[SessaoTreino]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, SessaoTreino]:
+    rows = consultar_por_ids(OBTER_POR_IDS_SESSAO_TREINO, ids)
+    return {
+        row["id"]: SessaoTreino(
+            id=row["id"],
+            treino_id=row["treino_id"],
+            nome=row["nome"],
+            ordem=row["ordem"],
+            dia_semana=row["dia_semana"],
+            descricao=row["descricao"],
+            tempo_estimado=row["tempo_estimado"],
+            status=row["status"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[SessaoTreino]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Optional, Iterable
 from data.model.treino_personalizado_model import TreinoPersonalizado
 from data.sql.treino_personalizado import *
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -86,6 +86,29 @@ def obter_por_id(id: int) -> Optional[TreinoPersonalizado]:
                 atualizado_em=row["atualizado_em"]
             ) 
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, TreinoPersonalizado]:
+    rows = consultar_por_ids(OBTER_POR_IDS_TREINO_PERSONALIZADO, ids)
+    return {
+        row["id"]: TreinoPersonalizado(
+            id=row["id"],
+            personal_aluno_id=row["personal_aluno_id"],
+            nome=row["nome"],
+            descricao=row["descricao"],
+            objetivo=row["objetivo"],
+            nivel_dificuldade=row["nivel_dificuldade"],
+            duracao_semanas=row["duracao_semanas"],
+            dias_semana=row["dias_semana"],
+            divisao_treino=row["divisao_treino"],
+            observacoes=row["observacoes"],
+            status=row["status"],
+            data_inicio=row["data_inicio"],
+            data_fim=row["data_fim"],
+            criado_em=row["criado_em"],
+            atualizado_em=row["atualizado_em"]
+        )
+        for row in rows
+    }
+
 def obter_por_aluno(id: int) -> Optional[TreinoPersonalizado]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -112,6 +135,13 @@ def obter_por_aluno(id: int) -> Optional[TreinoPersonalizado]:
             ))
         return treinos
 
+def obter_por_personal(personal_id: int) -> list[dict]:
+    """Treinos ativos de todos os alunos do personal com o nome do aluno, em uma única consulta"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_TREINOS_POR_PERSONAL, (personal_id,))
+        return [dict(row) for row in cursor.fetchall()]
+
 
 
 # OBTER_POR_ALUNO = """
@@ -1,7 +1,7 @@
-from typing import Optional
-from model.treino_model import Treino
-from sql.treino_sql import *
-from util.db_util import get_connection
+from typing import Optional, Iterable
+from data.model.treino_model import Treino
+from data.sql.treino_sql import *
+from util.db_util import consultar_por_ids, get_connection
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -51,6 +51,18 @@ def obter_por_id(id: int) -> Optional[Treino]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Treino]:
+    rows = consultar_por_ids(OBTER_POR_IDS_TREINO, ids)
+    return {
+        row["id"]: Treino(
+            id=row["id"],
+            nome=row["nome"],
+            descricao=row["descricao"],
+            gratuito=row["gratuito"]
+        )
+        for row in rows
+    }
+
 def obter_todos() -> list[Treino]:
     with get_connection() as conn:
         cursor = conn.cursor()
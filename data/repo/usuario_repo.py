@@ -1,7 +1,9 @@
-from typing import Optional, List
+from typing import Optional, List, Iterable
 from data.model.usuario_model import Usuario
 from data.sql.usuario_sql import *
-from util.db_util import get_connection
+from util.db_util import consultar_por_ids, get_connection
+from util.paginacao import Pagina, TAMANHO_PAGINA_PADRAO, limitar_tamanho, montar_pagina
+from data.repo.estatisticas_repo import invalida_estatisticas_admin
 
 def criar_tabela() -> bool:
     with get_connection() as conn:
@@ -10,6 +12,7 @@ def criar_tabela() -> bool:
         conn.commit()
         return True
 
+@invalida_estatisticas_admin
 def inserir(usuario: Usuario) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -22,6 +25,7 @@ def inserir(usuario: Usuario) -> Optional[int]:
         conn.commit()
         return cursor.lastrowid
 
+@invalida_estatisticas_admin
 def alterar(usuario: Usuario) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -35,6 +39,7 @@ def alterar(usuario: Usuario) -> bool:
         conn.commit()
         return cursor.rowcount > 0
 
+@invalida_estatisticas_admin
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -61,6 +66,23 @@ def obter_por_id(id: int) -> Optional[Usuario]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Usuario]:
+    rows = consultar_por_ids(OBTER_POR_IDS_USUARIO, ids)
+    return {
+        row["id"]: Usuario(
+            id=row["id"],
+            nome=row["nome"],
+            email=row["email"],
+            senha=row["senha"],
+            perfil=row["perfil"],
+            foto=row["foto"],
+            token_redefinicao=row["token_redefinicao"],
+            data_token=row["data_token"],
+            data_cadastro=row["data_cadastro"]
+        )
+        for row in rows
+    }
+
 def obter_por_email(email: str) -> Optional[Usuario]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -120,6 +142,41 @@ def obter_todos_por_perfil(perfil: str) -> List[Usuario]:
             for row in rows
         ]
 
+def obter_pagina(perfil: Optional[str] = None, apos_nome: Optional[str] = None,
+                 apos_id: int = 0, tamanho: int = TAMANHO_PAGINA_PADRAO) -> Pagina:
+    """
+    Retorna uma página de usuários ordenada por (nome, id)
+
+    Args:
+        perfil: Filtra pelo perfil ('cliente', 'profissional', 'admin'); None traz todos
+        apos_nome, apos_id: Cursor do último usuário da página anterior (None na primeira)
+        tamanho: Itens por página, limitado a TAMANHO_PAGINA_MAXIMO
+    """
+    tamanho = limitar_tamanho(tamanho)
+    cursor_nome = apos_nome if apos_nome is not None else ""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if perfil:
+            cursor.execute(OBTER_PAGINA_USUARIO_POR_PERFIL, (perfil, cursor_nome, apos_id, tamanho + 1))
+        else:
+            cursor.execute(OBTER_PAGINA_USUARIO, (cursor_nome, apos_id, tamanho + 1))
+        rows = cursor.fetchall()
+        usuarios = [
+            Usuario(
+                id=row["id"],
+                nome=row["nome"],
+                email=row["email"],
+                senha=row["senha"],
+                perfil=row["perfil"],
+                foto=row["foto"],
+                token_redefinicao=row["token_redefinicao"],
+                data_token=row["data_token"],
+                data_cadastro=row["data_cadastro"]
+            )
+            for row in rows
+        ]
+        return montar_pagina(usuarios, tamanho, lambda u: (u.nome, u.id))
+
 def atualizar_senha(usuario_id: int, nova_senha_hash: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
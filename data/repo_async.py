@@ -0,0 +1,31 @@
+"""
+Versões assíncronas dos repositórios
+
+Cada nome abaixo expõe as mesmas funções do módulo correspondente em
+data/repo (obter_por_id, obter_todos, inserir, alterar, excluir...), mas
+como corrotinas executadas no pool de threads do banco. As rotas devem
+importar daqui e usar `await`:
+
+    from data.repo_async import plano_repo
+
+    planos = await plano_repo.obter_todos()
+"""
+from util.db_async import RepoAsync
+
+
+artigo_repo = RepoAsync("data.repo.artigo_repo")
+assinatura_repo = RepoAsync("data.repo.assinatura_repo")
+avaliacao_fisica_repo = RepoAsync("data.repo.avaliacao_fisica_repo")
+cliente_repo = RepoAsync("data.repo.cliente_repo")
+dieta_repo = RepoAsync("data.repo.dieta_repo")
+estatisticas_repo = RepoAsync("data.repo.estatisticas_repo")
+nutricionista_repo = RepoAsync("data.repo.nutricionista_repo")
+personal_aluno_repo = RepoAsync("data.repo.personal_aluno_repo")
+personal_repo = RepoAsync("data.repo.personal_repo")
+plano_repo = RepoAsync("data.repo.plano_repo")
+profissional_repo = RepoAsync("data.repo.profissional_repo")
+progresso_aluno_repo = RepoAsync("data.repo.progresso_aluno_repo")
+sessao_treino_repo = RepoAsync("data.repo.sessao_treino_repo")
+treino_personalizado_repo = RepoAsync("data.repo.treino_personalizado_repo")
+treino_repo = RepoAsync("data.repo.treino_repo")
+usuario_repo = RepoAsync("data.repo.usuario_repo")
@@ -35,6 +35,15 @@ INNER JOIN usuario u ON p.id = u.id
 WHERE a.id=?
 """
 
+OBTER_POR_IDS_ARTIGO = """
+SELECT a.id, a.profissional_id, a.titulo, a.conteudo, a.gratuito, a.data_publicacao,
+       u.nome, u.email
+FROM artigo a
+INNER JOIN profissional p ON a.profissional_id = p.id
+INNER JOIN usuario u ON p.id = u.id
+WHERE a.id IN ({marcadores})
+"""
+
 OBTER_TODOS_ARTIGO = """
 SELECT a.id, a.profissional_id, a.titulo, a.conteudo, a.gratuito, a.data_publicacao,
        u.nome, u.email
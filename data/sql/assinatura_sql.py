@@ -37,6 +37,16 @@ INNER JOIN plano p ON a.plano_id = p.id
 WHERE a.id=?
 """
 
+OBTER_POR_IDS_ASSINATURA = """
+SELECT a.id, a.cliente_id, a.plano_id, a.data_inicio, a.data_fim, a.status,
+       u.nome, u.email, p.nome AS plano_nome
+FROM assinatura a
+INNER JOIN cliente c ON a.cliente_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+INNER JOIN plano p ON a.plano_id = p.id
+WHERE a.id IN ({marcadores})
+"""
+
 OBTER_TODOS_ASSINATURA = """
 SELECT a.id, a.cliente_id, a.plano_id, a.data_inicio, a.data_fim, a.status,
        u.nome, u.email, p.nome AS plano_nome
@@ -45,6 +45,15 @@ INNER JOIN usuario u ON c.id = u.id
 WHERE af.id=?
 """
 
+OBTER_POR_IDS_AVALIACAO_FISICA = """
+SELECT af.*, u.nome AS aluno_nome
+FROM avaliacao_fisica af
+INNER JOIN personal_aluno pa ON af.personal_aluno_id = pa.id
+INNER JOIN cliente c ON pa.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE af.id IN ({marcadores})
+"""
+
 OBTER_TODOS_AVALIACAO_FISICA = """
 SELECT af.*, u.nome AS aluno_nome
 FROM avaliacao_fisica af
@@ -59,3 +68,13 @@ SELECT * FROM avaliacao_fisica
 WHERE personal_aluno_id=?
 ORDER BY data_avaliacao DESC
 """
+
+OBTER_AVALIACOES_POR_PERSONAL = """
+SELECT af.*, u.nome AS aluno_nome
+FROM avaliacao_fisica af
+INNER JOIN personal_aluno pa ON af.personal_aluno_id = pa.id
+INNER JOIN cliente c ON pa.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE pa.personal_id=?
+ORDER BY af.data_avaliacao DESC, u.nome
+"""
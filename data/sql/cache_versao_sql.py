@@ -0,0 +1,32 @@
+# Comandos SQL da tabela de versões usada pelo cache de catálogo (util/cache_util.py)
+
+CRIAR_TABELA_CACHE_VERSAO = """
+CREATE TABLE IF NOT EXISTS cache_versao (
+    nome TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+# Grupos de cache existentes; novos grupos são criados pelo INCREMENTAR
+INSERIR_GRUPOS_CACHE_VERSAO = """
+INSERT OR IGNORE INTO cache_versao (nome) VALUES ('plano'), ('dieta'), ('artigo')
+"""
+
+# Migração 5: grupo do contexto do profissional logado (util/contexto_profissional.py)
+INSERIR_GRUPO_PROFISSIONAL_CACHE_VERSAO = """
+INSERT OR IGNORE INTO cache_versao (nome) VALUES ('profissional')
+"""
+
+INCREMENTAR_CACHE_VERSAO = """
+INSERT INTO cache_versao (nome, versao) VALUES (?, 1)
+ON CONFLICT (nome) DO UPDATE SET versao = versao + 1
+RETURNING versao
+"""
+
+OBTER_TODAS_CACHE_VERSAO = """
+SELECT nome, versao FROM cache_versao
+"""
+
+OBTER_DATA_VERSION = """
+PRAGMA data_version
+"""
@@ -30,9 +30,23 @@ INNER JOIN usuario u ON c.id = u.id
 WHERE c.id=?
 """
 
+OBTER_POR_IDS_CLIENTE = """
+SELECT c.id, c.plano_id, u.nome, u.email, u.senha
+FROM cliente c
+INNER JOIN usuario u ON c.id = u.id
+WHERE c.id IN ({marcadores})
+"""
+
 OBTER_TODOS_CLIENTE = """
 SELECT c.id, c.plano_id, u.nome, u.email, u.senha
 FROM cliente c
 INNER JOIN usuario u ON c.id = u.id
 ORDER BY u.nome
 """
+
+OBTER_TODOS_CLIENTE_RESUMO = """
+SELECT c.id, u.nome, u.email
+FROM cliente c
+INNER JOIN usuario u ON c.id = u.id
+ORDER BY u.nome
+"""
@@ -29,6 +29,12 @@ FROM dieta
 WHERE id=?
 """
 
+OBTER_POR_IDS_DIETA = """
+SELECT id, nome, descricao, gratuito
+FROM dieta
+WHERE id IN ({marcadores})
+"""
+
 OBTER_TODOS_DIETA = """
 SELECT id, nome, descricao, gratuito
 FROM dieta
@@ -0,0 +1,74 @@
+# Comandos SQL para a fila de emails (outbox) drenada pelo util/email_worker.py
+
+CRIAR_TABELA_EMAIL_SAIDA = """
+CREATE TABLE IF NOT EXISTS email_saida (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    destinatario TEXT NOT NULL,
+    assunto TEXT NOT NULL,
+    mensagem TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ultimo_erro TEXT,
+    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    enviado_em TIMESTAMP
+);
+"""
+
+CRIAR_INDICE_EMAIL_SAIDA_FILA = """
+CREATE INDEX IF NOT EXISTS idx_email_saida_fila ON email_saida (status, proxima_tentativa)
+"""
+
+INSERIR_EMAIL_SAIDA = """
+INSERT INTO email_saida (destinatario, assunto, mensagem)
+VALUES (?, ?, ?)
+"""
+
+# Reserva um lote para envio. O status 'enviando' com proxima_tentativa no
+# futuro funciona como uma trava com prazo: se o worker morrer no meio do
+# envio, o email volta a ser elegível quando o prazo vence.
+RESERVAR_LOTE_EMAIL_SAIDA = """
+UPDATE email_saida
+SET status = 'enviando', proxima_tentativa = datetime('now', ?)
+WHERE id IN (
+    SELECT id FROM email_saida
+    WHERE status IN ('pendente', 'enviando') AND proxima_tentativa <= datetime('now')
+    ORDER BY proxima_tentativa, id
+    LIMIT ?
+)
+RETURNING id, destinatario, assunto, mensagem, tentativas
+"""
+
+# A mensagem pode conter dados sensíveis (ex: a senha temporária da
+# recuperação), então o texto é apagado quando o email sai da fila
+# ('enviado' ou 'falhou'); ficam só destinatário, assunto e status.
+MARCAR_ENVIADO_EMAIL_SAIDA = """
+UPDATE email_saida
+SET status = 'enviado', enviado_em = CURRENT_TIMESTAMP, ultimo_erro = NULL, mensagem = ''
+WHERE id = ?
+"""
+
+REGISTRAR_FALHA_EMAIL_SAIDA = """
+UPDATE email_saida
+SET status = ?1, tentativas = tentativas + 1, ultimo_erro = ?2, proxima_tentativa = datetime('now', ?3),
+    mensagem = CASE WHEN ?1 = 'falhou' THEN '' ELSE mensagem END
+WHERE id = ?4
+"""
+
+# Servidor SMTP indisponível: volta à fila sem contar tentativa
+ADIAR_EMAIL_SAIDA = """
+UPDATE email_saida
+SET status = 'pendente', ultimo_erro = ?, proxima_tentativa = datetime('now', ?)
+WHERE id = ?
+"""
+
+# Migração 6: apaga o texto dos emails que já saíram da fila
+APAGAR_MENSAGENS_FINALIZADAS_EMAIL_SAIDA = """
+UPDATE email_saida SET mensagem = '' WHERE status IN ('enviado', 'falhou') AND mensagem <> ''
+"""
+
+CONTAR_POR_STATUS_EMAIL_SAIDA = """
+SELECT status, COUNT(*) AS quantidade
+FROM email_saida
+GROUP BY status
+"""
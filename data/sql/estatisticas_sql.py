@@ -0,0 +1,34 @@
+ESTATISTICAS_DASHBOARD_PERSONAL = """
+SELECT
+    COUNT(*) AS total_alunos,
+    COALESCE(SUM(pa.status = 'ativo'), 0) AS alunos_ativos,
+    COALESCE(SUM(t.quantidade), 0) AS total_treinos,
+    COALESCE(SUM(a.quantidade), 0) AS total_avaliacoes
+FROM personal_aluno pa
+INNER JOIN cliente c ON pa.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+LEFT JOIN (
+    SELECT personal_aluno_id, COUNT(*) AS quantidade
+    FROM treino_personalizado
+    WHERE status = 'ativo'
+      AND personal_aluno_id IN (SELECT id FROM personal_aluno WHERE personal_id = ?)
+    GROUP BY personal_aluno_id
+) t ON t.personal_aluno_id = pa.id
+LEFT JOIN (
+    SELECT personal_aluno_id, COUNT(*) AS quantidade
+    FROM avaliacao_fisica
+    WHERE personal_aluno_id IN (SELECT id FROM personal_aluno WHERE personal_id = ?)
+    GROUP BY personal_aluno_id
+) a ON a.personal_aluno_id = pa.id
+WHERE pa.personal_id = ?
+"""
+
+ESTATISTICAS_DASHBOARD_ADMIN = """
+SELECT
+    (SELECT COUNT(*) FROM usuario) AS total_usuarios,
+    (SELECT COUNT(*) FROM cliente c INNER JOIN usuario u ON c.id = u.id) AS total_clientes,
+    (SELECT COUNT(*) FROM profissional p INNER JOIN usuario u ON p.id = u.id) AS total_profissionais,
+    (SELECT COUNT(*) FROM plano WHERE ativo = 1) AS total_planos,
+    (SELECT COUNT(*) FROM profissional p INNER JOIN usuario u ON p.id = u.id
+     WHERE p.status = 'pendente') AS profissionais_pendentes
+"""
@@ -0,0 +1,72 @@
+CRIAR_TABELA_SCHEMA_VERSION = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    versao INTEGER PRIMARY KEY,
+    descricao TEXT NOT NULL,
+    aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+OBTER_VERSAO_ATUAL = """
+SELECT COALESCE(MAX(versao), 0) AS versao FROM schema_version
+"""
+
+REGISTRAR_VERSAO = """
+INSERT INTO schema_version (versao, descricao) VALUES (?, ?)
+"""
+
+CRIAR_TABELA_MIGRACAO_PENDENTE = """
+CREATE TABLE IF NOT EXISTS migracao_pendente (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    versao INTEGER NOT NULL,
+    tabela TEXT NOT NULL,
+    instrucao TEXT NOT NULL UNIQUE
+);
+"""
+
+REGISTRAR_PENDENTE = """
+INSERT OR IGNORE INTO migracao_pendente (versao, tabela, instrucao) VALUES (?, ?, ?)
+"""
+
+OBTER_PENDENTES = """
+SELECT id, versao, tabela, instrucao FROM migracao_pendente ORDER BY id
+"""
+
+REMOVER_PENDENTE = """
+DELETE FROM migracao_pendente WHERE id = ?
+"""
+
+TABELA_EXISTE = """
+SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?
+"""
+
+# Migração 1: índices das chaves estrangeiras e das colunas usadas em
+# WHERE/ORDER BY pelas consultas de data/sql. Cada item é (tabela, SQL).
+INDICES_SECUNDARIOS = [
+    ("usuario", "CREATE INDEX IF NOT EXISTS idx_usuario_perfil_nome ON usuario (perfil, nome)"),
+    ("usuario", "CREATE INDEX IF NOT EXISTS idx_usuario_nome ON usuario (nome)"),
+    ("profissional", "CREATE INDEX IF NOT EXISTS idx_profissional_status_solicitacao ON profissional (status, data_solicitacao)"),
+    ("profissional", "CREATE INDEX IF NOT EXISTS idx_profissional_aprovado_por ON profissional (aprovado_por)"),
+    ("cliente", "CREATE INDEX IF NOT EXISTS idx_cliente_plano ON cliente (plano_id)"),
+    ("plano", "CREATE INDEX IF NOT EXISTS idx_plano_ativo_preco ON plano (ativo, preco)"),
+    ("personal", "CREATE INDEX IF NOT EXISTS idx_personal_profissional ON personal (profissional_id)"),
+    ("personal", "CREATE INDEX IF NOT EXISTS idx_personal_status ON personal (status)"),
+    ("personal_aluno", "CREATE INDEX IF NOT EXISTS idx_personal_aluno_personal ON personal_aluno (personal_id, aluno_id)"),
+    ("personal_aluno", "CREATE INDEX IF NOT EXISTS idx_personal_aluno_aluno ON personal_aluno (aluno_id)"),
+    ("personal_aluno", "CREATE INDEX IF NOT EXISTS idx_personal_aluno_data_inicio ON personal_aluno (data_inicio)"),
+    ("treino_personalizado", "CREATE INDEX IF NOT EXISTS idx_treino_personalizado_aluno ON treino_personalizado (personal_aluno_id, status, criado_em)"),
+    ("treino_personalizado", "CREATE INDEX IF NOT EXISTS idx_treino_personalizado_criado_em ON treino_personalizado (criado_em)"),
+    ("avaliacao_fisica", "CREATE INDEX IF NOT EXISTS idx_avaliacao_fisica_aluno_data ON avaliacao_fisica (personal_aluno_id, data_avaliacao)"),
+    ("avaliacao_fisica", "CREATE INDEX IF NOT EXISTS idx_avaliacao_fisica_data ON avaliacao_fisica (data_avaliacao)"),
+    ("progresso_aluno", "CREATE INDEX IF NOT EXISTS idx_progresso_aluno_aluno_data ON progresso_aluno (personal_aluno_id, data_registro)"),
+    ("progresso_aluno", "CREATE INDEX IF NOT EXISTS idx_progresso_aluno_data ON progresso_aluno (data_registro)"),
+    ("sessao_treino", "CREATE INDEX IF NOT EXISTS idx_sessao_treino_treino ON sessao_treino (treino_id, status, ordem)"),
+    ("exercicio_sessao", "CREATE INDEX IF NOT EXISTS idx_exercicio_sessao_sessao ON exercicio_sessao (sessao_id, ordem)"),
+    ("exercicio_sessao", "CREATE INDEX IF NOT EXISTS idx_exercicio_sessao_exercicio ON exercicio_sessao (exercicio_id)"),
+    ("assinatura", "CREATE INDEX IF NOT EXISTS idx_assinatura_cliente ON assinatura (cliente_id, status)"),
+    ("assinatura", "CREATE INDEX IF NOT EXISTS idx_assinatura_plano ON assinatura (plano_id)"),
+    ("artigo", "CREATE INDEX IF NOT EXISTS idx_artigo_profissional ON artigo (profissional_id)"),
+    ("artigo", "CREATE INDEX IF NOT EXISTS idx_artigo_data_publicacao ON artigo (data_publicacao)"),
+    ("nutricionista", "CREATE INDEX IF NOT EXISTS idx_nutricionista_profissional ON nutricionista (profissional_id)"),
+    ("nutricionista", "CREATE INDEX IF NOT EXISTS idx_nutricionista_status ON nutricionista (status)"),
+    ("dieta", "CREATE INDEX IF NOT EXISTS idx_dieta_nome ON dieta (nome)"),
+]
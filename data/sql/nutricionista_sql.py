@@ -45,6 +45,14 @@ INNER JOIN usuario u ON prof.id = u.id
 WHERE n.id=?
 """
 
+OBTER_POR_IDS_NUTRICIONISTA = """
+SELECT n.*, u.nome, u.email, prof.especialidade
+FROM nutricionista n
+INNER JOIN profissional prof ON n.profissional_id = prof.id
+INNER JOIN usuario u ON prof.id = u.id
+WHERE n.id IN ({marcadores})
+"""
+
 OBTER_TODOS_NUTRICIONISTA = """
 SELECT n.*, u.nome, u.email, prof.especialidade
 FROM nutricionista n
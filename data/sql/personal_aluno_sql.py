@@ -40,6 +40,14 @@ INNER JOIN usuario u ON c.id = u.id
 WHERE pa.id=?
 """
 
+OBTER_POR_IDS_PERSONAL_ALUNO = """
+SELECT pa.*, u.nome AS aluno_nome, u.email AS aluno_email
+FROM personal_aluno pa
+INNER JOIN cliente c ON pa.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE pa.id IN ({marcadores})
+"""
+
 OBTER_TODOS_PERSONAL_ALUNO = """
 SELECT pa.*, u.nome AS aluno_nome, u.email AS aluno_email
 FROM personal_aluno pa
@@ -56,3 +64,14 @@ INNER JOIN usuario u ON c.id = u.id
 WHERE pa.personal_id=?
 ORDER BY u.nome
 """
+
+OBTER_ALUNOS_DETALHADOS_POR_PERSONAL = """
+SELECT pa.id, pa.personal_id, pa.aluno_id, pa.data_inicio, pa.data_fim,
+       pa.status, pa.objetivo, pa.observacoes,
+       u.nome AS nome, u.email AS email
+FROM personal_aluno pa
+INNER JOIN cliente c ON pa.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE pa.personal_id=?
+ORDER BY u.nome
+"""
@@ -45,6 +45,14 @@ INNER JOIN usuario u ON prof.id = u.id
 WHERE p.id=?
 """
 
+OBTER_POR_IDS_PERSONAL = """
+SELECT p.*, u.nome, u.email, prof.especialidade
+FROM personal p
+INNER JOIN profissional prof ON p.profissional_id = prof.id
+INNER JOIN usuario u ON prof.id = u.id
+WHERE p.id IN ({marcadores})
+"""
+
 OBTER_TODOS_PERSONAL = """
 SELECT p.*, u.nome, u.email, prof.especialidade
 FROM personal p
@@ -37,4 +37,10 @@ OBTER_POR_ID_PLANO = """
 SELECT id, nome, descricao, preco, duracao_dias, ativo, data_criacao
 FROM plano
 WHERE id=? AND ativo = 1
-"""
\ No newline at end of file
+"""
+
+OBTER_POR_IDS_PLANO = """
+SELECT id, nome, descricao, preco, duracao_dias, ativo, data_criacao
+FROM plano
+WHERE id IN ({marcadores}) AND ativo = 1
+"""
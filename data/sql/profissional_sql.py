@@ -57,6 +57,26 @@ INNER JOIN usuario u ON p.id = u.id
 WHERE p.id = ?;
 """
 
+OBTER_POR_IDS_PROFISSIONAL = """
+SELECT 
+    p.id, 
+    p.especialidade, 
+    p.registro_profissional,
+    p.status, 
+    p.data_solicitacao,
+    p.data_aprovacao,
+    p.aprovado_por,
+    p.cpf_cnpj,
+    p.foto_registro,
+    u.nome, 
+    u.email, 
+    u.senha
+
+FROM profissional p
+INNER JOIN usuario u ON p.id = u.id
+WHERE p.id IN ({marcadores})
+"""
+
 OBTER_TODOS_PROFISSIONAL = """
 SELECT 
     p.id, 
@@ -93,6 +113,24 @@ WHERE p.status = 'pendente'
 ORDER BY p.data_solicitacao DESC;
 """
 
+OBTER_PENDENTES_RECENTES = """
+SELECT 
+    p.id, 
+    p.especialidade, 
+    p.registro_profissional, 
+    p.status, 
+    p.data_solicitacao,
+    p.cpf_cnpj,
+    p.foto_registro,
+    u.nome, 
+    u.email
+FROM profissional p
+INNER JOIN usuario u ON p.id = u.id
+WHERE p.status = 'pendente'
+ORDER BY p.data_solicitacao DESC
+LIMIT ?;
+"""
+
 OBTER_TODOS_COM_STATUS = """
 SELECT 
     p.id, 
@@ -113,6 +151,55 @@ LEFT JOIN usuario admin ON p.aprovado_por = admin.id
 ORDER BY u.nome;
 """
 
+# Paginação por cursor de OBTER_TODOS_COM_STATUS. A consulta parte de
+# usuario pelo idx_usuario_perfil_nome (perfil, nome, rowid), já na ordem da
+# página, e o CROSS JOIN impede o planner de trocar a ordem e ler/ordenar a
+# tabela profissional inteira a cada página.
+OBTER_PAGINA_COM_STATUS = """
+SELECT 
+    p.id, 
+    p.especialidade, 
+    p.registro_profissional, 
+    p.status, 
+    p.data_solicitacao, 
+    p.data_aprovacao,
+    p.aprovado_por,
+    p.cpf_cnpj,
+    p.foto_registro,
+    u.nome, 
+    u.email,
+    admin.nome AS aprovado_por_nome
+FROM usuario u
+CROSS JOIN profissional p ON p.id = u.id
+LEFT JOIN usuario admin ON p.aprovado_por = admin.id
+WHERE u.perfil = 'profissional' AND (u.nome, u.id) > (?, ?)
+ORDER BY u.nome, u.id
+LIMIT ?;
+"""
+
+OBTER_PAGINA_COM_STATUS_POR_STATUS = """
+SELECT 
+    p.id, 
+    p.especialidade, 
+    p.registro_profissional, 
+    p.status, 
+    p.data_solicitacao, 
+    p.data_aprovacao,
+    p.aprovado_por,
+    p.cpf_cnpj,
+    p.foto_registro,
+    u.nome, 
+    u.email,
+    admin.nome AS aprovado_por_nome
+FROM usuario u
+CROSS JOIN profissional p ON p.id = u.id
+LEFT JOIN usuario admin ON p.aprovado_por = admin.id
+WHERE u.perfil = 'profissional' AND p.status = ?
+    AND (u.nome, u.id) > (?, ?)
+ORDER BY u.nome, u.id
+LIMIT ?;
+"""
+
 APROVAR_PROFISSIONAL = """
 UPDATE profissional 
 SET status = 'aprovado', 
@@ -41,6 +41,15 @@ INNER JOIN usuario u ON c.id = u.id
 WHERE pa.id=?
 """
 
+OBTER_POR_IDS_PROGRESSO_ALUNO = """
+SELECT pa.*, u.nome AS aluno_nome
+FROM progresso_aluno pa
+INNER JOIN personal_aluno pal ON pa.personal_aluno_id = pal.id
+INNER JOIN cliente c ON pal.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE pa.id IN ({marcadores})
+"""
+
 OBTER_TODOS_PROGRESSO_ALUNO = """
 SELECT pa.*, u.nome AS aluno_nome
 FROM progresso_aluno pa
@@ -54,4 +63,14 @@ OBTER_POR_ALUNO = """
 SELECT * FROM progresso_aluno
 WHERE personal_aluno_id=?
 ORDER BY data_registro DESC
-"""
\ No newline at end of file
+"""
+
+OBTER_PROGRESSOS_POR_PERSONAL = """
+SELECT pa.*, u.nome AS aluno_nome
+FROM progresso_aluno pa
+INNER JOIN personal_aluno pal ON pa.personal_aluno_id = pal.id
+INNER JOIN cliente c ON pal.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE pal.personal_id=?
+ORDER BY pa.data_registro DESC, u.nome
+"""
@@ -0,0 +1,50 @@
+# Comandos SQL para as sessões de login (util/auth_decorator.py)
+
+CRIAR_TABELA_SESSAO = """
+CREATE TABLE IF NOT EXISTS sessao (
+    sid TEXT PRIMARY KEY,
+    usuario_id INTEGER NOT NULL,
+    criada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expira_em TIMESTAMP NOT NULL
+) WITHOUT ROWID;
+"""
+
+CRIAR_INDICE_SESSAO_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_sessao_usuario ON sessao (usuario_id)
+"""
+
+CRIAR_INDICE_SESSAO_EXPIRA = """
+CREATE INDEX IF NOT EXISTS idx_sessao_expira ON sessao (expira_em)
+"""
+
+INSERIR_SESSAO = """
+INSERT INTO sessao (sid, usuario_id, expira_em)
+VALUES (?, ?, datetime('now', ?))
+"""
+
+# Sessão válida com os dados do usuário e os segundos que faltam para expirar
+OBTER_SESSAO_COM_USUARIO = """
+SELECT u.id, u.nome, u.email, u.perfil, u.foto,
+       (julianday(s.expira_em) - julianday('now')) * 86400 AS restante_segundos
+FROM sessao s
+JOIN usuario u ON u.id = s.usuario_id
+WHERE s.sid = ? AND s.expira_em > datetime('now')
+"""
+
+RENOVAR_SESSAO = """
+UPDATE sessao SET expira_em = datetime('now', ?)
+WHERE sid = ?
+"""
+
+EXCLUIR_SESSAO = """
+DELETE FROM sessao WHERE sid = ?
+"""
+
+EXCLUIR_SESSOES_USUARIO = """
+DELETE FROM sessao WHERE usuario_id = ?
+RETURNING sid
+"""
+
+EXCLUIR_SESSOES_EXPIRADAS = """
+DELETE FROM sessao WHERE expira_em <= datetime('now')
+"""
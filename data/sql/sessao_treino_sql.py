@@ -35,6 +35,10 @@ OBTER_POR_ID_SESSAO_TREINO = """
 SELECT * FROM sessao_treino WHERE id=?
 """
 
+OBTER_POR_IDS_SESSAO_TREINO = """
+SELECT * FROM sessao_treino WHERE id IN ({marcadores})
+"""
+
 OBTER_TODOS_SESSAO_TREINO = """
 SELECT * FROM sessao_treino ORDER BY ordem
 """
@@ -49,6 +49,15 @@ INNER JOIN usuario u ON c.id = u.id
 WHERE tp.id=?
 """
 
+OBTER_POR_IDS_TREINO_PERSONALIZADO = """
+SELECT tp.*, u.nome AS aluno_nome
+FROM treino_personalizado tp
+INNER JOIN personal_aluno pa ON tp.personal_aluno_id = pa.id
+INNER JOIN cliente c ON pa.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE tp.id IN ({marcadores})
+"""
+
 OBTER_TODOS_TREINO_PERSONALIZADO = """
 SELECT tp.*, u.nome AS aluno_nome
 FROM treino_personalizado tp
@@ -62,4 +71,14 @@ OBTER_POR_ALUNO = """
 SELECT * FROM treino_personalizado
 WHERE personal_aluno_id=? AND status='ativo'
 ORDER BY criado_em DESC
-"""
\ No newline at end of file
+"""
+
+OBTER_TREINOS_POR_PERSONAL = """
+SELECT tp.*, u.nome AS aluno_nome
+FROM treino_personalizado tp
+INNER JOIN personal_aluno pa ON tp.personal_aluno_id = pa.id
+INNER JOIN cliente c ON pa.aluno_id = c.id
+INNER JOIN usuario u ON c.id = u.id
+WHERE pa.personal_id=? AND tp.status='ativo'
+ORDER BY tp.id DESC
+"""
@@ -59,6 +59,12 @@ FROM treino
 WHERE id=?
 """
 
+OBTER_POR_IDS_TREINO = """
+SELECT id, nome, descricao, gratuito
+FROM treino
+WHERE id IN ({marcadores})
+"""
+
 OBTER_TODOS_TREINO = """
 SELECT id, nome, descricao, gratuito
 FROM treino
@@ -36,6 +36,12 @@ FROM usuario
 WHERE id = ?
 """
 
+OBTER_POR_IDS_USUARIO = """
+SELECT id, nome, email, senha, perfil, foto, token_redefinicao, data_token, data_cadastro
+FROM usuario
+WHERE id IN ({marcadores})
+"""
+
 OBTER_TODOS_USUARIO = """
 SELECT id, nome, email, senha, perfil, foto, token_redefinicao, data_token, data_cadastro
 FROM usuario
@@ -58,3 +64,21 @@ ORDER BY nome
 ATUALIZAR_SENHA = """
 UPDATE usuario SET senha = ? WHERE id = ?
 """
+
+# Paginação por cursor: (nome, id) > (?, ?) usa idx_usuario_nome /
+# idx_usuario_perfil_nome (o id entra no índice como rowid)
+OBTER_PAGINA_USUARIO = """
+SELECT id, nome, email, senha, perfil, foto, token_redefinicao, data_token, data_cadastro
+FROM usuario
+WHERE (nome, id) > (?, ?)
+ORDER BY nome, id
+LIMIT ?
+"""
+
+OBTER_PAGINA_USUARIO_POR_PERFIL = """
+SELECT id, nome, email, senha, perfil, foto, token_redefinicao, data_token, data_cadastro
+FROM usuario
+WHERE perfil = ? AND (nome, id) > (?, ?)
+ORDER BY nome, id
+LIMIT ?
+"""
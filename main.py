@@ -1,29 +1,92 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
-from routes import register_routes
-import os
 
-# Carregar variáveis de ambiente (.env)
+# Carregar variáveis de ambiente (.env) antes dos módulos que leem as configurações na importação
 load_dotenv()
 
+# Logs pela fila (util/log_util.py) antes de importar os módulos que registram eventos
+from util.log_util import IdRequisicaoMiddleware, configurar_logs
+configurar_logs()
+
+from routes import register_routes
+from util.db_util import DB_CONTAR_CONSULTAS, ContadorConsultasMiddleware, aplicar_perfil_desempenho, fechar_conexoes
+from util.db_async import encerrar_executor
+from util.migracoes import aplicar_migracoes
+from util.security import SenhaSobrecarregadaError, encerrar_executor_senha
+from util.email_worker import email_worker
+from util.file_upload import LimiteUploadMiddleware, TAMANHO_MAXIMO_FOTO
+from util.asset_util import StaticFilesImutavel
+from util.imagem_util import encerrar_executor_imagem
+from util.template_util import precompilar_templates
+from util.metricas_db import DB_METRICAS, RotaConsultasMiddleware
+from util.metricas_http import METRICAS_HTTP, MetricasHttpMiddleware
+from util.profiler import instalar_sinal_profiler
+from util.auth_decorator import SESSAO_DURACAO_SEGUNDOS, SessaoUsuarioMiddleware
+import os
+
 app = FastAPI()
 
+# Usuário da sessão resolvido uma vez por requisição, fora do event loop
+# (adicionado antes do SessionMiddleware para rodar depois dele)
+app.add_middleware(SessaoUsuarioMiddleware)
+
 # ✅ Middleware de sessão
 app.add_middleware(
     SessionMiddleware,
-    secret_key=os.getenv("SECRET_KEY", "chave-super-secreta")  # valor padrão caso não exista no .env
+    secret_key=os.getenv("SECRET_KEY", "chave-super-secreta"),  # valor padrão caso não exista no .env
+    max_age=SESSAO_DURACAO_SEGUNDOS
 )
 
-# Templates e arquivos estáticos
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+# Limite de tamanho do corpo nas rotas de upload (foto + campos do formulário)
+app.add_middleware(
+    LimiteUploadMiddleware,
+    limites={"/cadastro_profissional": TAMANHO_MAXIMO_FOTO + 64 * 1024}
+)
+
+# Número de consultas SQL de cada requisição no cabeçalho X-DB-Queries
+if DB_CONTAR_CONSULTAS:
+    app.add_middleware(ContadorConsultasMiddleware)
+
+# Latência, status e tamanho por rota e rota de origem de cada consulta SQL nas métricas (/admin/metrics)
+if METRICAS_HTTP:
+    app.add_middleware(MetricasHttpMiddleware)
+elif DB_METRICAS:
+    app.add_middleware(RotaConsultasMiddleware)
+
+# Id da requisição nos logs e no cabeçalho X-Request-ID (middleware mais externo)
+app.add_middleware(IdRequisicaoMiddleware)
+
+# Arquivos estáticos (os templates usam o ambiente único de util/template_util.py)
+app.mount("/static", StaticFilesImutavel(directory="static"), name="static")
 
 # Registrar todas as rotas
 register_routes(app)
 
+# Aplica o perfil de desempenho do SQLite (WAL) e as migrações, pré-compila os templates, inicia o envio
+# de emails em segundo plano e liga o SIGUSR2 ao profiler;
+# ao encerrar, para o worker de email, as threads do banco e fecha o pool
+app.add_event_handler("startup", aplicar_perfil_desempenho)
+app.add_event_handler("startup", aplicar_migracoes)
+app.add_event_handler("startup", precompilar_templates)
+app.add_event_handler("startup", email_worker.iniciar)
+app.add_event_handler("startup", instalar_sinal_profiler)
+app.add_event_handler("shutdown", email_worker.parar)
+app.add_event_handler("shutdown", encerrar_executor)
+app.add_event_handler("shutdown", encerrar_executor_senha)
+app.add_event_handler("shutdown", encerrar_executor_imagem)
+app.add_event_handler("shutdown", fechar_conexoes)
+
+# Pool de senhas (bcrypt) com a fila cheia: responde rápido em vez de enfileirar mais logins
+@app.exception_handler(SenhaSobrecarregadaError)
+async def senha_sobrecarregada_handler(request: Request, exc: SenhaSobrecarregadaError):
+    return PlainTextResponse(
+        "Servidor ocupado. Tente novamente em instantes.",
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Página inicial opcional (teste rápido)
 @app.get("/")
 def home():
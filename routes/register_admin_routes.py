@@ -1,12 +1,13 @@
+import asyncio
+import logging
 from datetime import datetime
 from typing import Optional
 from fastapi import FastAPI, HTTPException, Request, Form, Depends, UploadFile, File, status
-from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import PlainTextResponse, RedirectResponse
 
-from data.repo import plano_repo, usuario_repo, cliente_repo, profissional_repo
-from data.repo import personal_repo, personal_aluno_repo, treino_personalizado_repo
-from data.repo import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
+from data.repo_async import plano_repo, usuario_repo, cliente_repo, profissional_repo
+from data.repo_async import personal_repo, personal_aluno_repo, treino_personalizado_repo
+from data.repo_async import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
 from data.model.usuario_model import Usuario
 from data.model.cliente_model import Cliente
 from data.model.profissional_model import Profissional
@@ -15,15 +16,30 @@ from data.model.personal_model import Personal
 from data.model.personal_aluno_model import PersonalAluno
 from data.model.treino_personalizado_model import TreinoPersonalizado
 from util.file_upload import salvar_foto_registro
-from util.security import criar_hash_senha, verificar_senha, gerar_senha_aleatoria
-from util.auth_decorator import criar_sessao, obter_usuario_logado, requer_autenticacao
+from util.template_util import templates
+from util.cache_pagina import cache_paginas
+from util.cache_util import cache_catalogo
+from util.security import criar_hash_senha_async, gerar_senha_aleatoria, obter_metricas_senha
+from util.auth_decorator import criar_sessao, obter_usuario_logado, requer_autenticacao, revogar_sessoes_usuario
 from util.email_service_gmail import email_service_gmail
+from util.email_worker import email_worker
+from util.db_async import executar
+from util.metricas import CONTENT_TYPE_PROMETHEUS, gerar_metricas_prometheus
+from util.metricas_db import obter_consultas_lentas, obter_metricas_consultas
+from util.metricas_http import obter_metricas_requisicoes
+from util.profiler import PROFILER, PROFILER_INTERVALO_MS, ProfilerOcupadoError, perfilar
+from util.estatisticas_service import estatisticas_service
+from util.paginacao import TAMANHO_PAGINA_PADRAO
 from data.dtos.cadastro_cliente_dto import validar_cadastro_cliente
 from data.dtos.cadastro_profissional_dto import validar_cadastro_profissional, validar_foto_registro
 from data.dtos.login_dto import validar_login
 
-templates = Jinja2Templates(directory="templates")
 
+logger = logging.getLogger(__name__)
+
+
+PERFIS_USUARIO = ["cliente", "profissional", "admin"]
+STATUS_PROFISSIONAL = ["pendente", "aprovado", "rejeitado", "inativo"]
 
 
 
@@ -36,25 +52,14 @@ def register_admin_routes(app: FastAPI):
     @app.get("/admin")
     @requer_autenticacao(['admin'])
     async def admin_dashboard(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
-        total_usuarios = len(usuario_repo.obter_todos())
-        total_clientes = len(cliente_repo.obter_todos())
-        total_profissionais = len(profissional_repo.obter_todos())
-        total_planos = len(plano_repo.obter_todos())
-        profissionais_pendentes = profissional_repo.obter_pendentes()
-
-        estatisticas = {
-            "total_usuarios": total_usuarios,
-            "total_clientes": total_clientes,
-            "total_profissionais": total_profissionais,
-            "total_planos": total_planos,
-            "profissionais_pendentes": len(profissionais_pendentes)
-        }
+        estatisticas = await estatisticas_service.dashboard_admin()
+        profissionais_pendentes = await profissional_repo.obter_pendentes_recentes(5)
 
         return templates.TemplateResponse("admin/dashboard.html", {
             "request": request,
             "usuario": usuario_logado,
             "estatisticas": estatisticas,
-            "profissionais_pendentes": profissionais_pendentes[:5]
+            "profissionais_pendentes": profissionais_pendentes
         })
 
     @app.get("/admin/test-email")
@@ -99,10 +104,73 @@ def register_admin_routes(app: FastAPI):
                 "resultado": resultado
             })
 
+    @app.get("/admin/metricas/senhas")
+    @requer_autenticacao(['admin'])
+    async def admin_metricas_senhas(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+        return obter_metricas_senha()
+
+    @app.get("/admin/metricas/emails")
+    @requer_autenticacao(['admin'])
+    async def admin_metricas_emails(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+        return await executar(email_worker.estatisticas)
+
+    @app.get("/admin/metricas/paginas")
+    @requer_autenticacao(['admin'])
+    async def admin_metricas_paginas(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+        return cache_paginas.estatisticas()
+
+    @app.get("/admin/metricas/catalogo")
+    @requer_autenticacao(['admin'])
+    async def admin_metricas_catalogo(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+        return cache_catalogo.estatisticas()
+
+    @app.get("/admin/metricas/consultas")
+    @requer_autenticacao(['admin'])
+    async def admin_metricas_consultas(request: Request, usuario_logado: dict = Depends(obter_usuario_logado),
+                                       limite: int = 20):
+        return {
+            "mais_demoradas": obter_metricas_consultas(min(max(limite, 1), 200)),
+            "lentas": obter_consultas_lentas(),
+        }
+
+    @app.get("/admin/metricas/requisicoes")
+    @requer_autenticacao(['admin'])
+    async def admin_metricas_requisicoes(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+        return obter_metricas_requisicoes()
+
+    @app.get("/admin/metrics")
+    @requer_autenticacao(['admin'])
+    async def admin_metrics(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+        """Todas as métricas no formato texto do Prometheus"""
+        texto = await executar(gerar_metricas_prometheus)
+        return PlainTextResponse(texto, media_type=CONTENT_TYPE_PROMETHEUS)
+
+    @app.get("/admin/profiler")
+    @requer_autenticacao(['admin'])
+    async def admin_profiler(request: Request, usuario_logado: dict = Depends(obter_usuario_logado),
+                             segundos: float = 10, intervalo_ms: float = PROFILER_INTERVALO_MS,
+                             rota: Optional[str] = None):
+        """
+        Perfil por amostragem deste worker, no formato collapsed (flamegraph)
+
+        Ex: /admin/profiler?segundos=20&rota=/personal/progressos/{progresso_id}
+        """
+        if not PROFILER:
+            raise HTTPException(status_code=404, detail="Profiler desativado")
+        try:
+            # Thread própria: não ocupa uma thread do banco durante o perfil
+            resultado = await asyncio.to_thread(perfilar, segundos, intervalo_ms, rota or None)
+        except ProfilerOcupadoError as e:
+            return PlainTextResponse(str(e), status_code=409)
+        return PlainTextResponse(resultado.texto(), headers={
+            "Content-Disposition": f'attachment; filename="perfil-{datetime.now():%Y%m%d-%H%M%S}.folded"',
+            "X-Profiler-Amostras": str(resultado.amostras),
+        })
+
     @app.get("/admin/planos")
     @requer_autenticacao(['admin'])
     async def admin_planos_listar(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
-        planos = plano_repo.obter_todos()
+        planos = await plano_repo.obter_todos()
         return templates.TemplateResponse("admin/planos/listar.html", {
             "request": request,
             "usuario": usuario_logado,
@@ -136,13 +204,14 @@ def register_admin_routes(app: FastAPI):
             preco=preco,
             duracao_dias=duracao_dias
         )
-        plano_repo.inserir(plano)
+        await plano_repo.inserir(plano)
+        cache_paginas.invalidar()
         return RedirectResponse("/admin/planos", status_code=303)
 
     @app.get("/admin/planos/editar/{plano_id}")
     @requer_autenticacao(['admin'])
     async def admin_planos_editar_get(request: Request, plano_id: int, usuario_logado: dict = Depends(obter_usuario_logado)):
-        plano = plano_repo.obter_por_id(plano_id)
+        plano = await plano_repo.obter_por_id(plano_id)
         if not plano:
             return RedirectResponse("/admin/planos", status_code=303)
         return templates.TemplateResponse("admin/planos/form.html", {
@@ -162,7 +231,7 @@ def register_admin_routes(app: FastAPI):
         descricao: str = Form(...),
         duracao_dias: int = Form(...)
     ):
-        plano = plano_repo.obter_por_id(plano_id)
+        plano = await plano_repo.obter_por_id(plano_id)
         if not plano:
             return RedirectResponse("/admin/planos?erro=Plano não encontrado", status_code=303)
 
@@ -170,7 +239,8 @@ def register_admin_routes(app: FastAPI):
         plano.descricao = descricao
         plano.preco = preco
         plano.duracao_dias = duracao_dias
-        success = plano_repo.alterar(plano)
+        success = await plano_repo.alterar(plano)
+        cache_paginas.invalidar()
 
         if success:
             return RedirectResponse("/admin/planos?sucesso=Plano atualizado com sucesso", status_code=303)
@@ -181,31 +251,47 @@ def register_admin_routes(app: FastAPI):
     @requer_autenticacao(['admin'])
     async def admin_planos_excluir(request: Request, plano_id: int, usuario_logado: dict = Depends(obter_usuario_logado)):
         try:
-            plano = plano_repo.obter_por_id(plano_id)
+            plano = await plano_repo.obter_por_id(plano_id)
             if not plano:
                 return RedirectResponse("/admin/planos?erro=Plano não encontrado", status_code=303)
 
-            plano_repo.excluir(plano_id)
+            await plano_repo.excluir(plano_id)
+            cache_paginas.invalidar()
             return RedirectResponse("/admin/planos?sucesso=Plano excluído com sucesso", status_code=303)
 
         except Exception as e:
-            print(f"[ERRO] Erro ao excluir plano {plano_id}: {str(e)}")
+            logger.error("Erro ao excluir plano %s: %s", plano_id, e)
             return RedirectResponse("/admin/planos?erro=Erro interno ao excluir plano", status_code=303)
 
     @app.get("/admin/profissionais")
     @requer_autenticacao(['admin'])
-    async def admin_profissionais_listar(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
-        profissionais = profissional_repo.obter_todos_com_status()
+    async def admin_profissionais_listar(
+        request: Request,
+        status: Optional[str] = None,
+        apos_nome: Optional[str] = None,
+        apos_id: int = 0,
+        tamanho: int = TAMANHO_PAGINA_PADRAO,
+        usuario_logado: dict = Depends(obter_usuario_logado)
+    ):
+        if status not in STATUS_PROFISSIONAL:
+            status = None
+        pagina = await profissional_repo.obter_pagina_com_status(
+            status=status, apos_nome=apos_nome, apos_id=apos_id, tamanho=tamanho
+        )
         return templates.TemplateResponse("admin/profissionais/listar.html", {
             "request": request,
             "usuario": usuario_logado,
-            "profissionais": profissionais
+            "profissionais": pagina.itens,
+            "pagina": pagina,
+            "status_filtro": status,
+            "status_opcoes": STATUS_PROFISSIONAL,
+            "primeira_pagina": apos_nome is None
         })
 
     @app.get("/admin/profissionais/pendentes")
     @requer_autenticacao(['admin'])
     async def ver_profissionais_pendentes(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
-        profissionais = profissional_repo.obter_pendentes()
+        profissionais = await profissional_repo.obter_pendentes()
         return templates.TemplateResponse(
             "admin/profissionais/perndentes.html",
             {"request": request, "usuario": usuario_logado, "profissionais": profissionais}
@@ -215,7 +301,7 @@ def register_admin_routes(app: FastAPI):
     @requer_autenticacao(['admin'])
     async def aprovar_profissional(request: Request, prof_id: int, usuario_logado: dict = Depends(obter_usuario_logado)):
         admin_id = usuario_logado["id"]
-        sucesso = profissional_repo.aprovar(prof_id, admin_id)
+        sucesso = await profissional_repo.aprovar(prof_id, admin_id)
         if not sucesso:
             raise HTTPException(status_code=404, detail="Profissional não encontrado ou não aprovado")
         return RedirectResponse(url="/admin/profissionais/pendentes", status_code=status.HTTP_303_SEE_OTHER)
@@ -224,7 +310,7 @@ def register_admin_routes(app: FastAPI):
     @requer_autenticacao(['admin'])
     async def rejeitar_profissional(request: Request, prof_id: int, usuario_logado: dict = Depends(obter_usuario_logado)):
         admin_id = usuario_logado["id"]
-        sucesso = profissional_repo.rejeitar(prof_id, admin_id)
+        sucesso = await profissional_repo.rejeitar(prof_id, admin_id)
         if not sucesso:
             raise HTTPException(status_code=404, detail="Profissional não encontrado ou não rejeitado")
         return RedirectResponse(url="/admin/profissionais/pendentes", status_code=status.HTTP_303_SEE_OTHER)
@@ -232,17 +318,32 @@ def register_admin_routes(app: FastAPI):
     @app.post("/admin/profissionais/desativar/{profissional_id}")
     @requer_autenticacao(['admin'])
     async def admin_profissionais_desativar(request: Request, profissional_id: int, usuario_logado: dict = Depends(obter_usuario_logado)):
-        profissional_repo.desativar(profissional_id)
+        await profissional_repo.desativar(profissional_id)
         return RedirectResponse("/admin/profissionais", status_code=303)
 
     @app.get("/admin/usuarios")
     @requer_autenticacao(['admin'])
-    async def admin_usuarios_listar(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
-        usuarios = usuario_repo.obter_todos()
+    async def admin_usuarios_listar(
+        request: Request,
+        perfil: Optional[str] = None,
+        apos_nome: Optional[str] = None,
+        apos_id: int = 0,
+        tamanho: int = TAMANHO_PAGINA_PADRAO,
+        usuario_logado: dict = Depends(obter_usuario_logado)
+    ):
+        if perfil not in PERFIS_USUARIO:
+            perfil = None
+        pagina = await usuario_repo.obter_pagina(
+            perfil=perfil, apos_nome=apos_nome, apos_id=apos_id, tamanho=tamanho
+        )
         return templates.TemplateResponse("admin/usuarios/listar.html", {
             "request": request,
             "usuario": usuario_logado,
-            "usuarios": usuarios
+            "usuarios": pagina.itens,
+            "pagina": pagina,
+            "perfil_filtro": perfil,
+            "perfis": PERFIS_USUARIO,
+            "primeira_pagina": apos_nome is None
         })
 
     @app.get("/admin/usuarios/novo")
@@ -265,7 +366,7 @@ def register_admin_routes(app: FastAPI):
         perfil: str = Form(...),
         usuario_logado: dict = Depends(obter_usuario_logado)
     ):
-        if usuario_repo.obter_por_email(email):
+        if await usuario_repo.obter_por_email(email):
             return templates.TemplateResponse("admin/usuarios/form.html", {
                 "request": request,
                 "usuario": usuario_logado,
@@ -274,7 +375,7 @@ def register_admin_routes(app: FastAPI):
                 "erro": "Email já cadastrado"
             })
         
-        hash_senha = criar_hash_senha(senha)
+        hash_senha = await criar_hash_senha_async(senha)
         usuario = Usuario(
             id=0,
             nome=nome,
@@ -283,18 +384,18 @@ def register_admin_routes(app: FastAPI):
             perfil=perfil
         )
         
-        usuario_id = usuario_repo.inserir(usuario)
+        usuario_id = await usuario_repo.inserir(usuario)
         
         if perfil == "cliente":
             cliente = Cliente(usuario_id=usuario_id, id=None)
-            cliente_repo.inserir(cliente)
+            await cliente_repo.inserir(cliente)
         
         return RedirectResponse("/admin/usuarios", status_code=303)
 
     @app.get("/admin/usuarios/editar/{usuario_id}")
     @requer_autenticacao(['admin'])
     async def admin_usuarios_editar_get(request: Request, usuario_id: int, usuario_logado: dict = Depends(obter_usuario_logado)):
-        usuario = usuario_repo.obter_por_id(usuario_id)
+        usuario = await usuario_repo.obter_por_id(usuario_id)
         if not usuario:
             return RedirectResponse("/admin/usuarios", status_code=303)
         
@@ -317,11 +418,11 @@ def register_admin_routes(app: FastAPI):
         perfil: str = Form(...),
         usuario_logado: dict = Depends(obter_usuario_logado)
     ):
-        usuario = usuario_repo.obter_por_id(usuario_id)
+        usuario = await usuario_repo.obter_por_id(usuario_id)
         if not usuario:
             return RedirectResponse("/admin/usuarios", status_code=303)
         
-        usuario_email_existente = usuario_repo.obter_por_email(email)
+        usuario_email_existente = await usuario_repo.obter_por_email(email)
         if usuario_email_existente and usuario_email_existente.id != usuario_id:
             return templates.TemplateResponse("admin/usuarios/form.html", {
                 "request": request,
@@ -337,9 +438,11 @@ def register_admin_routes(app: FastAPI):
         usuario.perfil = perfil
         
         if senha and senha.strip():
-            usuario.senha = criar_hash_senha(senha)
+            usuario.senha = await criar_hash_senha_async(senha)
         
-        usuario_repo.alterar(usuario)
+        await usuario_repo.alterar(usuario)
+        if senha and senha.strip():
+            await revogar_sessoes_usuario(usuario_id)
         return RedirectResponse("/admin/usuarios", status_code=303)
 
     @app.post("/admin/usuarios/excluir/{usuario_id}")
@@ -349,22 +452,23 @@ def register_admin_routes(app: FastAPI):
             return RedirectResponse("/admin/usuarios?erro=Não é possível excluir seu próprio usuário", status_code=303)
         
         try:
-            usuario = usuario_repo.obter_por_id(usuario_id)
+            usuario = await usuario_repo.obter_por_id(usuario_id)
             if not usuario:
                 return RedirectResponse("/admin/usuarios?erro=Usuário não encontrado", status_code=303)
             
             try:
                 if usuario.perfil == "cliente":
-                    cliente_repo.excluir(usuario_id)
+                    await cliente_repo.excluir(usuario_id)
                 elif usuario.perfil == "profissional":
-                    profissional_repo.excluir(usuario_id)
+                    await profissional_repo.excluir(usuario_id)
             except Exception as e:
-                print(f"[AVISO] Não foi possível excluir registros relacionados do usuário {usuario_id}: {str(e)}")
+                logger.warning("Não foi possível excluir registros relacionados do usuário %s: %s", usuario_id, e)
             
-            usuario_repo.excluir(usuario_id)
+            await usuario_repo.excluir(usuario_id)
+            await revogar_sessoes_usuario(usuario_id)
             return RedirectResponse("/admin/usuarios?sucesso=Usuário excluído com sucesso", status_code=303)
                 
         except Exception as e:
-            print(f"[ERRO] Erro ao excluir usuário {usuario_id}: {str(e)}")
+            logger.error("Erro ao excluir usuário %s: %s", usuario_id, e)
             return RedirectResponse("/admin/usuarios?erro=Erro interno ao excluir usuário", status_code=303)
 
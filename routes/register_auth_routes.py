@@ -1,12 +1,12 @@
+import logging
 from datetime import datetime
 from typing import Optional
 from fastapi import FastAPI, Request, Form, Depends, UploadFile, File, status
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 
-from data.repo import plano_repo, usuario_repo, cliente_repo, profissional_repo
-from data.repo import personal_repo, personal_aluno_repo, treino_personalizado_repo
-from data.repo import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
+from data.repo_async import plano_repo, usuario_repo, cliente_repo, profissional_repo
+from data.repo_async import personal_repo, personal_aluno_repo, treino_personalizado_repo
+from data.repo_async import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
 from data.model.usuario_model import Usuario
 from data.model.cliente_model import Cliente
 from data.model.profissional_model import Profissional
@@ -15,16 +15,18 @@ from data.model.personal_model import Personal
 from data.model.personal_aluno_model import PersonalAluno
 from data.model.treino_personalizado_model import TreinoPersonalizado
 from util.file_upload import salvar_foto_registro
-from util.security import criar_hash_senha, verificar_senha, gerar_senha_aleatoria
-from util.auth_decorator import criar_sessao, obter_usuario_logado, requer_autenticacao
+from util.template_util import templates
+from util.security import criar_hash_senha_async, verificar_senha_async, gerar_senha_aleatoria
+from util.auth_decorator import criar_sessao, destruir_sessao, obter_usuario_logado, requer_autenticacao, revogar_sessoes_usuario
 from util.email_service_gmail import email_service_gmail
-from util.email_service import email_service
+from util.email_worker import email_worker
+from util.db_async import executar
 from data.dtos.cadastro_cliente_dto import validar_cadastro_cliente
 from data.dtos.cadastro_profissional_dto import validar_cadastro_profissional, validar_foto_registro
 from data.dtos.login_dto import validar_login
 
-templates = Jinja2Templates(directory="templates")
 
+logger = logging.getLogger(__name__)
 
 
 def register_auth_routes(app: FastAPI):
@@ -53,7 +55,7 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await usuario_repo.obter_por_email(dto.email)
         
         if not usuario or usuario.perfil != "cliente":
             return templates.TemplateResponse("inicio/login_cliente.html", {
@@ -62,7 +64,7 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
-        if not verificar_senha(dto.senha, usuario.senha):
+        if not await verificar_senha_async(dto.senha, usuario.senha):
             return templates.TemplateResponse("inicio/login_cliente.html", {
                 "request": request,
                 "erro": "Email ou senha inválidos.",
@@ -76,10 +78,10 @@ def register_auth_routes(app: FastAPI):
             "perfil": usuario.perfil,
             "foto": usuario.foto
         }
-        criar_sessao(request, usuario_dict)
-        email_service.enviar_boas_vindas(
-            para_email=usuario.email, 
-            para_nome=usuario.nome)
+        await criar_sessao(request, usuario_dict)
+        # Só grava na fila de saída; o envio fica com o email_worker
+        if await executar(email_service_gmail.enviar_boas_vindas, email_usuario=usuario.email, nome=usuario.nome):
+            email_worker.notificar()
         return RedirectResponse("/", status_code=303)
 
     @app.get("/login_profissional")
@@ -102,7 +104,7 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await usuario_repo.obter_por_email(dto.email)
         
         if not usuario or usuario.perfil != "profissional":
             return templates.TemplateResponse("inicio/login_profissional.html", {
@@ -111,7 +113,7 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
-        if not verificar_senha(dto.senha, usuario.senha):
+        if not await verificar_senha_async(dto.senha, usuario.senha):
             return templates.TemplateResponse("inicio/login_profissional.html", {
                 "request": request,
                 "erro": "Email ou senha inválidos.",
@@ -125,7 +127,7 @@ def register_auth_routes(app: FastAPI):
             "perfil": usuario.perfil,
             "foto": usuario.foto
         }
-        criar_sessao(request, usuario_dict)
+        await criar_sessao(request, usuario_dict)
         
         return RedirectResponse("/personal/dashboard", status_code=303)
 
@@ -148,7 +150,7 @@ def register_auth_routes(app: FastAPI):
         if not erros:
             erros = {}
         
-        if usuario_repo.obter_por_email(email.strip().lower()):
+        if await usuario_repo.obter_por_email(email.strip().lower()):
             erros['email'] = 'Este email já está cadastrado. Faça login ou use outro email.'
         
         if erros:
@@ -158,8 +160,8 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
+        hash_senha = await criar_hash_senha_async(dto.senha)
         try:
-            hash_senha = criar_hash_senha(dto.senha)
             usuario = Usuario(
                 id=0,
                 nome=dto.nome,
@@ -167,13 +169,13 @@ def register_auth_routes(app: FastAPI):
                 senha=hash_senha,
                 perfil="cliente"
             )
-            usuario_id = usuario_repo.inserir(usuario)
+            usuario_id = await usuario_repo.inserir(usuario)
             cliente = Cliente(usuario_id=usuario_id)
-            cliente_repo.inserir(cliente)
+            await cliente_repo.inserir(cliente)
             return RedirectResponse("/login_cliente?sucesso=Cadastro realizado com sucesso!", status_code=303)
             
         except Exception as e:
-            print(f"[ERRO] Cadastro cliente: {str(e)}")
+            logger.error("Cadastro cliente: %s", e)
             return templates.TemplateResponse("inicio/cadastro_cliente.html", {
                 "request": request,
                 "erro": "Erro ao realizar cadastro. Tente novamente.",
@@ -223,7 +225,7 @@ def register_auth_routes(app: FastAPI):
         if not foto_valida:
             erros['foto_registro'] = erro_foto
         
-        if usuario_repo.obter_por_email(email.strip().lower()):
+        if await usuario_repo.obter_por_email(email.strip().lower()):
             erros['email'] = 'Este email já está cadastrado. Faça login ou use outro email.'
         
         if erros:
@@ -233,9 +235,9 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
+        hash_senha = await criar_hash_senha_async(dto.senha)
         try:
             path_foto = await salvar_foto_registro(foto_registro)
-            hash_senha = criar_hash_senha(dto.senha)
             usuario = Usuario(
                 id=0,
                 nome=dto.nome,
@@ -243,7 +245,7 @@ def register_auth_routes(app: FastAPI):
                 senha=hash_senha,
                 perfil="profissional"
             )
-            usuario_id = usuario_repo.inserir(usuario)
+            usuario_id = await usuario_repo.inserir(usuario)
             
             profissional = Profissional(
                 id=usuario_id,
@@ -254,7 +256,7 @@ def register_auth_routes(app: FastAPI):
                 cpf_cnpj=dto.cpf_cnpj,
                 foto_registro=path_foto
             )
-            profissional_repo.inserir(profissional)
+            await profissional_repo.inserir(profissional)
             
             return RedirectResponse(
                 "/login_profissional?sucesso=Cadastro enviado! Aguarde análise da equipe.",
@@ -262,7 +264,7 @@ def register_auth_routes(app: FastAPI):
             )
             
         except Exception as e:
-            print(f"[ERRO] Cadastro profissional: {str(e)}")
+            logger.error("Cadastro profissional: %s", e)
             return templates.TemplateResponse("inicio/cadastro_profissional.html", {
                 "request": request,
                 "erro": "Erro ao realizar cadastro. Tente novamente.",
@@ -285,7 +287,7 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await usuario_repo.obter_por_email(dto.email)
         
         if not usuario or usuario.perfil != "admin":
             return templates.TemplateResponse("admin/login_admin.html", {
@@ -294,7 +296,7 @@ def register_auth_routes(app: FastAPI):
                 "dados": dados_formulario
             })
         
-        if not verificar_senha(dto.senha, usuario.senha):
+        if not await verificar_senha_async(dto.senha, usuario.senha):
             return templates.TemplateResponse("admin/login_admin.html", {
                 "request": request,
                 "erro": "Email ou senha inválidos.",
@@ -308,12 +310,12 @@ def register_auth_routes(app: FastAPI):
             "perfil": usuario.perfil,
             "foto": usuario.foto
         }
-        criar_sessao(request, usuario_dict)
+        await criar_sessao(request, usuario_dict)
         return RedirectResponse("/admin", status_code=303)
 
     @app.get("/logout")
     async def logout(request: Request):
-        request.session.clear()
+        await destruir_sessao(request)
         return RedirectResponse("/", status_code=303)
 
     @app.get("/perfil")
@@ -336,7 +338,7 @@ def register_auth_routes(app: FastAPI):
 
     @app.post("/recuperar_senha")
     async def recuperar_senha_post(request: Request, email: str = Form(...)):
-        usuario = usuario_repo.obter_por_email(email.strip().lower())
+        usuario = await usuario_repo.obter_por_email(email.strip().lower())
         
         if not usuario:
             return RedirectResponse(
@@ -344,16 +346,20 @@ def register_auth_routes(app: FastAPI):
                 status_code=303
             )
 
+        nova_senha = gerar_senha_aleatoria(8)
+        hash_nova_senha = await criar_hash_senha_async(nova_senha)
         try:
-            nova_senha = gerar_senha_aleatoria(8)
-            usuario.senha = criar_hash_senha(nova_senha)
-            usuario_repo.alterar(usuario)
+            usuario.senha = hash_nova_senha
+            await usuario_repo.alterar(usuario)
+            await revogar_sessoes_usuario(usuario.id)
             
-            sucesso, mensagem = email_service_gmail.enviar_recuperacao_senha(
+            sucesso, mensagem = await executar(
+                email_service_gmail.enviar_recuperacao_senha,
                 email_usuario=usuario.email,
                 nome=usuario.nome,
                 nova_senha=nova_senha
             )
+            email_worker.notificar()
             
             if sucesso:
                 return RedirectResponse(
@@ -367,7 +373,7 @@ def register_auth_routes(app: FastAPI):
                 )
                 
         except Exception as e:
-            print(f"[ERRO RECUPERAÇÃO] {e}")
+            logger.error("Recuperação de senha: %s", e)
             return RedirectResponse(
                 url="/recuperar_senha?erro=Erro interno do sistema. Tente novamente.",
                 status_code=303
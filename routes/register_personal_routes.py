@@ -1,12 +1,13 @@
+import asyncio
+import logging
 from datetime import datetime
 from typing import Optional
 from fastapi import FastAPI, Request, Form, Depends, UploadFile, File, status
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 
-from data.repo import plano_repo, usuario_repo, cliente_repo, profissional_repo
-from data.repo import personal_repo, personal_aluno_repo, treino_personalizado_repo
-from data.repo import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
+from data.repo_async import plano_repo, usuario_repo, cliente_repo
+from data.repo_async import personal_aluno_repo, treino_personalizado_repo
+from data.repo_async import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
 from data.model.usuario_model import Usuario
 from data.model.cliente_model import Cliente
 from data.model.profissional_model import Profissional
@@ -15,29 +16,48 @@ from data.model.personal_model import Personal
 from data.model.personal_aluno_model import PersonalAluno
 from data.model.treino_personalizado_model import TreinoPersonalizado
 from util.file_upload import salvar_foto_registro
+from util.template_util import templates
 from util.security import criar_hash_senha, verificar_senha, gerar_senha_aleatoria
 from util.auth_decorator import criar_sessao, obter_usuario_logado, requer_autenticacao
+from util.contexto_profissional import ContextoProfissional, obter_contexto_profissional
 from util.email_service_gmail import email_service_gmail
+from util.estatisticas_service import estatisticas_service
 from data.dtos.cadastro_cliente_dto import validar_cadastro_cliente
 from data.dtos.cadastro_profissional_dto import validar_cadastro_profissional, validar_foto_registro
 from data.dtos.login_dto import validar_login
 from fastapi import Form, Request, Depends
 from fastapi.responses import RedirectResponse
 from datetime import datetime
-from data.repo import personal_aluno_repo, treino_personalizado_repo
+from data.repo_async import personal_aluno_repo, treino_personalizado_repo
 from data.model.treino_personalizado_model import TreinoPersonalizado
-templates = Jinja2Templates(directory="templates")
 
 
+logger = logging.getLogger(__name__)
 
 
+async def _obter_usuarios_alunos(aluno_ids: list[int]) -> dict[int, Usuario]:
+    """
+    Usuários dos alunos em lote, por id do aluno (cliente)
 
+    O id do cliente é o id do usuário, então as duas tabelas são lidas ao
+    mesmo tempo com obter_por_ids, em vez de um obter_por_id por aluno
+    encadeado no outro. Alunos sem cadastro de cliente ficam de fora.
+    """
+    clientes, usuarios = await asyncio.gather(
+        cliente_repo.obter_por_ids(aluno_ids),
+        usuario_repo.obter_por_ids(aluno_ids),
+    )
+    return {aluno_id: usuarios[aluno_id] for aluno_id in clientes if aluno_id in usuarios}
 
 
 def register_personal_routes(app: FastAPI):
     @app.get("/personal/dashboard")
     @requer_autenticacao(['profissional'])
-    async def personal_dashboard(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_dashboard(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         """Dashboard do Personal Trainer com tratamento completo de erros"""
         
         # Contexto base padrão (sempre funciona mesmo com erros)
@@ -55,49 +75,26 @@ def register_personal_routes(app: FastAPI):
         
         try:
             # Buscar profissional
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
+            profissional = contexto.profissional
             if not profissional:
-                print(f"[AVISO] Profissional não encontrado para usuário {usuario_logado['id']}")
+                logger.warning("Profissional não encontrado para usuário %s", usuario_logado['id'])
                 return templates.TemplateResponse("personal/dashboard.html", contexto_base)
             
             # Buscar personal (pode não existir ainda)
-            personal = personal_repo.obter_por_profissional(profissional.id)
+            personal = contexto.personal
             
             if not personal:
-                print(f"[AVISO] Personal não encontrado para profissional {profissional.id}")
+                logger.warning("Personal não encontrado para profissional %s", profissional.id)
                 return templates.TemplateResponse("personal/dashboard.html", contexto_base)
             
-            # Estatísticas
-            alunos = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            total_alunos = len(alunos)
-            alunos_ativos = len([a for a in alunos if a.status == 'ativo'])
-            
-            # Contar treinos
-            total_treinos = 0
-            for aluno in alunos:
-                try:
-                    treinos = treino_personalizado_repo.obter_por_aluno(aluno.id)
-                    total_treinos += len(treinos)
-                except Exception as e:
-                    print(f"[ERRO] Erro ao contar treinos do aluno {aluno.id}: {e}")
-            
-            # Contar avaliações
-            total_avaliacoes = 0
-            for aluno in alunos:
-                try:
-                    avaliacoes = avaliacao_fisica_repo.obter_por_aluno(aluno.id)
-                    total_avaliacoes += len(avaliacoes)
-                except Exception as e:
-                    print(f"[ERRO] Erro ao contar avaliações do aluno {aluno.id}: {e}")
+            # Estatísticas (alunos, treinos e avaliações contados no banco)
+            estatisticas = await estatisticas_service.dashboard_personal(personal.id)
             
             # Contexto com dados reais
             contexto_sucesso = {
                 "request": request,
                 "usuario": usuario_logado,
-                "total_alunos": total_alunos,
-                "alunos_ativos": alunos_ativos,
-                "total_treinos": total_treinos,
-                "total_avaliacoes": total_avaliacoes,
+                **estatisticas,
                 "atividades": [],
                 "lembretes": [],
                 "avaliacoes_media": personal.avaliacoes_media if hasattr(personal, 'avaliacoes_media') else None
@@ -106,18 +103,20 @@ def register_personal_routes(app: FastAPI):
             return templates.TemplateResponse("personal/dashboard.html", contexto_sucesso)
             
         except Exception as e:
-            print(f"[ERRO] Dashboard Personal: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Dashboard Personal: %s", e)
             return templates.TemplateResponse("personal/dashboard.html", contexto_base)
     # =================== GESTÃO DE ALUNOS ===================
     @app.get("/personal/alunos")
     @requer_autenticacao(['profissional'])
-    async def personal_alunos_listar(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_alunos_listar(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         """Lista alunos do personal com validação de propriedade"""
         try:
             # Buscar personal do profissional logado
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
+            profissional = contexto.profissional
             if not profissional:
                 return templates.TemplateResponse("personal/alunos/listar.html", {
                     "request": request,
@@ -126,7 +125,7 @@ def register_personal_routes(app: FastAPI):
                     "erro": "Dados de profissional não encontrados"
                 })
             
-            personal = personal_repo.obter_por_profissional(profissional.id)
+            personal = contexto.personal
             if not personal:
                 return templates.TemplateResponse("personal/alunos/listar.html", {
                     "request": request,
@@ -135,47 +134,34 @@ def register_personal_routes(app: FastAPI):
                     "aviso": "Cadastro de Personal não encontrado. Entre em contato com o suporte."
                 })
             
-            # Buscar alunos do personal
-            alunos_relacionamento = personal_aluno_repo.obter_alunos_por_personal(personal.id)
+            # Buscar alunos do personal (já com nome e email do usuário)
+            alunos_detalhados = await personal_aluno_repo.obter_alunos_detalhados_por_personal(personal.id)
             
-            # Enriquecer com dados do usuário
             alunos = []
-            for rel in alunos_relacionamento:
-                try:
-                    cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                    if not cliente:
-                        continue
-                        
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if not usuario_aluno:
-                        continue
-                    
-                    # CORREÇÃO: Converter data_inicio para datetime se vier como string
-                    data_inicio_convertida = rel.data_inicio
-                    if isinstance(rel.data_inicio, str):
+            for rel in alunos_detalhados:
+                # CORREÇÃO: Converter data_inicio para datetime se vier como string
+                data_inicio_convertida = rel['data_inicio']
+                if isinstance(rel['data_inicio'], str):
+                    try:
+                        # Tentar formato ISO (YYYY-MM-DD HH:MM:SS ou YYYY-MM-DD)
+                        data_inicio_convertida = datetime.fromisoformat(rel['data_inicio'].split('.')[0])
+                    except (ValueError, AttributeError):
                         try:
-                            # Tentar formato ISO (YYYY-MM-DD HH:MM:SS ou YYYY-MM-DD)
-                            data_inicio_convertida = datetime.fromisoformat(rel.data_inicio.split('.')[0])
-                        except (ValueError, AttributeError):
-                            try:
-                                # Tentar formato brasileiro (DD/MM/YYYY)
-                                data_inicio_convertida = datetime.strptime(rel.data_inicio, '%d/%m/%Y')
-                            except ValueError:
-                                data_inicio_convertida = None
-                    
-                    alunos.append({
-                        'id': rel.id,
-                        'aluno_id': rel.aluno_id,
-                        'nome': usuario_aluno.nome,
-                        'email': usuario_aluno.email,
-                        'objetivo': rel.objetivo,
-                        'data_inicio': data_inicio_convertida,  # Agora é datetime ou None
-                        'status': rel.status,
-                        'observacoes': rel.observacoes
-                    })
-                except Exception as e:
-                    print(f"[ERRO] Erro ao processar aluno {rel.aluno_id}: {e}")
-                    continue
+                            # Tentar formato brasileiro (DD/MM/YYYY)
+                            data_inicio_convertida = datetime.strptime(rel['data_inicio'], '%d/%m/%Y')
+                        except ValueError:
+                            data_inicio_convertida = None
+                
+                alunos.append({
+                    'id': rel['id'],
+                    'aluno_id': rel['aluno_id'],
+                    'nome': rel['nome'],
+                    'email': rel['email'],
+                    'objetivo': rel['objetivo'],
+                    'data_inicio': data_inicio_convertida,  # Agora é datetime ou None
+                    'status': rel['status'],
+                    'observacoes': rel['observacoes']
+                })
             
             return templates.TemplateResponse("personal/alunos/listar.html", {
                 "request": request,
@@ -184,9 +170,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Listar alunos: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Listar alunos: %s", e)
             return templates.TemplateResponse("personal/alunos/listar.html", {
                 "request": request,
                 "usuario": usuario_logado,
@@ -199,17 +183,7 @@ def register_personal_routes(app: FastAPI):
     @requer_autenticacao(['profissional'])
     async def personal_alunos_novo_get(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
         # Buscar lista de clientes disponíveis para vincular
-        clientes = cliente_repo.obter_todos()
-        clientes_disponiveis = []
-        
-        for cliente in clientes:
-            usuario = usuario_repo.obter_por_id(cliente.usuario_id)
-            if usuario:
-                clientes_disponiveis.append({
-                    'id': cliente.usuario_id,
-                    'nome': usuario.nome,
-                    'email': usuario.email
-                })
+        clientes_disponiveis = await cliente_repo.obter_todos_resumo()
         
         return templates.TemplateResponse("personal/alunos/form.html", {
             "request": request,
@@ -227,30 +201,27 @@ def register_personal_routes(app: FastAPI):
     async def personal_alunos_detalhes(
         request: Request, 
         aluno_id: int, 
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Detalhes do aluno com validação de propriedade"""
         try:
             # Validar se o aluno pertence ao personal logado
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
+            profissional = contexto.profissional
             if not profissional:
                 return RedirectResponse("/personal/alunos?erro=Acesso negado", status_code=303)
             
-            personal = personal_repo.obter_por_profissional(profissional.id)
+            personal = contexto.personal
             if not personal:
                 return RedirectResponse("/personal/alunos?erro=Acesso negado", status_code=303)
             
             # Buscar relacionamento e validar propriedade
-            aluno_rel = personal_aluno_repo.obter_por_id(aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(aluno_id)
             if not aluno_rel or aluno_rel.personal_id != personal.id:
                 return RedirectResponse("/personal/alunos?erro=Aluno não encontrado ou acesso negado", status_code=303)
             
             # Buscar dados do cliente/usuário
-            cliente = cliente_repo.obter_por_id(aluno_rel.aluno_id)
-            if not cliente:
-                return RedirectResponse("/personal/alunos?erro=Dados do aluno não encontrados", status_code=303)
-            
-            usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
+            usuario_aluno = (await _obter_usuarios_alunos([aluno_rel.aluno_id])).get(aluno_rel.aluno_id)
             if not usuario_aluno:
                 return RedirectResponse("/personal/alunos?erro=Dados do aluno não encontrados", status_code=303)
             
@@ -280,26 +251,26 @@ def register_personal_routes(app: FastAPI):
             # Buscar treinos ativos
             treinos_ativos = []
             try:
-                treinos_ativos = treino_personalizado_repo.obter_por_aluno(aluno_id)
+                treinos_ativos = await treino_personalizado_repo.obter_por_aluno(aluno_id)
             except Exception as e:
-                print(f"[ERRO] Erro ao buscar treinos: {e}")
+                logger.error("Erro ao buscar treinos: %s", e)
             
             # Buscar avaliações
             avaliacoes = []
             ultima_avaliacao = None
             try:
-                avaliacoes = avaliacao_fisica_repo.obter_por_aluno(aluno_id)
+                avaliacoes = await avaliacao_fisica_repo.obter_por_aluno(aluno_id)
                 if avaliacoes:
                     ultima_avaliacao = avaliacoes[0].data_avaliacao
             except Exception as e:
-                print(f"[ERRO] Erro ao buscar avaliações: {e}")
+                logger.error("Erro ao buscar avaliações: %s", e)
             
             # Buscar progressos
             progressos = []
             try:
-                progressos = progresso_aluno_repo.obter_por_aluno(aluno_id)
+                progressos = await progresso_aluno_repo.obter_por_aluno(aluno_id)
             except Exception as e:
-                print(f"[ERRO] Erro ao buscar progressos: {e}")
+                logger.error("Erro ao buscar progressos: %s", e)
             
             return templates.TemplateResponse("personal/alunos/detalhes.html", {
                 "request": request,
@@ -312,9 +283,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Detalhes aluno: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Detalhes aluno: %s", e)
             return RedirectResponse("/personal/alunos?erro=Erro ao carregar detalhes do aluno", status_code=303)
 
 
@@ -323,26 +292,26 @@ def register_personal_routes(app: FastAPI):
     async def personal_alunos_editar_get(
         request: Request, 
         aluno_id: int, 
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Formulário de edição com validação de propriedade"""
         try:
             # Validar propriedade
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
+            profissional = contexto.profissional
             if not profissional:
                 return RedirectResponse("/personal/alunos?erro=Acesso negado", status_code=303)
             
-            personal = personal_repo.obter_por_profissional(profissional.id)
+            personal = contexto.personal
             if not personal:
                 return RedirectResponse("/personal/alunos?erro=Acesso negado", status_code=303)
             
-            aluno_rel = personal_aluno_repo.obter_por_id(aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(aluno_id)
             if not aluno_rel or aluno_rel.personal_id != personal.id:
                 return RedirectResponse("/personal/alunos?erro=Aluno não encontrado", status_code=303)
             
             # Buscar dados do aluno
-            cliente = cliente_repo.obter_por_id(aluno_rel.aluno_id)
-            usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id) if cliente else None
+            usuario_aluno = (await _obter_usuarios_alunos([aluno_rel.aluno_id])).get(aluno_rel.aluno_id)
             
             if not usuario_aluno:
                 return RedirectResponse("/personal/alunos?erro=Dados do aluno não encontrados", status_code=303)
@@ -376,9 +345,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Editar aluno GET: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Editar aluno GET: %s", e)
             return RedirectResponse("/personal/alunos?erro=Erro ao carregar aluno", status_code=303)
 
     # =================== GESTÃO COMPLETA DE TREINOS ===================
@@ -393,10 +360,14 @@ def register_personal_routes(app: FastAPI):
 # ============================================
     @app.get("/personal/treinos")
     @requer_autenticacao(['profissional'])
-    async def personal_treinos_listar(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_treinos_listar(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         """Lista todos os treinos do personal"""
         try:
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
+            profissional = contexto.profissional
             if not profissional:
                 return templates.TemplateResponse("personal/treinos/listar.html", {
                     "request": request,
@@ -404,7 +375,7 @@ def register_personal_routes(app: FastAPI):
                     "treinos": []
                 })
             
-            personal = personal_repo.obter_por_profissional(profissional.id)
+            personal = contexto.personal
             if not personal:
                 return templates.TemplateResponse("personal/treinos/listar.html", {
                     "request": request,
@@ -412,34 +383,22 @@ def register_personal_routes(app: FastAPI):
                     "treinos": []
                 })
             
-            alunos_relacionamento = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            todos_treinos = []
-            
-            for rel in alunos_relacionamento:
-                try:
-                    treinos_aluno = treino_personalizado_repo.obter_por_aluno(rel.id)
-                    cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id) if cliente else None
-                    aluno_nome = usuario_aluno.nome if usuario_aluno else 'N/A'
-                    
-                    for treino in treinos_aluno:
-                        todos_treinos.append({
-                            'id': treino.id,
-                            'nome': treino.nome,
-                            'aluno_nome': aluno_nome,
-                            'objetivo': treino.objetivo,
-                            'nivel_dificuldade': treino.nivel_dificuldade,
-                            'status': 'ativo',
-                            'criado_em': None,
-                            'frequencia_semanal': getattr(treino, 'dias_semana', None),
-                            'duracao_semanas': treino.duracao_semanas,
-                            'descricao': treino.descricao
-                        })
-                except Exception as e:
-                    print(f"[ERRO] Erro ao buscar treinos do aluno {rel.id}: {e}")
-                    continue
-            
-            todos_treinos.sort(key=lambda x: x['id'], reverse=True)
+            # Treinos de todos os alunos, já com o nome do aluno (mais recentes primeiro)
+            todos_treinos = [
+                {
+                    'id': treino['id'],
+                    'nome': treino['nome'],
+                    'aluno_nome': treino['aluno_nome'],
+                    'objetivo': treino['objetivo'],
+                    'nivel_dificuldade': treino['nivel_dificuldade'],
+                    'status': 'ativo',
+                    'criado_em': None,
+                    'frequencia_semanal': treino['dias_semana'],
+                    'duracao_semanas': treino['duracao_semanas'],
+                    'descricao': treino['descricao']
+                }
+                for treino in await treino_personalizado_repo.obter_por_personal(personal.id)
+            ]
             
             return templates.TemplateResponse("personal/treinos/listar.html", {
                 "request": request,
@@ -448,9 +407,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Listar treinos: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Listar treinos: %s", e)
             return templates.TemplateResponse("personal/treinos/listar.html", {
                 "request": request,
                 "usuario": usuario_logado,
@@ -463,28 +420,22 @@ def register_personal_routes(app: FastAPI):
     # ============================================
     @app.get("/personal/treinos/novo")
     @requer_autenticacao(['profissional'])
-    async def personal_treinos_novo_get(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_treinos_novo_get(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         """Formulário para criar novo treino"""
         try:
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/treinos?erro=Personal não encontrado", status_code=303)
             
-            alunos_rel = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            alunos_disponiveis = []
-            
-            for rel in alunos_rel:
-                cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                if cliente:
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if usuario_aluno:
-                        alunos_disponiveis.append({
-                            'id': rel.id,
-                            'nome': usuario_aluno.nome,
-                            'email': usuario_aluno.email
-                        })
+            alunos_disponiveis = [
+                {'id': rel['id'], 'nome': rel['nome'], 'email': rel['email']}
+                for rel in await personal_aluno_repo.obter_alunos_detalhados_por_personal(personal.id)
+            ]
             
             return templates.TemplateResponse("personal/treinos/form.html", {
                 "request": request,
@@ -495,7 +446,7 @@ def register_personal_routes(app: FastAPI):
                 "acao": "/personal/treinos/salvar"
             })
         except Exception as e:
-            print(f"[ERRO] Novo treino GET: {str(e)}")
+            logger.error("Novo treino GET: %s", e)
             return RedirectResponse("/personal/treinos?erro=Erro ao carregar formulário", status_code=303)
 
 
@@ -507,48 +458,38 @@ def register_personal_routes(app: FastAPI):
     async def personal_treinos_editar_get(
         request: Request,
         treino_id: int,
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Formulário para editar treino - VERSÃO CORRIGIDA"""
         try:
-            print(f"[DEBUG] Carregando formulário de edição do treino {treino_id}")
+            logger.debug("Carregando formulário de edição do treino %s", treino_id)
             
             # Buscar treino
-            treino = treino_personalizado_repo.obter_por_id(treino_id)
+            treino = await treino_personalizado_repo.obter_por_id(treino_id)
             if not treino:
-                print(f"[ERRO] Treino {treino_id} não encontrado")
+                logger.error("Treino %s não encontrado", treino_id)
                 return RedirectResponse("/personal/treinos?erro=Treino não encontrado", status_code=303)
             
-            print(f"[DEBUG] Treino encontrado: {treino.nome}")
-            print(f"[DEBUG] PersonalAluno ID: {treino.personal_aluno_id}")
+            logger.debug("Treino encontrado: %s (PersonalAluno ID: %s)", treino.nome, treino.personal_aluno_id)
             
             # Buscar personal e validar propriedade
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/treinos?erro=Personal não encontrado", status_code=303)
             
             # Validar que o treino pertence a este personal
-            aluno_rel = personal_aluno_repo.obter_por_id(treino.personal_aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(treino.personal_aluno_id)
             if not aluno_rel or aluno_rel.personal_id != personal.id:
-                print(f"[ERRO] Treino não pertence ao personal logado")
+                logger.error("Treino não pertence ao personal logado")
                 return RedirectResponse("/personal/treinos?erro=Acesso negado", status_code=303)
             
             # Buscar todos os alunos do personal (para o dropdown)
-            alunos_rel_lista = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            alunos_disponiveis = []
-            
-            for rel in alunos_rel_lista:
-                cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                if cliente:
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if usuario_aluno:
-                        alunos_disponiveis.append({
-                            'id': rel.id,
-                            'nome': usuario_aluno.nome,
-                            'email': usuario_aluno.email
-                        })
+            alunos_disponiveis = [
+                {'id': rel['id'], 'nome': rel['nome'], 'email': rel['email']}
+                for rel in await personal_aluno_repo.obter_alunos_detalhados_por_personal(personal.id)
+            ]
             
             # Converter treino para dict com campos corretos do formulário
             treino_dict = {
@@ -563,7 +504,7 @@ def register_personal_routes(app: FastAPI):
                 'status': 'ativo'  # Valor fixo (campo não existe no banco)
             }
             
-            print(f"[DEBUG] Treino dict preparado: {treino_dict}")
+            logger.debug("Treino dict preparado: %s", treino_dict)
             
             return templates.TemplateResponse("personal/treinos/form.html", {
                 "request": request,
@@ -575,9 +516,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Editar treino GET: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Editar treino GET: %s", e)
             return RedirectResponse("/personal/treinos?erro=Erro ao carregar treino", status_code=303)
 
 
@@ -604,31 +543,26 @@ def register_personal_routes(app: FastAPI):
         Salvar treino (criar ou atualizar) - VERSÃO FINAL CORRIGIDA
         """
         try:
-            print("=" * 80)
-            print(f"[DEBUG] SALVANDO TREINO")
-            print(f"[DEBUG] treino_id: {treino_id} (None = criar novo, número = editar)")
-            print(f"[DEBUG] aluno_id: {aluno_id}")
-            print(f"[DEBUG] nome: {nome}")
-            print(f"[DEBUG] objetivo: {objetivo}")
-            print(f"[DEBUG] nivel_dificuldade: {nivel_dificuldade}")
-            print(f"[DEBUG] frequencia_semanal: {frequencia_semanal}")
-            print(f"[DEBUG] duracao_semanas: {duracao_semanas}")
-            print("=" * 80)
+            logger.debug(
+                "Salvando treino: treino_id=%s (None = criar novo) aluno_id=%s nome=%s objetivo=%s "
+                "nivel_dificuldade=%s frequencia_semanal=%s duracao_semanas=%s",
+                treino_id, aluno_id, nome, objetivo, nivel_dificuldade, frequencia_semanal, duracao_semanas
+            )
             
             if treino_id:
                 # ============== ATUALIZAR TREINO EXISTENTE ==============
-                print(f"[DEBUG] Modo: ATUALIZAR treino {treino_id}")
+                logger.debug("Modo: ATUALIZAR treino %s", treino_id)
                 
-                treino_existente = treino_personalizado_repo.obter_por_id(treino_id)
+                treino_existente = await treino_personalizado_repo.obter_por_id(treino_id)
                 
                 if not treino_existente:
-                    print(f"[ERRO] Treino {treino_id} não encontrado")
+                    logger.error("Treino %s não encontrado", treino_id)
                     return RedirectResponse(
                         "/personal/treinos?erro=Treino não encontrado",
                         status_code=303
                     )
                 
-                print(f"[DEBUG] Treino encontrado: {treino_existente.nome}")
+                logger.debug("Treino encontrado: %s", treino_existente.nome)
                 
                 # Atualizar campos (usando os campos corretos do banco)
                 treino_existente.nome = nome
@@ -639,17 +573,17 @@ def register_personal_routes(app: FastAPI):
                 treino_existente.descricao = descricao
                 treino_existente.atualizado_em = datetime.now()
                 
-                print(f"[DEBUG] Chamando treino_personalizado_repo.alterar()...")
-                sucesso = treino_personalizado_repo.alterar(treino_existente)
+                logger.debug("Chamando await treino_personalizado_repo.alterar()...")
+                sucesso = await treino_personalizado_repo.alterar(treino_existente)
                 
                 if sucesso:
-                    print(f"[SUCESSO] Treino {treino_id} atualizado com sucesso")
+                    logger.info("Treino %s atualizado com sucesso", treino_id)
                     return RedirectResponse(
                         "/personal/treinos?sucesso=Treino atualizado com sucesso",
                         status_code=303
                     )
                 else:
-                    print(f"[ERRO] Falha ao atualizar treino {treino_id}")
+                    logger.error("Falha ao atualizar treino %s", treino_id)
                     return RedirectResponse(
                         "/personal/treinos?erro=Erro ao atualizar treino no banco",
                         status_code=303
@@ -657,18 +591,18 @@ def register_personal_routes(app: FastAPI):
             
             else:
                 # ============== CRIAR NOVO TREINO ==============
-                print(f"[DEBUG] Modo: CRIAR NOVO treino")
+                logger.debug("Modo: CRIAR NOVO treino")
                 
                 # Validar que o aluno existe
-                aluno_rel = personal_aluno_repo.obter_por_id(aluno_id)
+                aluno_rel = await personal_aluno_repo.obter_por_id(aluno_id)
                 if not aluno_rel:
-                    print(f"[ERRO] PersonalAluno {aluno_id} não encontrado")
+                    logger.error("PersonalAluno %s não encontrado", aluno_id)
                     return RedirectResponse(
                         "/personal/treinos?erro=Aluno não encontrado",
                         status_code=303
                     )
                 
-                print(f"[DEBUG] Criando objeto TreinoPersonalizado...")
+                logger.debug("Criando objeto TreinoPersonalizado...")
                 
                 # Criar objeto (campos obrigatórios primeiro)
                 novo_treino = TreinoPersonalizado(
@@ -689,28 +623,26 @@ def register_personal_routes(app: FastAPI):
                 novo_treino.criado_em = datetime.now()
                 novo_treino.atualizado_em = None
                 
-                print(f"[DEBUG] Objeto criado: {novo_treino}")
-                print(f"[DEBUG] Chamando treino_personalizado_repo.inserir()...")
+                logger.debug("Objeto criado: %s", novo_treino)
+                logger.debug("Chamando await treino_personalizado_repo.inserir()...")
                 
-                treino_id_inserido = treino_personalizado_repo.inserir(novo_treino)
+                treino_id_inserido = await treino_personalizado_repo.inserir(novo_treino)
                 
                 if treino_id_inserido:
-                    print(f"[SUCESSO] Treino criado com ID: {treino_id_inserido}")
+                    logger.info("Treino criado com ID: %s", treino_id_inserido)
                     return RedirectResponse(
                         "/personal/treinos?sucesso=Treino criado com sucesso",
                         status_code=303
                     )
                 else:
-                    print(f"[ERRO] Falha ao inserir treino")
+                    logger.error("Falha ao inserir treino")
                     return RedirectResponse(
                         "/personal/treinos?erro=Erro ao criar treino no banco",
                         status_code=303
                     )
                     
         except Exception as e:
-            print(f"[ERRO CRÍTICO] Ao salvar treino: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Ao salvar treino: %s", e)
             
             return RedirectResponse(
                 f"/personal/treinos?erro=Erro: {str(e)}",
@@ -730,15 +662,15 @@ def register_personal_routes(app: FastAPI):
     ):
         """Excluir treino"""
         try:
-            treino = treino_personalizado_repo.obter_por_id(treino_id)
+            treino = await treino_personalizado_repo.obter_por_id(treino_id)
             if not treino:
                 return RedirectResponse("/personal/treinos?erro=Treino não encontrado", status_code=303)
             
-            treino_personalizado_repo.excluir(treino_id)
+            await treino_personalizado_repo.excluir(treino_id)
             
             return RedirectResponse("/personal/treinos?sucesso=Treino excluído com sucesso", status_code=303)
         except Exception as e:
-            print(f"[ERRO] Excluir treino: {str(e)}")
+            logger.error("Excluir treino: %s", e)
             return RedirectResponse("/personal/treinos?erro=Erro ao excluir treino", status_code=303)
 
     # =================== GESTÃO DE AVALIAÇÕES FÍSICAS ===================
@@ -751,13 +683,16 @@ def register_personal_routes(app: FastAPI):
 # ============================================
     @app.get("/personal/avaliacoes")
     @requer_autenticacao(['profissional'])
-    async def personal_avaliacoes_listar(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_avaliacoes_listar(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         """Lista todas as avaliações físicas dos alunos do personal"""
         from datetime import datetime
 
         try:
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
 
             if not personal:
                 return templates.TemplateResponse("personal/avaliacoes/listar.html", {
@@ -766,24 +701,18 @@ def register_personal_routes(app: FastAPI):
                     "avaliacoes": []
                 })
 
-            # Buscar todos os alunos e suas avaliações
-            alunos = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            todas_avaliacoes = []
-
-            for aluno in alunos:
-                avaliacoes = avaliacao_fisica_repo.obter_por_aluno(aluno.id)
-                for avaliacao in avaliacoes:
-                    cliente = cliente_repo.obter_por_id(aluno.aluno_id)
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id) if cliente else None
-
-                    todas_avaliacoes.append({
-                        'id': avaliacao.id,
-                        'aluno_nome': usuario_aluno.nome if usuario_aluno else 'N/A',
-                        'data_avaliacao': avaliacao.data_avaliacao,
-                        'peso': avaliacao.peso,
-                        'imc': avaliacao.imc,
-                        'percentual_gordura': avaliacao.percentual_gordura
-                    })
+            # Avaliações de todos os alunos, já com o nome do aluno (mais recentes primeiro)
+            todas_avaliacoes = [
+                {
+                    'id': avaliacao['id'],
+                    'aluno_nome': avaliacao['aluno_nome'],
+                    'data_avaliacao': avaliacao['data_avaliacao'],
+                    'peso': avaliacao['peso'],
+                    'imc': avaliacao['imc'],
+                    'percentual_gordura': avaliacao['percentual_gordura']
+                }
+                for avaliacao in await avaliacao_fisica_repo.obter_por_personal(personal.id)
+            ]
 
             # Formatar datas após montar todas_avaliacoes
             for aval in todas_avaliacoes:
@@ -798,9 +727,6 @@ def register_personal_routes(app: FastAPI):
                 else:
                     aval["data_formatada"] = "-"
 
-            # Ordenar por data (mais recente primeiro)
-            todas_avaliacoes.sort(key=lambda x: x['data_avaliacao'], reverse=True)
-
             return templates.TemplateResponse("personal/avaliacoes/listar.html", {
                 "request": request,
                 "usuario": usuario_logado,
@@ -808,9 +734,7 @@ def register_personal_routes(app: FastAPI):
             })
 
         except Exception as e:
-            print(f"[ERRO] Listar avaliações: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Listar avaliações: %s", e)
             return templates.TemplateResponse("personal/avaliacoes/listar.html", {
                 "request": request,
                 "usuario": usuario_logado,
@@ -824,30 +748,24 @@ def register_personal_routes(app: FastAPI):
     # ============================================
     @app.get("/personal/avaliacoes/nova")
     @requer_autenticacao(['profissional'])
-    async def personal_avaliacoes_nova_get(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_avaliacoes_nova_get(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         """Formulário para criar nova avaliação física"""
         try:
             # Buscar personal
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/avaliacoes?erro=Personal não encontrado", status_code=303)
             
             # Buscar alunos do personal
-            alunos_rel = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            alunos_disponiveis = []
-            
-            for rel in alunos_rel:
-                cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                if cliente:
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if usuario_aluno:
-                        alunos_disponiveis.append({
-                            'id': rel.id,
-                            'nome': usuario_aluno.nome,
-                            'email': usuario_aluno.email
-                        })
+            alunos_disponiveis = [
+                {'id': rel['id'], 'nome': rel['nome'], 'email': rel['email']}
+                for rel in await personal_aluno_repo.obter_alunos_detalhados_por_personal(personal.id)
+            ]
             
             # Verificar se há query param 'aluno' (vindo de detalhes do aluno)
             aluno_selecionado_id = request.query_params.get('aluno')
@@ -863,9 +781,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Nova avaliação GET: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Nova avaliação GET: %s", e)
             return RedirectResponse("/personal/avaliacoes?erro=Erro ao carregar formulário", status_code=303)
 
 
@@ -890,10 +806,8 @@ def register_personal_routes(app: FastAPI):
     ):
         """Salvar avaliação física (criar ou atualizar)"""
         try:
-            print(f"[DEBUG] Salvando avaliação física...")
-            print(f"[DEBUG] avaliacao_id: {avaliacao_id}")
-            print(f"[DEBUG] aluno_id: {aluno_id}")
-            print(f"[DEBUG] peso: {peso}, altura: {altura}")
+            logger.debug("Salvando avaliação física: avaliacao_id=%s aluno_id=%s peso=%s altura=%s",
+                         avaliacao_id, aluno_id, peso, altura)
             
             # Converter data_avaliacao de string para datetime
             try:
@@ -908,7 +822,7 @@ def register_personal_routes(app: FastAPI):
             imc = None
             if peso and altura and altura > 0:
                 imc = peso / (altura * altura)
-                print(f"[DEBUG] IMC calculado: {imc}")
+                logger.debug("IMC calculado: %s", imc)
             
             # Converter proxima_avaliacao se fornecida
             proxima_aval_dt = None
@@ -920,9 +834,9 @@ def register_personal_routes(app: FastAPI):
             
             if avaliacao_id:
                 # ============== ATUALIZAR AVALIAÇÃO EXISTENTE ==============
-                print(f"[DEBUG] Modo: ATUALIZAR avaliação {avaliacao_id}")
+                logger.debug("Modo: ATUALIZAR avaliação %s", avaliacao_id)
                 
-                avaliacao_existente = avaliacao_fisica_repo.obter_por_id(avaliacao_id)
+                avaliacao_existente = await avaliacao_fisica_repo.obter_por_id(avaliacao_id)
                 
                 if not avaliacao_existente:
                     return RedirectResponse(
@@ -941,10 +855,10 @@ def register_personal_routes(app: FastAPI):
                 avaliacao_existente.observacoes = observacoes
                 avaliacao_existente.proxima_avaliacao = proxima_aval_dt
                 
-                sucesso = avaliacao_fisica_repo.alterar(avaliacao_existente)
+                sucesso = await avaliacao_fisica_repo.alterar(avaliacao_existente)
                 
                 if sucesso:
-                    print(f"[SUCESSO] Avaliação {avaliacao_id} atualizada")
+                    logger.info("Avaliação %s atualizada", avaliacao_id)
                     return RedirectResponse(
                         "/personal/avaliacoes?sucesso=Avaliação atualizada com sucesso",
                         status_code=303
@@ -957,10 +871,10 @@ def register_personal_routes(app: FastAPI):
             
             else:
                 # ============== CRIAR NOVA AVALIAÇÃO ==============
-                print(f"[DEBUG] Modo: CRIAR nova avaliação")
+                logger.debug("Modo: CRIAR nova avaliação")
                 
                 # Validar que o aluno existe
-                aluno_rel = personal_aluno_repo.obter_por_id(aluno_id)
+                aluno_rel = await personal_aluno_repo.obter_por_id(aluno_id)
                 if not aluno_rel:
                     return RedirectResponse(
                         "/personal/avaliacoes?erro=Aluno não encontrado",
@@ -984,12 +898,12 @@ def register_personal_routes(app: FastAPI):
                     proxima_avaliacao=proxima_aval_dt
                 )
                 
-                print(f"[DEBUG] Objeto criado: {nova_avaliacao}")
+                logger.debug("Objeto criado: %s", nova_avaliacao)
                 
-                avaliacao_id_inserido = avaliacao_fisica_repo.inserir(nova_avaliacao)
+                avaliacao_id_inserido = await avaliacao_fisica_repo.inserir(nova_avaliacao)
                 
                 if avaliacao_id_inserido:
-                    print(f"[SUCESSO] Avaliação criada com ID: {avaliacao_id_inserido}")
+                    logger.info("Avaliação criada com ID: %s", avaliacao_id_inserido)
                     return RedirectResponse(
                         "/personal/avaliacoes?sucesso=Avaliação criada com sucesso",
                         status_code=303
@@ -1001,9 +915,7 @@ def register_personal_routes(app: FastAPI):
                     )
                     
         except Exception as e:
-            print(f"[ERRO CRÍTICO] Ao salvar avaliação: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Ao salvar avaliação: %s", e)
             
             return RedirectResponse(
                 f"/personal/avaliacoes?erro=Erro: {str(e)}",
@@ -1023,21 +935,19 @@ def register_personal_routes(app: FastAPI):
     ):
         """Ver detalhes de uma avaliação física"""
         try:
-            avaliacao = avaliacao_fisica_repo.obter_por_id(avaliacao_id)
+            avaliacao = await avaliacao_fisica_repo.obter_por_id(avaliacao_id)
             
             if not avaliacao:
                 return RedirectResponse("/personal/avaliacoes?erro=Avaliação não encontrada", status_code=303)
             
             # Buscar dados do aluno
-            aluno_rel = personal_aluno_repo.obter_por_id(avaliacao.personal_aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(avaliacao.personal_aluno_id)
             aluno_nome = "N/A"
             
             if aluno_rel:
-                cliente = cliente_repo.obter_por_id(aluno_rel.aluno_id)
-                if cliente:
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if usuario_aluno:
-                        aluno_nome = usuario_aluno.nome
+                usuario_aluno = (await _obter_usuarios_alunos([aluno_rel.aluno_id])).get(aluno_rel.aluno_id)
+                if usuario_aluno:
+                    aluno_nome = usuario_aluno.nome
             
             return templates.TemplateResponse("personal/avaliacoes/detalhes.html", {
                 "request": request,
@@ -1047,7 +957,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Detalhes avaliação: {str(e)}")
+            logger.error("Detalhes avaliação: %s", e)
             return RedirectResponse("/personal/avaliacoes?erro=Erro ao carregar detalhes", status_code=303)
 
 
@@ -1059,36 +969,27 @@ def register_personal_routes(app: FastAPI):
     async def personal_avaliacoes_editar_get(
         request: Request,
         avaliacao_id: int,
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Formulário para editar avaliação física"""
         try:
-            avaliacao = avaliacao_fisica_repo.obter_por_id(avaliacao_id)
+            avaliacao = await avaliacao_fisica_repo.obter_por_id(avaliacao_id)
             
             if not avaliacao:
                 return RedirectResponse("/personal/avaliacoes?erro=Avaliação não encontrada", status_code=303)
             
             # Buscar personal e alunos
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/avaliacoes?erro=Personal não encontrado", status_code=303)
             
             # Buscar alunos do personal
-            alunos_rel = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            alunos_disponiveis = []
-            
-            for rel in alunos_rel:
-                cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                if cliente:
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if usuario_aluno:
-                        alunos_disponiveis.append({
-                            'id': rel.id,
-                            'nome': usuario_aluno.nome,
-                            'email': usuario_aluno.email
-                        })
+            alunos_disponiveis = [
+                {'id': rel['id'], 'nome': rel['nome'], 'email': rel['email']}
+                for rel in await personal_aluno_repo.obter_alunos_detalhados_por_personal(personal.id)
+            ]
             
             def formatar_data_para_input(data):
                 from datetime import datetime
@@ -1124,9 +1025,7 @@ def register_personal_routes(app: FastAPI):
             })
 
         except Exception as e:
-            print(f"[ERRO] Editar avaliação GET: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Editar avaliação GET: %s", e)
             return RedirectResponse("/personal/avaliacoes?erro=Erro ao carregar avaliação", status_code=303)
 
     # ============================================
@@ -1141,26 +1040,29 @@ def register_personal_routes(app: FastAPI):
     ):
         """Excluir avaliação física"""
         try:
-            avaliacao = avaliacao_fisica_repo.obter_por_id(avaliacao_id)
+            avaliacao = await avaliacao_fisica_repo.obter_por_id(avaliacao_id)
             
             if not avaliacao:
                 return RedirectResponse("/personal/avaliacoes?erro=Avaliação não encontrada", status_code=303)
             
-            avaliacao_fisica_repo.excluir(avaliacao_id)
+            await avaliacao_fisica_repo.excluir(avaliacao_id)
             
             return RedirectResponse("/personal/avaliacoes?sucesso=Avaliação excluída com sucesso", status_code=303)
             
         except Exception as e:
-            print(f"[ERRO] Excluir avaliação: {str(e)}")
+            logger.error("Excluir avaliação: %s", e)
             return RedirectResponse("/personal/avaliacoes?erro=Erro ao excluir avaliação", status_code=303)
         
     # =================== GESTÃO DE PROGRESSOS ===================
     @app.get("/personal/progressos")
     @requer_autenticacao(['profissional'])
-    async def personal_progressos_listar(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_progressos_listar(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         try:
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return templates.TemplateResponse("personal/progressos/listar.html", {
@@ -1169,27 +1071,18 @@ def register_personal_routes(app: FastAPI):
                     "progressos": []
                 })
             
-            # Buscar progressos de todos os alunos
-            alunos = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            todos_progressos = []
-            
-            for aluno in alunos:
-                progressos = progresso_aluno_repo.obter_por_aluno(aluno.id)
-                for progresso in progressos:
-                    cliente = cliente_repo.obter_por_id(aluno.aluno_id)
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id) if cliente else None
-                    
-                    todos_progressos.append({
-                        'id': progresso.id,
-                        'aluno_nome': usuario_aluno.nome if usuario_aluno else 'N/A',
-                        'data_registro': progresso.data_registro,
-                        'peso': progresso.peso,
-                        'humor': progresso.humor,
-                        'energia': progresso.energia
-                    })
-            
-            # Ordenar por data
-            todos_progressos.sort(key=lambda x: x['data_registro'], reverse=True)
+            # Progressos de todos os alunos, já com o nome do aluno (mais recentes primeiro)
+            todos_progressos = [
+                {
+                    'id': progresso['id'],
+                    'aluno_nome': progresso['aluno_nome'],
+                    'data_registro': progresso['data_registro'],
+                    'peso': progresso['peso'],
+                    'humor': progresso['humor'],
+                    'energia': progresso['energia']
+                }
+                for progresso in await progresso_aluno_repo.obter_por_personal(personal.id)
+            ]
             
             return templates.TemplateResponse("personal/progressos/listar.html", {
                 "request": request,
@@ -1197,7 +1090,7 @@ def register_personal_routes(app: FastAPI):
                 "progressos": todos_progressos
             })
         except Exception as e:
-            print(f"[ERRO] Listar progressos: {str(e)}")
+            logger.error("Listar progressos: %s", e)
             return templates.TemplateResponse("personal/progressos/listar.html", {
                 "request": request,
                 "usuario": usuario_logado,
@@ -1209,30 +1102,24 @@ def register_personal_routes(app: FastAPI):
 
     @app.get("/personal/progressos/novo")
     @requer_autenticacao(['profissional'])
-    async def personal_progressos_novo_get(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_progressos_novo_get(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         """Formulário para criar novo registro de progresso"""
         try:
             # Buscar personal
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/progressos?erro=Personal não encontrado", status_code=303)
             
             # Buscar alunos do personal
-            alunos_rel = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            alunos_disponiveis = []
-            
-            for rel in alunos_rel:
-                cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                if cliente:
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if usuario_aluno:
-                        alunos_disponiveis.append({
-                            'id': rel.id,
-                            'nome': usuario_aluno.nome,
-                            'email': usuario_aluno.email
-                        })
+            alunos_disponiveis = [
+                {'id': rel['id'], 'nome': rel['nome'], 'email': rel['email']}
+                for rel in await personal_aluno_repo.obter_alunos_detalhados_por_personal(personal.id)
+            ]
             
             # Data de hoje para o formulário
             data_hoje = datetime.now().strftime('%Y-%m-%d')
@@ -1245,9 +1132,7 @@ def register_personal_routes(app: FastAPI):
                 "data_hoje": data_hoje
             })
         except Exception as e:
-            print(f"[ERRO] Novo progresso GET: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Novo progresso GET: %s", e)
             return RedirectResponse("/personal/progressos?erro=Erro ao carregar formulário", status_code=303)
 
 
@@ -1268,7 +1153,8 @@ def register_personal_routes(app: FastAPI):
         circunferencia_perna: Optional[float] = Form(None),
         circunferencia_peito: Optional[float] = Form(None),
         circunferencia_abdomem: Optional[float] = Form(None),
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Salvar progresso (criar ou atualizar)"""
         try:
@@ -1276,20 +1162,19 @@ def register_personal_routes(app: FastAPI):
             data_registro_dt = datetime.strptime(data_registro, '%Y-%m-%d')
             
             # Validar se é um aluno do personal logado
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/progressos?erro=Personal não encontrado", status_code=303)
             
             # Validar propriedade do aluno
-            aluno_rel = personal_aluno_repo.obter_por_id(aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(aluno_id)
             if not aluno_rel or aluno_rel.personal_id != personal.id:
                 return RedirectResponse("/personal/progressos?erro=Aluno não encontrado ou acesso negado", status_code=303)
             
             if progresso_id:
                 # Atualizar progresso existente
-                progresso = progresso_aluno_repo.obter_por_id(progresso_id)
+                progresso = await progresso_aluno_repo.obter_por_id(progresso_id)
                 if progresso:
                     progresso.data_registro = data_registro_dt
                     progresso.peso = peso
@@ -1311,7 +1196,7 @@ def register_personal_routes(app: FastAPI):
                     if hasattr(progresso, 'circunferencia_abdomem'):
                         progresso.circunferencia_abdomem = circunferencia_abdomem
                     
-                    progresso_aluno_repo.alterar(progresso)
+                    await progresso_aluno_repo.alterar(progresso)
                     return RedirectResponse("/personal/progressos?sucesso=Progresso atualizado com sucesso", status_code=303)
             else:
                 # Criar novo progresso
@@ -1343,13 +1228,11 @@ def register_personal_routes(app: FastAPI):
                 if hasattr(novo_progresso, 'circunferencia_abdomem'):
                     novo_progresso.circunferencia_abdomem = circunferencia_abdomem
                 
-                progresso_aluno_repo.inserir(novo_progresso)
+                await progresso_aluno_repo.inserir(novo_progresso)
                 return RedirectResponse("/personal/progressos?sucesso=Progresso registrado com sucesso", status_code=303)
                 
         except Exception as e:
-            print(f"[ERRO] Salvar progresso: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Salvar progresso: %s", e)
             return RedirectResponse("/personal/progressos?erro=Erro ao salvar progresso", status_code=303)
 
 
@@ -1358,30 +1241,29 @@ def register_personal_routes(app: FastAPI):
     async def personal_progressos_detalhes(
         request: Request,
         progresso_id: int,
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Ver detalhes do progresso"""
         try:
             # Validar propriedade
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/progressos?erro=Personal não encontrado", status_code=303)
             
             # Buscar progresso
-            progresso = progresso_aluno_repo.obter_por_id(progresso_id)
+            progresso = await progresso_aluno_repo.obter_por_id(progresso_id)
             if not progresso:
                 return RedirectResponse("/personal/progressos?erro=Progresso não encontrado", status_code=303)
             
             # Buscar dados do aluno e validar propriedade
-            aluno_rel = personal_aluno_repo.obter_por_id(progresso.personal_aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(progresso.personal_aluno_id)
             if not aluno_rel or aluno_rel.personal_id != personal.id:
                 return RedirectResponse("/personal/progressos?erro=Acesso negado", status_code=303)
             
             # Buscar nome do aluno
-            cliente = cliente_repo.obter_por_id(aluno_rel.aluno_id)
-            usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id) if cliente else None
+            usuario_aluno = (await _obter_usuarios_alunos([aluno_rel.aluno_id])).get(aluno_rel.aluno_id)
             aluno_nome = usuario_aluno.nome if usuario_aluno else 'N/A'
             
             # CORREÇÃO: Converter data_registro para datetime se vier como string
@@ -1396,7 +1278,7 @@ def register_personal_routes(app: FastAPI):
                         data_registro_convertida = datetime.now()
             
             # Buscar último progresso anterior (para comparação)
-            todos_progressos = progresso_aluno_repo.obter_por_aluno(progresso.personal_aluno_id)
+            todos_progressos = await progresso_aluno_repo.obter_por_aluno(progresso.personal_aluno_id)
             
             # Converter datas de todos os progressos
             for prog in todos_progressos:
@@ -1464,9 +1346,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Detalhes progresso: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Detalhes progresso: %s", e)
             return RedirectResponse("/personal/progressos?erro=Erro ao carregar detalhes", status_code=303)
 
 
@@ -1475,44 +1355,34 @@ def register_personal_routes(app: FastAPI):
     async def personal_progressos_editar_get(
         request: Request,
         progresso_id: int,
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Formulário para editar progresso"""
         try:
             # Validar propriedade
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/progressos?erro=Personal não encontrado", status_code=303)
             
-            progresso = progresso_aluno_repo.obter_por_id(progresso_id)
+            progresso = await progresso_aluno_repo.obter_por_id(progresso_id)
             if not progresso:
                 return RedirectResponse("/personal/progressos?erro=Progresso não encontrado", status_code=303)
             
             # Validar propriedade do aluno
-            aluno_rel = personal_aluno_repo.obter_por_id(progresso.personal_aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(progresso.personal_aluno_id)
             if not aluno_rel or aluno_rel.personal_id != personal.id:
                 return RedirectResponse("/personal/progressos?erro=Acesso negado", status_code=303)
             
             # Buscar todos os alunos (para o select, mesmo que desabilitado)
-            alunos_rel = personal_aluno_repo.obter_alunos_por_personal(personal.id)
-            alunos_disponiveis = []
-            
-            for rel in alunos_rel:
-                cliente = cliente_repo.obter_por_id(rel.aluno_id)
-                if cliente:
-                    usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id)
-                    if usuario_aluno:
-                        alunos_disponiveis.append({
-                            'id': rel.id,
-                            'nome': usuario_aluno.nome,
-                            'email': usuario_aluno.email
-                        })
+            alunos_disponiveis = [
+                {'id': rel['id'], 'nome': rel['nome'], 'email': rel['email']}
+                for rel in await personal_aluno_repo.obter_alunos_detalhados_por_personal(personal.id)
+            ]
             
             # Buscar nome do aluno atual
-            cliente = cliente_repo.obter_por_id(aluno_rel.aluno_id)
-            usuario_aluno = usuario_repo.obter_por_id(cliente.usuario_id) if cliente else None
+            usuario_aluno = (await _obter_usuarios_alunos([aluno_rel.aluno_id])).get(aluno_rel.aluno_id)
             
             # CORREÇÃO: Converter data_registro para datetime se vier como string
             data_registro_convertida = progresso.data_registro
@@ -1552,9 +1422,7 @@ def register_personal_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Editar progresso GET: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Editar progresso GET: %s", e)
             return RedirectResponse("/personal/progressos?erro=Erro ao carregar progresso", status_code=303)
 
 
@@ -1563,43 +1431,45 @@ def register_personal_routes(app: FastAPI):
     async def personal_progressos_excluir(
         request: Request,
         progresso_id: int,
-        usuario_logado: dict = Depends(obter_usuario_logado)
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
     ):
         """Excluir progresso"""
         try:
             # Validar propriedade
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            personal = contexto.personal
             
             if not personal:
                 return RedirectResponse("/personal/progressos?erro=Personal não encontrado", status_code=303)
             
-            progresso = progresso_aluno_repo.obter_por_id(progresso_id)
+            progresso = await progresso_aluno_repo.obter_por_id(progresso_id)
             if not progresso:
                 return RedirectResponse("/personal/progressos?erro=Progresso não encontrado", status_code=303)
             
             # Validar propriedade do aluno
-            aluno_rel = personal_aluno_repo.obter_por_id(progresso.personal_aluno_id)
+            aluno_rel = await personal_aluno_repo.obter_por_id(progresso.personal_aluno_id)
             if not aluno_rel or aluno_rel.personal_id != personal.id:
                 return RedirectResponse("/personal/progressos?erro=Acesso negado", status_code=303)
             
             # Excluir progresso
-            progresso_aluno_repo.excluir(progresso_id)
+            await progresso_aluno_repo.excluir(progresso_id)
             
             return RedirectResponse("/personal/progressos?sucesso=Progresso excluído com sucesso", status_code=303)
         except Exception as e:
-            print(f"[ERRO] Excluir progresso: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Excluir progresso: %s", e)
             return RedirectResponse("/personal/progressos?erro=Erro ao excluir progresso", status_code=303)
         
     # =================== PERFIL DO PERSONAL ===================
     @app.get("/personal/perfil")
     @requer_autenticacao(['profissional'])
-    async def personal_perfil(request: Request, usuario_logado: dict = Depends(obter_usuario_logado)):
+    async def personal_perfil(
+        request: Request,
+        usuario_logado: dict = Depends(obter_usuario_logado),
+        contexto: ContextoProfissional = Depends(obter_contexto_profissional)
+    ):
         try:
-            profissional = profissional_repo.obter_por_id(usuario_logado['id'])
-            personal = personal_repo.obter_por_profissional(profissional.id) if profissional else None
+            profissional = contexto.profissional
+            personal = contexto.personal
             
             return templates.TemplateResponse("personal/perfil.html", {
                 "request": request,
@@ -1608,7 +1478,7 @@ def register_personal_routes(app: FastAPI):
                 "personal": personal
             })
         except Exception as e:
-            print(f"[ERRO] Perfil personal: {str(e)}")
+            logger.error("Perfil personal: %s", e)
             return templates.TemplateResponse("personal/perfil.html", {
                 "request": request,
                 "usuario": usuario_logado,
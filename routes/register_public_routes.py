@@ -1,12 +1,12 @@
+import logging
 from datetime import datetime
 from typing import Optional
 from fastapi import FastAPI, Request, Form, Depends, UploadFile, File, status
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 
-from data.repo import plano_repo, usuario_repo, cliente_repo, profissional_repo
-from data.repo import personal_repo, personal_aluno_repo, treino_personalizado_repo
-from data.repo import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
+from data.repo_async import plano_repo, usuario_repo, cliente_repo, profissional_repo
+from data.repo_async import personal_repo, personal_aluno_repo, treino_personalizado_repo
+from data.repo_async import avaliacao_fisica_repo, progresso_aluno_repo, sessao_treino_repo
 from data.model.usuario_model import Usuario
 from data.model.cliente_model import Cliente
 from data.model.profissional_model import Profissional
@@ -15,21 +15,27 @@ from data.model.personal_model import Personal
 from data.model.personal_aluno_model import PersonalAluno
 from data.model.treino_personalizado_model import TreinoPersonalizado
 from util.file_upload import salvar_foto_registro
+from util.template_util import templates
+from util.cache_pagina import cache_paginas
 from util.security import criar_hash_senha, verificar_senha, gerar_senha_aleatoria
 from util.auth_decorator import criar_sessao, obter_usuario_logado, requer_autenticacao
 from util.email_service_gmail import email_service_gmail
+from util.email_worker import email_worker
+from util.db_async import executar
 from data.dtos.cadastro_cliente_dto import validar_cadastro_cliente
 from data.dtos.cadastro_profissional_dto import validar_cadastro_profissional, validar_foto_registro
 from data.dtos.login_dto import validar_login
 
-templates = Jinja2Templates(directory="templates")
+
+logger = logging.getLogger(__name__)
 
 
 def register_public_routes(app: FastAPI):
     
     @app.get("/")
+    @cache_paginas.em_cache
     async def index(request: Request):
-        planos = plano_repo.obter_todos()
+        planos = await plano_repo.obter_todos()
         planos_gratuitos = [p for p in planos if p.preco == 0.0]
         planos_pagos = [p for p in planos if p.preco > 0.0]
         plano_destaque = None
@@ -47,6 +53,7 @@ def register_public_routes(app: FastAPI):
         })
 
     @app.get("/sobre")
+    @cache_paginas.em_cache
     async def sobre(request: Request):
         return templates.TemplateResponse("inicio/sobre.html", {"request": request})
 
@@ -81,12 +88,14 @@ def register_public_routes(app: FastAPI):
             )
         
         try:
-            sucesso, resultado = email_service_gmail.enviar_mensagem_suporte(
+            sucesso, resultado = await executar(
+                email_service_gmail.enviar_mensagem_suporte,
                 nome=nome.strip(),
                 email_usuario=email.strip(),
                 assunto=assunto.strip(),
                 mensagem=mensagem.strip()
             )
+            email_worker.notificar()
             
             if sucesso:
                 return RedirectResponse(
@@ -100,24 +109,24 @@ def register_public_routes(app: FastAPI):
                 )
                 
         except Exception as e:
-            print(f"[ERRO SUPORTE] {e}")
+            logger.error("Suporte: %s", e)
             return RedirectResponse(
                 url="/suporte?erro=Erro interno do sistema. Tente novamente.",
                 status_code=303
             )
 
     @app.get("/planos")
+    @cache_paginas.em_cache
     async def planos(request: Request):
         try:
-            todos_planos = plano_repo.obter_todos()
+            todos_planos = await plano_repo.obter_todos()
             planos_gratuitos = [p for p in todos_planos if p.preco == 0.0]
             planos_pagos = [p for p in todos_planos if p.preco > 0.0]
             planos_pagos.sort(key=lambda x: x.preco)
             planos_gratuitos.sort(key=lambda x: x.duracao_dias, reverse=True)
             
-            print(f"[DEBUG] Total de planos: {len(todos_planos)}")
-            print(f"[DEBUG] Planos gratuitos: {len(planos_gratuitos)}")
-            print(f"[DEBUG] Planos pagos: {len(planos_pagos)}")
+            logger.debug("Total de planos: %s (gratuitos: %s, pagos: %s)",
+                         len(todos_planos), len(planos_gratuitos), len(planos_pagos))
             
             return templates.TemplateResponse("inicio/planos.html", {
                 "request": request,
@@ -129,7 +138,8 @@ def register_public_routes(app: FastAPI):
                 "tem_planos_gratuitos": len(planos_gratuitos) > 0
             })
         except Exception as e:
-            print(f"[ERRO] Erro ao carregar planos: {str(e)}")
+            logger.error("Erro ao carregar planos: %s", e)
+            request.state.sem_cache = True
             return templates.TemplateResponse("inicio/planos.html", {
                 "request": request,
                 "todos_planos": [],
@@ -142,15 +152,16 @@ def register_public_routes(app: FastAPI):
             })
 
     @app.get("/pagamento")
+    @cache_paginas.em_cache
     async def pagamento(request: Request, plano_id: Optional[int] = None):
         try:
-            todos_planos = plano_repo.obter_todos()
+            todos_planos = await plano_repo.obter_todos()
             planos_pagos = [p for p in todos_planos if p.preco > 0.0]
             planos_pagos.sort(key=lambda x: x.preco)
             
             plano_selecionado = None
             if plano_id:
-                plano_selecionado = plano_repo.obter_por_id(plano_id)
+                plano_selecionado = await plano_repo.obter_por_id(plano_id)
             
             if not plano_selecionado and planos_pagos:
                 plano_selecionado = planos_pagos[0]
@@ -163,7 +174,8 @@ def register_public_routes(app: FastAPI):
             })
             
         except Exception as e:
-            print(f"[ERRO] Erro ao carregar página de pagamento: {str(e)}")
+            logger.error("Erro ao carregar página de pagamento: %s", e)
+            request.state.sem_cache = True
             return templates.TemplateResponse("inicio/pagamento.html", {
                 "request": request,
                 "planos_pagos": [],
@@ -72,6 +72,47 @@ def inicializar_banco():
         print(f"❌ Erro no banco: {e}")
         return False
 
+def verificar_perfil_banco():
+    """Aplica e confere o perfil de desempenho do SQLite (WAL, PRAGMAs)"""
+    print("⚡ Verificando perfil de desempenho do banco...")
+    
+    try:
+        from util.db_util import aplicar_perfil_desempenho, verificar_perfil_desempenho
+        
+        aplicar_perfil_desempenho()
+        confere, comparacao = verificar_perfil_desempenho()
+        
+        for pragma, (esperado, efetivo) in comparacao.items():
+            marcador = "✅" if str(esperado) == str(efetivo) else "⚠️"
+            print(f"{marcador} {pragma}: {efetivo} (esperado: {esperado})")
+        
+        if not confere:
+            print("💡 Verifique as variáveis DB_* no arquivo .env")
+        return confere
+    except Exception as e:
+        print(f"❌ Erro ao aplicar perfil do banco: {e}")
+        return False
+
+def verificar_migracoes():
+    """Aplica as migrações pendentes e confere os planos das consultas principais"""
+    print("🧱 Verificando migrações do banco...")
+    
+    try:
+        from util.migracoes import aplicar_migracoes, obter_versao_atual, verificar_planos_consulta
+        
+        aplicadas = aplicar_migracoes()
+        print(f"✅ Versão do schema: {obter_versao_atual()} (aplicadas agora: {aplicadas or 'nenhuma'})")
+        
+        problemas = verificar_planos_consulta()
+        for problema in problemas:
+            print(f"⚠️ Consulta sem índice: {problema}")
+        if not problemas:
+            print("✅ Consultas principais usando índices")
+        return not problemas
+    except Exception as e:
+        print(f"❌ Erro ao aplicar migrações: {e}")
+        return False
+
 def criar_admin_se_necessario():
     """Cria usuário admin se não existir"""
     print("👤 Verificando usuário administrador...")
@@ -125,11 +166,78 @@ def criar_arquivo_env():
 # Configurações de Email
 BODY_HEALTH_EMAIL=bodyhealth619@gmail.com
 BODY_HEALTH_APP_PASSWORD=mlsn.db4526ae6121f8b073ce1e4114eec60fdfb114fe5943921ce62290543f6a4666
+SMTP_SERVIDOR=smtp.gmail.com
+SMTP_PORTA=587
+SMTP_STARTTLS=true
+
+# Fila de emails (enviada em segundo plano pelo util/email_worker.py)
+EMAIL_INTERVALO_SEGUNDOS=2
+EMAIL_LOTE=20
+EMAIL_MAX_TENTATIVAS=6
+EMAIL_BACKOFF_SEGUNDOS=30
 
 # Configurações do Sistema
 DEBUG=True
 SECRET_KEY=sua_chave_secreta_aqui
 
+# Logs (util/log_util.py): nível geral, níveis por módulo e formato (texto ou json);
+# LOG_AMOSTRA_DEBUG guarda os logs DEBUG de só uma fração das requisições
+# LOG_NIVEL=INFO
+# LOG_NIVEIS=util.metricas_db=WARNING,routes.register_personal_routes=INFO
+LOG_FORMATO=texto
+LOG_AMOSTRA_DEBUG=1
+LOG_FILA_MAXIMA=10000
+
+# Sessões de login (tabela sessao; o cookie guarda só o id)
+SESSAO_DURACAO_SEGUNDOS=1209600
+SESSAO_CACHE_SEGUNDOS=30
+
+# Configurações do Banco de Dados
+DB_PATH=dados.db
+DB_POOL_TAMANHO=8
+DB_POOL_OCIOSO_SEGUNDOS=300
+DB_THREADS=8
+# Cabeçalho X-DB-Queries com o número de consultas da requisição (padrão: DEBUG)
+# DB_CONTAR_CONSULTAS=true
+DB_CONSULTAS_AVISO=30
+# Tempo por instrução SQL (/admin/metrics) e log com EXPLAIN das consultas lentas
+DB_METRICAS=true
+DB_CONSULTA_LENTA_MS=100
+# Latência, status, tamanho da resposta e tempo de banco/template por rota (/admin/metrics)
+METRICAS_HTTP=true
+# Profiler por amostragem: /admin/profiler ou kill -USR2 <pid> (grava em PROFILER_DIRETORIO)
+PROFILER=true
+PROFILER_INTERVALO_MS=10
+PROFILER_MAXIMO_SEGUNDOS=60
+PROFILER_SINAL_SEGUNDOS=30
+PROFILER_DIRETORIO=.cache/perfis
+
+# Pool de hashing de senhas (bcrypt); padrão: número de núcleos e 8x isso de fila
+# SENHA_THREADS=4
+# SENHA_FILA_MAXIMA=32
+
+# Perfil de desempenho do SQLite (PRAGMAs)
+DB_JOURNAL_MODE=WAL
+DB_SYNCHRONOUS=NORMAL
+DB_MMAP_SIZE=134217728
+DB_CACHE_SIZE=-16000
+DB_TEMP_STORE=MEMORY
+DB_BUSY_TIMEOUT_MS=5000
+
+# Templates Jinja2: bytecode em disco e pré-compilação no startup;
+# com DEBUG=True os templates são recarregados quando o arquivo muda
+TEMPLATES_CACHE_DIR=.cache/jinja
+TEMPLATES_PRECOMPILAR=true
+# TEMPLATES_AUTO_RELOAD=false
+
+# Cache em memória (segundos)
+CACHE_ESTATISTICAS_SEGUNDOS=30
+# HTML de /, /planos, /pagamento e /sobre para visitantes sem login
+CACHE_PAGINAS_SEGUNDOS=300
+CACHE_PAGINAS_MAXIMO=256
+# Planos, dietas e artigos (coerente entre workers pela tabela cache_versao)
+CACHE_CATALOGO_SEGUNDOS=300
+
 # Configurações de Upload
 MAX_FILE_SIZE=5242880  # 5MB em bytes
 UPLOAD_PATH=static/uploads
@@ -159,6 +267,8 @@ __pycache__/
 *.so
 .DS_Store
 dados.db
+dados.db-wal
+dados.db-shm
 static/uploads/profissionais/*
 !static/uploads/profissionais/.gitkeep
 .vscode/
@@ -183,6 +293,8 @@ def main():
         ("Dependências", verificar_dependencias),
         ("Estrutura de Diretórios", verificar_estrutura_diretorios),
         ("Banco de Dados", inicializar_banco),
+        ("Perfil do Banco", verificar_perfil_banco),
+        ("Migrações do Banco", verificar_migracoes),
         ("Usuário Admin", criar_admin_se_necessario),
         ("Serviço de Email", testar_email_service),
         ("Arquivo .env", criar_arquivo_env),
@@ -0,0 +1,272 @@
+"""
+Arquivos estáticos com hash no nome, pré-comprimidos e cache imutável
+
+Etapa de build (rodar no deploy, depois de alterar CSS/JS/imagens):
+    python -m util.asset_util
+
+Copia static/css, static/js e static/img para static/dist com o hash do
+conteúdo no nome (css/styles.css -> dist/css/styles.1a2b3c4d5e.css), grava
+versões .gz (e .br, se o pacote brotli estiver instalado) dos arquivos de
+texto e registra tudo em static/dist/manifest.json.
+
+Os arquivos de builds anteriores continuam em static/dist: páginas em
+cache (cache de HTML, navegadores, proxies) e workers ainda com o
+manifest antigo seguem apontando para eles durante e depois do deploy.
+Cada build renova o mtime dos arquivos que usa, e os que saíram do
+manifest são apagados depois de ASSETS_RETENCAO_DIAS (padrão: 7) sem uso.
+
+Nos templates, asset() troca o nome lógico pela URL com hash:
+    <link rel="stylesheet" href="{{ asset('css/styles.css') }}">
+Sem o build, asset() devolve o caminho normal em /static.
+
+StaticFilesImutavel serve os arquivos de static/dist e static/derivadas com
+hash no nome (nunca mudam de conteúdo) com Cache-Control immutable de um
+ano, e entrega a versão .br/.gz quando o navegador aceita. Os demais
+arquivos desses diretórios (manifests, trava, temporários do build) são
+internos e respondem 404.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+
+DIRETORIO_STATIC = "static"
+DIRETORIO_DIST = os.path.join(DIRETORIO_STATIC, "dist")
+CAMINHO_MANIFEST = os.path.join(DIRETORIO_DIST, "manifest.json")
+DIRETORIOS_ORIGEM = ["css", "js", "img"]
+# Diretórios de static cujos arquivos têm hash no nome
+DIRETORIOS_IMUTAVEIS = ["dist", "derivadas"]
+# Hash do conteúdo no nome: css/styles.1a2b3c4d5e.css (build) e foto-media-1a2b3c4d5e.webp (derivadas)
+NOME_COM_HASH = re.compile(r"[.-][0-9a-f]{10}\.[0-9A-Za-z]+$")
+EXTENSOES_COMPRIMIVEIS = (".css", ".js", ".svg", ".json", ".txt", ".map", ".html")
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+ASSETS_RETENCAO_DIAS = float(os.getenv("ASSETS_RETENCAO_DIAS", "7"))
+SUFIXOS_COMPRIMIDOS = (".gz", ".br")
+
+_trava = threading.Lock()
+_manifest: dict = {}
+_manifest_mtime: Optional[float] = None
+
+
+def _carregar_manifest() -> dict:
+    """Lê o manifest do disco se ele mudou desde a última leitura"""
+    global _manifest, _manifest_mtime
+    try:
+        mtime = os.stat(CAMINHO_MANIFEST).st_mtime
+    except FileNotFoundError:
+        return _manifest
+    if mtime != _manifest_mtime:
+        with _trava:
+            try:
+                with open(CAMINHO_MANIFEST, encoding="utf-8") as f:
+                    _manifest = json.load(f)
+                _manifest_mtime = mtime
+            except (OSError, ValueError) as e:
+                logger.warning("Manifest de assets ilegível: %s", e)
+    return _manifest
+
+
+def asset(nome: str) -> str:
+    """
+    URL de um arquivo estático pelo nome lógico (uso nos templates)
+
+    Args:
+        nome: Caminho relativo a static, ex: "css/styles.css"
+
+    Returns:
+        URL com hash (static/dist) ou "/static/<nome>" se não houver build
+    """
+    nome = nome.lstrip("/")
+    return _carregar_manifest().get(nome, f"/{DIRETORIO_STATIC}/{nome}")
+
+
+def _comprimir(caminho: str) -> list[str]:
+    """Grava as versões .gz (e .br) que ainda não existem; retorna as extensões disponíveis"""
+    conteudo = None
+    geradas = []
+    compressores = [(".gz", lambda dados: gzip.compress(dados, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressores.append((".br", lambda dados: brotli.compress(dados, quality=11)))
+    for sufixo, comprimir in compressores:
+        # O nome tem o hash do conteúdo: uma versão já gravada por outro build é a mesma
+        if not os.path.exists(caminho + sufixo):
+            if conteudo is None:
+                with open(caminho, "rb") as f:
+                    conteudo = f.read()
+            temporario = f"{caminho}{sufixo}.tmp"
+            with open(temporario, "wb") as f:
+                f.write(comprimir(conteudo))
+            os.replace(temporario, caminho + sufixo)
+        else:
+            os.utime(caminho + sufixo)
+        geradas.append(sufixo)
+    return geradas
+
+
+def _remover_antigos(em_uso: set[str], retencao_segundos: float) -> int:
+    """
+    Apaga de static/dist os arquivos fora do manifest sem uso há mais que a retenção
+
+    Returns:
+        Quantidade de arquivos apagados
+    """
+    limite = time.time() - retencao_segundos
+    removidos = 0
+    for raiz, _, arquivos in os.walk(DIRETORIO_DIST):
+        for nome_arquivo in arquivos:
+            caminho = os.path.join(raiz, nome_arquivo)
+            if caminho == CAMINHO_MANIFEST:
+                continue
+            base = caminho
+            for sufixo in SUFIXOS_COMPRIMIDOS:
+                if base.endswith(sufixo):
+                    base = base[:-len(sufixo)]
+            if base in em_uso:
+                continue
+            try:
+                if os.stat(caminho).st_mtime < limite:
+                    os.remove(caminho)
+                    removidos += 1
+            except FileNotFoundError:
+                pass
+    return removidos
+
+
+def construir(retencao_dias: float = ASSETS_RETENCAO_DIAS) -> dict:
+    """
+    Gera os arquivos de static/dist e o manifest a partir de DIRETORIOS_ORIGEM
+
+    Não apaga o build anterior: o manifest novo substitui o antigo de uma
+    vez no final, e os arquivos que ele não usa mais só são removidos depois
+    de `retencao_dias` sem aparecer em nenhum build.
+
+    Returns:
+        Manifest {nome lógico: URL com hash}
+    """
+    os.makedirs(DIRETORIO_DIST, exist_ok=True)
+
+    manifest = {}
+    em_uso = set()
+    for origem in DIRETORIOS_ORIGEM:
+        for raiz, _, arquivos in os.walk(os.path.join(DIRETORIO_STATIC, origem)):
+            for nome_arquivo in sorted(arquivos):
+                caminho = os.path.join(raiz, nome_arquivo)
+                nome = os.path.relpath(caminho, DIRETORIO_STATIC).replace(os.sep, "/")
+                with open(caminho, "rb") as f:
+                    resumo = hashlib.sha256(f.read()).hexdigest()[:10]
+                base, extensao = os.path.splitext(nome)
+                destino = os.path.join(DIRETORIO_DIST, f"{base}.{resumo}{extensao}")
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                if os.path.exists(destino):
+                    # Mesmo conteúdo do build anterior: só marca como em uso
+                    os.utime(destino)
+                else:
+                    temporario = f"{destino}.tmp"
+                    shutil.copyfile(caminho, temporario)
+                    os.replace(temporario, destino)
+                if extensao.lower() in EXTENSOES_COMPRIMIVEIS:
+                    _comprimir(destino)
+                manifest[nome] = "/" + destino.replace(os.sep, "/")
+                em_uso.add(destino)
+
+    temporario = f"{CAMINHO_MANIFEST}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, CAMINHO_MANIFEST)
+
+    removidos = _remover_antigos(em_uso, retencao_dias * 86400)
+    if removidos:
+        logger.info("%s arquivos de builds anteriores removidos de %s", removidos, DIRETORIO_DIST)
+    return manifest
+
+
+def _tem_hash(caminho: str) -> bool:
+    """Indica se o nome do arquivo (ou da versão comprimida) tem o hash do conteúdo"""
+    nome = os.path.basename(caminho)
+    for sufixo in SUFIXOS_COMPRIMIDOS:
+        nome = nome.removesuffix(sufixo)
+    return NOME_COM_HASH.search(nome) is not None
+
+
+def _codificacoes_aceitas(headers: Headers) -> set[str]:
+    aceitas = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        nome, _, parametros = item.strip().partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceitas.add(nome.strip().lower())
+    return aceitas
+
+
+class StaticFilesImutavel(StaticFiles):
+    """
+    StaticFiles com cache imutável e arquivos pré-comprimidos
+
+    Arquivos com hash no nome em DIRETORIOS_IMUTAVEIS recebem Cache-Control
+    immutable e, se existir, a versão .br ou .gz aceita pelo navegador é
+    enviada com Content-Encoding; os sem hash nesses diretórios respondem
+    404. Os demais arquivos são servidos como no StaticFiles.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        raiz = os.path.realpath(self.directory)
+        self._prefixos_imutaveis = tuple(os.path.join(raiz, d) + os.sep for d in DIRETORIOS_IMUTAVEIS)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        caminho = str(full_path)
+        if not caminho.startswith(self._prefixos_imutaveis):
+            return super().file_response(full_path, stat_result, scope, status_code)
+        if not _tem_hash(caminho):
+            # Manifest, trava ou temporário do build: reescritos no lugar, não são públicos
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        headers = {"Cache-Control": CACHE_IMUTAVEL, "Vary": "Accept-Encoding"}
+        media_type = mimetypes.guess_type(caminho)[0] or "application/octet-stream"
+        aceitas = _codificacoes_aceitas(request_headers)
+        for codificacao, sufixo in (("br", ".br"), ("gzip", ".gz")):
+            if codificacao in aceitas and os.path.isfile(caminho + sufixo):
+                caminho = caminho + sufixo
+                stat_result = os.stat(caminho)
+                headers["Content-Encoding"] = codificacao
+                break
+
+        response = FileResponse(
+            caminho, status_code=status_code, stat_result=stat_result,
+            media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def main():
+    manifest = construir()
+    comprimidos = "gzip e brotli" if brotli is not None else "gzip (instale brotli para .br)"
+    print(f"{len(manifest)} arquivos em {DIRETORIO_DIST} | pré-compressão: {comprimidos}")
+
+
+if __name__ == "__main__":
+    main()
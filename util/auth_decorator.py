@@ -1,25 +1,125 @@
 """
 Decorator para proteger rotas com autenticação e autorização
+
+A sessão de login fica no servidor (tabela sessao): o cookie assinado do
+SessionMiddleware guarda só um id opaco ({"sid": ...}), e os dados do
+usuário são lidos do banco. Assim o cookie fica com poucas dezenas de
+bytes e as sessões de um usuário podem ser revogadas (exclusão, troca de
+senha).
+
+O usuário da sessão é resolvido uma vez por requisição pelo
+SessaoUsuarioMiddleware, fora do event loop (util/db_async.py), e fica em
+request.state; obter_usuario_logado(), o decorator, o cache de páginas e
+os templates só leem de lá. Para não consultar o banco a cada requisição,
+as sessões válidas ficam em um cache LRU do processo por
+SESSAO_CACHE_SEGUNDOS: nome e perfil alterados, e revogações feitas em
+outro worker, valem depois desse prazo.
+
+A validade é deslizante: quando falta menos da metade de
+SESSAO_DURACAO_SEGUNDOS para expirar, o prazo é renovado.
 """
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from typing import List, Optional
 from fastapi import Request, HTTPException, status
 from fastapi.responses import RedirectResponse
 
+from data.repo import sessao_repo
+from util.db_async import executar
+
+
+SESSAO_DURACAO_SEGUNDOS = int(os.getenv("SESSAO_DURACAO_SEGUNDOS", str(14 * 24 * 3600)))
+SESSAO_CACHE_SEGUNDOS = float(os.getenv("SESSAO_CACHE_SEGUNDOS", "30"))
+SESSAO_CACHE_MAXIMO = int(os.getenv("SESSAO_CACHE_MAXIMO", "4096"))
+
+# Marca de "não está no cache" (None é sessão inexistente)
+_NAO_CARREGADO = object()
+_trava_sessoes = threading.Lock()
+# sid -> (usuario, instante em que a entrada deixa de valer)
+_sessoes: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+
+def _usuario_em_cache(sid: str):
+    """Cópia do usuário da sessão no cache do processo, ou _NAO_CARREGADO"""
+    with _trava_sessoes:
+        entrada = _sessoes.get(sid)
+        if entrada and entrada[1] > time.monotonic():
+            _sessoes.move_to_end(sid)
+            return dict(entrada[0])
+    return _NAO_CARREGADO
+
+
+def _carregar_usuario(sid: str) -> Optional[dict]:
+    """Usuário da sessão pelo cache do processo ou pelo banco (renovando o prazo); bloqueante"""
+    usuario = _usuario_em_cache(sid)
+    if usuario is not _NAO_CARREGADO:
+        return usuario
+
+    dados = sessao_repo.obter_com_usuario(sid)
+    if dados is None:
+        _esquecer_sessoes([sid])
+        return None
+    if dados.pop("restante_segundos") < SESSAO_DURACAO_SEGUNDOS / 2:
+        sessao_repo.renovar(sid, SESSAO_DURACAO_SEGUNDOS)
+
+    with _trava_sessoes:
+        _sessoes[sid] = (dados, time.monotonic() + SESSAO_CACHE_SEGUNDOS)
+        _sessoes.move_to_end(sid)
+        while len(_sessoes) > SESSAO_CACHE_MAXIMO:
+            _sessoes.popitem(last=False)
+    return dict(dados)
+
+
+def _esquecer_sessoes(sids: list[str]) -> None:
+    with _trava_sessoes:
+        for sid in sids:
+            _sessoes.pop(sid, None)
+
+
+class SessaoUsuarioMiddleware:
+    """
+    Middleware ASGI que resolve o usuário da sessão antes da rota
+
+    Precisa ficar dentro do SessionMiddleware (adicionado antes dele), que
+    decodifica o cookie. Acerto no cache do processo é lido direto; falta
+    vai ao banco pelo pool de threads, sem bloquear o event loop. O
+    resultado (dict ou None) fica em request.state.usuario_sessao.
+    Arquivos estáticos não precisam do usuário e são ignorados.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith("/static/"):
+            sid = scope.get("session", {}).get("sid")
+            usuario = None
+            if sid:
+                usuario = _usuario_em_cache(sid)
+                if usuario is _NAO_CARREGADO:
+                    usuario = await executar(_carregar_usuario, sid)
+            scope.setdefault("state", {})["usuario_sessao"] = usuario
+        await self.app(scope, receive, send)
+
 
 def obter_usuario_logado(request: Request) -> Optional[dict]:
     """
     Obtém os dados do usuário logado da sessão
-    
+
+    Só lê request.state, preenchido pelo SessaoUsuarioMiddleware: pode ser
+    chamada no event loop (decorators, templates) sem acessar o banco.
+
     Args:
         request: Objeto Request do FastAPI
-    
+
     Returns:
         Dicionário com dados do usuário ou None se não estiver logado
     """
-    if not hasattr(request, 'session'):
-        return None
-    return request.session.get('usuario')
+    return getattr(request.state, "usuario_sessao", None)
 
 
 def esta_logado(request: Request) -> bool:
@@ -35,22 +135,30 @@ def esta_logado(request: Request) -> bool:
     return obter_usuario_logado(request) is not None
 
 
-def criar_sessao(request: Request, usuario: dict) -> None:
+async def criar_sessao(request: Request, usuario: dict) -> None:
     """
     Cria uma sessão para o usuário após login
     
     Args:
         request: Objeto Request do FastAPI
-        usuario: Dicionário com dados do usuário
+        usuario: Dicionário com dados do usuário (precisa do "id")
     """
     if hasattr(request, 'session'):
-        # Remove senha da sessão por segurança
-        usuario_sessao = usuario.copy()
-        usuario_sessao.pop('senha', None)
-        request.session['usuario'] = usuario_sessao
+        sid_anterior = request.session.get('sid')
+        if sid_anterior:
+            await executar(sessao_repo.excluir, sid_anterior)
+            _esquecer_sessoes([sid_anterior])
+        # Id novo a cada login (evita fixação de sessão)
+        request.session.clear()
+        sid = secrets.token_urlsafe(24)
+        await executar(sessao_repo.inserir, sid, usuario["id"], SESSAO_DURACAO_SEGUNDOS)
+        request.session['sid'] = sid
+        request.state.usuario_sessao = await executar(_carregar_usuario, sid)
+        # Logins são raros perto das demais requisições: aproveita para limpar as expiradas
+        await executar(sessao_repo.excluir_expiradas)
 
 
-def destruir_sessao(request: Request) -> None:
+async def destruir_sessao(request: Request) -> None:
     """
     Destrói a sessão do usuário (logout)
     
@@ -58,7 +166,27 @@ def destruir_sessao(request: Request) -> None:
         request: Objeto Request do FastAPI
     """
     if hasattr(request, 'session'):
+        sid = request.session.get('sid')
+        if sid:
+            await executar(sessao_repo.excluir, sid)
+            _esquecer_sessoes([sid])
         request.session.clear()
+        request.state.usuario_sessao = None
+
+
+async def revogar_sessoes_usuario(usuario_id: int) -> int:
+    """
+    Encerra todas as sessões de um usuário (exclusão ou troca de senha)
+
+    Args:
+        usuario_id: Id do usuário
+
+    Returns:
+        Quantidade de sessões revogadas
+    """
+    sids = await executar(sessao_repo.excluir_por_usuario, usuario_id)
+    _esquecer_sessoes(sids)
+    return len(sids)
 
 
 def requer_autenticacao(perfis_autorizados: List[str] = None):
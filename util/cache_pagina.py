@@ -0,0 +1,216 @@
+"""
+Cache do HTML das páginas públicas para visitantes anônimos
+
+As páginas de entrada do site (/, /planos, /pagamento, /sobre) só mudam
+quando o admin altera os planos. Para visitantes sem login, o HTML
+renderizado fica em memória, identificado pelo caminho e pela query
+string, e é servido sem consultar o SQLite nem renderizar o template.
+Cada entrada tem ETag e Last-Modified, então o navegador revalida com
+If-None-Match/If-Modified-Since e recebe 304 sem corpo.
+
+As rotas de criar/editar/excluir plano chamam cache_paginas.invalidar().
+O cache é por processo (cada worker do uvicorn tem o seu): para os demais
+workers, cada página guarda a versão do grupo "plano" do cache_catalogo
+(tabela cache_versao, util/cache_util.py) com que foi renderizada, e é
+descartada quando essa versão muda. A versão é conferida no banco no
+máximo a cada CACHE_PAGINAS_CONFERIR_SEGUNDOS (a conferência passa pelas
+threads do banco); entre uma e outra vale a última versão vista no
+processo, que uma alteração feita nele mesmo já atualiza. As entradas
+também expiram após CACHE_PAGINAS_SEGUNDOS.
+
+Exemplo de uso:
+    @app.get("/planos")
+    @cache_paginas.em_cache
+    async def planos(request: Request):
+        ...
+        # Em caso de erro, não guardar a página:
+        request.state.sem_cache = True
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from util.auth_decorator import obter_usuario_logado
+from util.cache_util import cache_catalogo
+from util.db_async import executar
+
+
+CACHE_PAGINAS_SEGUNDOS = float(os.getenv("CACHE_PAGINAS_SEGUNDOS", "300"))
+CACHE_PAGINAS_MAXIMO = int(os.getenv("CACHE_PAGINAS_MAXIMO", "256"))
+CACHE_PAGINAS_CONFERIR_SEGUNDOS = float(os.getenv("CACHE_PAGINAS_CONFERIR_SEGUNDOS", "1"))
+# Grupo do cache_catalogo de que o HTML das páginas depende
+GRUPO_CATALOGO_PAGINAS = "plano"
+# O navegador sempre revalida (ETag); o HTML depende de quem está logado
+CACHE_CONTROL_PAGINA = "no-cache"
+
+
+@dataclass
+class PaginaEmCache:
+    corpo: bytes
+    media_type: str
+    etag: str
+    modificada_em: float
+    expira_em: float
+    versao: Optional[int]
+
+    @property
+    def ultima_modificacao(self) -> str:
+        return formatdate(self.modificada_em, usegmt=True)
+
+
+class CachePaginas:
+    """
+    Cache LRU de páginas HTML com ETag/Last-Modified e expiração
+
+    Args:
+        ttl_segundos: Tempo de vida de cada página
+        maximo_entradas: Quantidade máxima de páginas guardadas
+        grupo_catalogo: Grupo do cache_catalogo cuja mudança de versão
+                        (em qualquer processo) descarta as páginas
+        conferir_segundos: Intervalo máximo entre conferências da versão no banco
+    """
+
+    def __init__(self, ttl_segundos: float = 300, maximo_entradas: int = 256,
+                 grupo_catalogo: Optional[str] = None, conferir_segundos: float = 1):
+        self.ttl_segundos = ttl_segundos
+        self.maximo_entradas = maximo_entradas
+        self.grupo_catalogo = grupo_catalogo
+        self.conferir_segundos = conferir_segundos
+        self._conferida_em = float("-inf")
+        self._trava = threading.Lock()
+        self._paginas: OrderedDict[tuple, PaginaEmCache] = OrderedDict()
+        self._geracao = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.nao_modificadas = 0
+
+    @staticmethod
+    def _chave(request: Request) -> tuple:
+        return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+    async def _versao_catalogo(self) -> Optional[int]:
+        if self.grupo_catalogo is None:
+            return None
+        inicio = time.monotonic()
+        if inicio - self._conferida_em < self.conferir_segundos:
+            return cache_catalogo.versao(self.grupo_catalogo, conferir=False)
+        # Confere o PRAGMA data_version (e, se mudou, as versões) pelas threads do banco
+        versao = await executar(cache_catalogo.versao, self.grupo_catalogo)
+        self._conferida_em = inicio
+        return versao
+
+    def _obter(self, chave: tuple, versao: Optional[int]) -> Optional[PaginaEmCache]:
+        with self._trava:
+            pagina = self._paginas.get(chave)
+            if pagina is not None and pagina.versao != versao:
+                # Planos alterados, possivelmente por outro worker
+                del self._paginas[chave]
+                pagina = None
+            if pagina is None or pagina.expira_em <= time.monotonic():
+                self.falhas += 1
+                return None
+            self._paginas.move_to_end(chave)
+            self.acertos += 1
+            return pagina
+
+    def _guardar(self, chave: tuple, pagina: PaginaEmCache, geracao: int) -> None:
+        with self._trava:
+            # Não guarda página renderizada antes de uma invalidação concorrente
+            if geracao != self._geracao:
+                return
+            self._paginas[chave] = pagina
+            self._paginas.move_to_end(chave)
+            while len(self._paginas) > self.maximo_entradas:
+                self._paginas.popitem(last=False)
+
+    def _nao_modificada(self, request: Request, pagina: PaginaEmCache) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etags = [etag.strip().removeprefix("W/") for etag in if_none_match.split(",")]
+            return "*" in etags or pagina.etag in etags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= int(pagina.modificada_em)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _responder(self, request: Request, pagina: PaginaEmCache) -> Response:
+        headers = {
+            "ETag": pagina.etag,
+            "Last-Modified": pagina.ultima_modificacao,
+            "Cache-Control": CACHE_CONTROL_PAGINA,
+            "Vary": "Cookie",
+        }
+        if self._nao_modificada(request, pagina):
+            with self._trava:
+                self.nao_modificadas += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=pagina.corpo, media_type=pagina.media_type, headers=headers)
+
+    def em_cache(self, func):
+        """
+        Decorator para rotas GET públicas cujo HTML só depende da URL
+
+        Visitantes logados (o layout mostra o nome do usuário) recebem a
+        página renderizada normalmente, sem passar pelo cache.
+        """
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.get("request")
+            if request is None or request.method != "GET" or obter_usuario_logado(request):
+                return await func(*args, **kwargs)
+
+            chave = self._chave(request)
+            versao = await self._versao_catalogo()
+            pagina = self._obter(chave, versao)
+            if pagina is None:
+                with self._trava:
+                    geracao = self._geracao
+                resposta = await func(*args, **kwargs)
+                if resposta.status_code != 200 or getattr(request.state, "sem_cache", False):
+                    return resposta
+                corpo = bytes(resposta.body)
+                pagina = PaginaEmCache(
+                    corpo=corpo,
+                    media_type=resposta.media_type or "text/html",
+                    etag='"' + hashlib.sha256(corpo).hexdigest()[:20] + '"',
+                    modificada_em=time.time(),
+                    expira_em=time.monotonic() + self.ttl_segundos,
+                    versao=versao,
+                )
+                self._guardar(chave, pagina, geracao)
+            return self._responder(request, pagina)
+
+        return wrapper
+
+    def invalidar(self) -> None:
+        """Descarta todas as páginas (chamar depois de alterar os planos)"""
+        with self._trava:
+            self._geracao += 1
+            self._paginas.clear()
+
+    def estatisticas(self) -> dict:
+        """Retorna acertos, falhas, respostas 304 e número de páginas em cache"""
+        with self._trava:
+            return {
+                "paginas": len(self._paginas),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "nao_modificadas": self.nao_modificadas,
+            }
+
+
+cache_paginas = CachePaginas(ttl_segundos=CACHE_PAGINAS_SEGUNDOS, maximo_entradas=CACHE_PAGINAS_MAXIMO,
+                             grupo_catalogo=GRUPO_CATALOGO_PAGINAS,
+                             conferir_segundos=CACHE_PAGINAS_CONFERIR_SEGUNDOS)
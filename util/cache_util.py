@@ -0,0 +1,282 @@
+"""
+Cache em memória com expiração (TTL)
+
+Usado para valores caros de calcular e que podem ficar alguns segundos
+desatualizados, como as estatísticas dos dashboards. O cache é por
+processo: cada worker do uvicorn tem o seu, e a invalidação explícita só
+vale para o processo que fez a alteração (nos demais o TTL limita o
+atraso).
+
+Exemplo de uso:
+    cache = CacheTTL(ttl_segundos=30)
+    valor = cache.obter("chave", lambda: calcular_valor())
+    cache.invalidar("chave")
+
+Para tabelas de catálogo (plano, dieta, artigo), que mudam poucas vezes
+por mês e são lidas em quase toda requisição, CacheVersionado mantém os
+workers coerentes: cada escrita incrementa a versão do grupo na tabela
+cache_versao, e os outros processos percebem a mudança pelo PRAGMA
+data_version antes de usar o valor em cache.
+
+    @cache_catalogo.em_cache("plano")
+    def obter_todos() -> list[Plano]: ...
+
+    @cache_catalogo.invalida("plano")
+    def inserir(plano: Plano) -> Optional[int]: ...
+"""
+import copy
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+
+from data.sql.cache_versao_sql import *
+from util.db_util import get_connection, obter_pool
+
+
+CACHE_CATALOGO_SEGUNDOS = float(os.getenv("CACHE_CATALOGO_SEGUNDOS", "300"))
+
+
+class CacheTTL:
+    """
+    Cache chave/valor em que cada entrada expira após ttl_segundos
+
+    Args:
+        ttl_segundos: Tempo de vida de cada entrada
+    """
+
+    def __init__(self, ttl_segundos: float = 30):
+        self.ttl_segundos = ttl_segundos
+        self._trava = threading.Lock()
+        self._entradas: dict[Hashable, tuple[float, Any]] = {}
+        self._geracao = 0
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable, carregar: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou carrega, guarda e retorna um novo
+
+        Args:
+            chave: Chave da entrada
+            carregar: Função chamada quando a entrada não existe ou expirou
+        """
+        agora = time.monotonic()
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada and entrada[0] > agora:
+                self.acertos += 1
+                return entrada[1]
+            self.falhas += 1
+            geracao = self._geracao
+
+        valor = carregar()
+        with self._trava:
+            # Não guarda valor carregado antes de uma invalidação concorrente
+            if geracao == self._geracao:
+                self._entradas[chave] = (time.monotonic() + self.ttl_segundos, valor)
+        return valor
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> None:
+        """Remove uma entrada (ou todas, se chave for None)"""
+        with self._trava:
+            self._geracao += 1
+            if chave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(chave, None)
+
+    def estatisticas(self) -> dict:
+        """Retorna acertos, falhas e número de entradas do cache"""
+        with self._trava:
+            return {
+                "entradas": len(self._entradas),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+            }
+
+
+class CacheVersionado:
+    """
+    Cache de leituras de tabelas que mudam pouco, coerente entre processos
+
+    Cada grupo (ex: "plano") tem um número de versão na tabela cache_versao,
+    incrementado em toda escrita do grupo. Antes de usar o cache, o processo
+    lê o PRAGMA data_version da conexão, que só muda quando outra conexão
+    grava no banco: se não mudou desde a última checagem, o cache vale sem
+    ler nenhuma tabela; se mudou, relê as versões (poucas linhas) e descarta
+    os grupos alterados. As entradas também expiram após ttl_segundos.
+
+    Os valores são devolvidos como cópias, então a rota pode alterar o
+    objeto recebido sem afetar o cache.
+
+    Args:
+        ttl_segundos: Tempo de vida máximo de cada entrada
+    """
+
+    def __init__(self, ttl_segundos: float = 300):
+        self.ttl_segundos = ttl_segundos
+        self._trava = threading.Lock()
+        self._entradas: dict[tuple[str, Hashable], tuple[float, Any]] = {}
+        self._versoes: dict[str, int] = {}
+        # Último data_version visto em cada conexão; a conexão fica como chave
+        # (e não id(conn)) para o id não ser reaproveitado por uma conexão nova
+        self._data_version: dict[sqlite3.Connection, int] = {}
+        self._geracao: dict[str, int] = defaultdict(int)
+        self._contadores: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"acertos": 0, "falhas": 0, "invalidacoes": 0, "invalidacoes_externas": 0}
+        )
+
+    def _descartar(self, nome: str) -> None:
+        """Remove as entradas de um grupo (chamar com a trava)"""
+        self._geracao[nome] += 1
+        for chave in [c for c in self._entradas if c[0] == nome]:
+            del self._entradas[chave]
+
+    def _tem_entradas(self, nome: str) -> bool:
+        """Indica se o grupo tem entradas neste processo (chamar com a trava)"""
+        return any(chave[0] == nome for chave in self._entradas)
+
+    def _remover_conexoes_fechadas(self) -> None:
+        """Esquece conexões que o pool já fechou (chamar com a trava)"""
+        for conn in list(self._data_version):
+            try:
+                conn.total_changes
+            except sqlite3.ProgrammingError:
+                del self._data_version[conn]
+
+    def _validar(self) -> bool:
+        """
+        Descarta os grupos alterados por outras conexões
+
+        Returns:
+            False se a tabela cache_versao não existe (cache desativado)
+        """
+        try:
+            with get_connection() as conn:
+                data_version = conn.execute(OBTER_DATA_VERSION).fetchone()[0]
+                with self._trava:
+                    if self._data_version.get(conn) == data_version:
+                        return True
+                versoes = {row["nome"]: row["versao"] for row in conn.execute(OBTER_TODAS_CACHE_VERSAO)}
+        except sqlite3.OperationalError as e:
+            if "no such table" in str(e):
+                return False
+            raise
+
+        with self._trava:
+            for nome, versao in versoes.items():
+                anterior = self._versoes.get(nome)
+                # Grupo sem linha até outro processo invalidá-lo pela primeira vez:
+                # a versão nova ainda não é conhecida aqui, mas as entradas locais ficaram velhas
+                if anterior != versao and (anterior is not None or self._tem_entradas(nome)):
+                    self._descartar(nome)
+                    self._contadores[nome]["invalidacoes_externas"] += 1
+                self._versoes[nome] = versao
+            if conn not in self._data_version and len(self._data_version) >= obter_pool().tamanho:
+                self._remover_conexoes_fechadas()
+            self._data_version[conn] = data_version
+        return True
+
+    def obter(self, nome: str, chave: Hashable, carregar: Callable[[], Any]) -> Any:
+        """
+        Retorna uma cópia do valor em cache ou carrega, guarda e retorna um novo
+
+        Args:
+            nome: Grupo do cache (ex: "plano")
+            chave: Chave da entrada dentro do grupo
+            carregar: Função chamada quando a entrada não existe, expirou ou
+                      o grupo mudou
+        """
+        if not self._validar():
+            return carregar()
+
+        agora = time.monotonic()
+        with self._trava:
+            entrada = self._entradas.get((nome, chave))
+            if entrada and entrada[0] > agora:
+                self._contadores[nome]["acertos"] += 1
+                return copy.deepcopy(entrada[1])
+            self._contadores[nome]["falhas"] += 1
+            geracao = self._geracao[nome]
+
+        valor = carregar()
+        with self._trava:
+            # Não guarda valor carregado antes de uma invalidação concorrente
+            if geracao == self._geracao[nome]:
+                self._entradas[(nome, chave)] = (time.monotonic() + self.ttl_segundos, copy.deepcopy(valor))
+        return valor
+
+    def versao(self, nome: str, conferir: bool = True) -> Optional[int]:
+        """
+        Versão do grupo, para caches derivados dele (como o HTML das páginas
+        públicas, util/cache_pagina.py) descartarem o que foi montado com uma
+        versão anterior
+
+        Args:
+            nome: Grupo do cache (ex: "plano")
+            conferir: Confere antes com o banco (bloqueia; fora do event loop).
+                      Sem conferir, devolve a última versão vista neste processo.
+
+        Returns:
+            Versão do grupo ou None se ainda não é conhecida (ou o cache está desativado)
+        """
+        if conferir and not self._validar():
+            return None
+        with self._trava:
+            return self._versoes.get(nome)
+
+    def invalidar(self, nome: str) -> None:
+        """Descarta o grupo neste processo e incrementa a versão no banco (para os demais)"""
+        try:
+            with get_connection() as conn:
+                versao = conn.execute(INCREMENTAR_CACHE_VERSAO, (nome,)).fetchone()["versao"]
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            versao = None
+        with self._trava:
+            self._descartar(nome)
+            self._contadores[nome]["invalidacoes"] += 1
+            if versao is not None:
+                self._versoes[nome] = versao
+
+    def em_cache(self, nome: str):
+        """Decorador para funções de leitura do grupo; a chave são os argumentos da chamada"""
+        def decorator(funcao):
+            @wraps(funcao)
+            def wrapper(*args, **kwargs):
+                chave = (funcao.__name__, args, tuple(sorted(kwargs.items())))
+                return self.obter(nome, chave, lambda: funcao(*args, **kwargs))
+            return wrapper
+        return decorator
+
+    def invalida(self, nome: str):
+        """Decorador para funções de escrita do grupo: invalida após a transação terminar"""
+        def decorator(funcao):
+            @wraps(funcao)
+            def wrapper(*args, **kwargs):
+                try:
+                    return funcao(*args, **kwargs)
+                finally:
+                    self.invalidar(nome)
+            return wrapper
+        return decorator
+
+    def estatisticas(self) -> dict:
+        """Retorna, por grupo, acertos, falhas, invalidações, versão e número de entradas"""
+        with self._trava:
+            resultado = {}
+            for nome in sorted(set(self._contadores) | set(self._versoes)):
+                resultado[nome] = {
+                    **self._contadores[nome],
+                    "versao": self._versoes.get(nome),
+                    "entradas": sum(1 for c in self._entradas if c[0] == nome),
+                }
+            return resultado
+
+
+cache_catalogo = CacheVersionado(ttl_segundos=CACHE_CATALOGO_SEGUNDOS)
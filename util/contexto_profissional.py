@@ -0,0 +1,94 @@
+"""
+Contexto do profissional logado (profissional, personal e nutricionista)
+
+As rotas da área do profissional precisam do registro de profissional e
+do perfil de personal (ou de nutricionista) do usuário logado. Em vez de
+cada rota consultar profissional_repo e personal_repo, a dependência
+obter_contexto_profissional resolve tudo de uma vez:
+
+- na mesma requisição, o contexto fica em request.state;
+- entre requisições (e sessões) do mesmo usuário, fica no cache_catalogo,
+  grupo "profissional", invalidado pelas escritas de profissional_repo,
+  personal_repo e nutricionista_repo (também nos demais workers).
+
+Exemplo de uso:
+    @app.get("/personal/alunos")
+    @requer_autenticacao(['profissional'])
+    async def personal_alunos(request: Request,
+                              contexto: ContextoProfissional = Depends(obter_contexto_profissional)):
+        personal = contexto.personal
+        if not personal:
+            ...
+"""
+import sqlite3
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, Request
+
+from data.model.nutricionista_model import Nutricionista
+from data.model.personal_model import Personal
+from data.model.profissional_model import Profissional
+from data.repo import nutricionista_repo, personal_repo, profissional_repo
+from util.auth_decorator import obter_usuario_logado
+from util.cache_util import cache_catalogo
+from util.db_async import executar
+
+
+@dataclass
+class ContextoProfissional:
+    usuario: Optional[dict] = None
+    profissional: Optional[Profissional] = None
+    personal: Optional[Personal] = None
+    nutricionista: Optional[Nutricionista] = None
+
+
+def _obter_nutricionista(profissional_id: int) -> Optional[Nutricionista]:
+    try:
+        return nutricionista_repo.obter_por_profissional(profissional_id)
+    except sqlite3.OperationalError as e:
+        # Bancos antigos não têm a tabela nutricionista
+        if "no such table" in str(e):
+            return None
+        raise
+
+
+@cache_catalogo.em_cache("profissional")
+def carregar_contexto(usuario_id: int) -> tuple:
+    """
+    Carrega profissional, personal e nutricionista de um usuário
+
+    Returns:
+        Tupla (profissional, personal, nutricionista); cada item pode ser None
+    """
+    profissional = profissional_repo.obter_por_id(usuario_id)
+    if not profissional:
+        return None, None, None
+    return (
+        profissional,
+        personal_repo.obter_por_profissional(profissional.id),
+        _obter_nutricionista(profissional.id),
+    )
+
+
+async def obter_contexto_profissional(
+    request: Request,
+    usuario_logado: Optional[dict] = Depends(obter_usuario_logado),
+) -> ContextoProfissional:
+    """
+    Dependência FastAPI com o contexto do profissional logado
+
+    Para visitantes e usuários que não são profissionais, devolve um
+    contexto só com o usuário (profissional, personal e nutricionista None).
+    """
+    contexto = getattr(request.state, "contexto_profissional", None)
+    if contexto is not None:
+        return contexto
+
+    contexto = ContextoProfissional(usuario=usuario_logado)
+    if usuario_logado and usuario_logado.get("perfil") == "profissional":
+        contexto.profissional, contexto.personal, contexto.nutricionista = await executar(
+            carregar_contexto, usuario_logado["id"]
+        )
+    request.state.contexto_profissional = contexto
+    return contexto
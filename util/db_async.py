@@ -0,0 +1,115 @@
+"""
+Acesso assíncrono aos repositórios
+
+As funções dos repositórios são síncronas (sqlite3). Para não bloquear o
+event loop do FastAPI, as chamadas feitas pelas rotas são executadas em
+um pool de threads limitado, do mesmo tamanho do pool de conexões.
+
+Exemplo de uso:
+    from data.repo_async import usuario_repo
+
+    usuario = await usuario_repo.obter_por_id(1)
+"""
+import asyncio
+import contextvars
+import importlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from typing import Any, Callable, Optional
+
+from util.db_util import DB_POOL_TAMANHO
+from util.metricas_db import escopo_requisicao, publicar_escopo_thread, retirar_escopo_thread
+
+
+DB_THREADS = int(os.getenv("DB_THREADS", str(DB_POOL_TAMANHO)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_trava = threading.Lock()
+
+
+def _obter_executor() -> ThreadPoolExecutor:
+    """Cria o pool de threads no primeiro uso (ou após um shutdown)"""
+    global _executor
+    with _trava:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="db")
+        return _executor
+
+
+def _executar_com_escopo(funcao: Callable, *args, **kwargs) -> Any:
+    # Publica o escopo da requisição para o profiler (util/profiler.py)
+    # atribuir à rota as amostras desta thread
+    escopo = escopo_requisicao.get()
+    if escopo is None:
+        return funcao(*args, **kwargs)
+    publicar_escopo_thread(escopo)
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        retirar_escopo_thread()
+
+
+async def executar(funcao: Callable, *args, **kwargs) -> Any:
+    """
+    Executa uma função síncrona de acesso a dados no pool de threads do banco
+
+    O contexto (contextvars) da requisição é propagado para a thread.
+
+    Args:
+        funcao: Função síncrona a executar
+        *args, **kwargs: Argumentos repassados à função
+
+    Returns:
+        O retorno da função
+    """
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _obter_executor(), partial(contexto.run, _executar_com_escopo, funcao, *args, **kwargs)
+    )
+
+
+class RepoAsync:
+    """
+    Expõe as funções de um módulo de repositório como corrotinas
+
+    O módulo só é importado no primeiro uso, e cada função acessada vira
+    uma versão assíncrona com o mesmo nome e os mesmos argumentos.
+
+    Args:
+        nome_modulo: Caminho do módulo, ex: "data.repo.usuario_repo"
+    """
+
+    def __init__(self, nome_modulo: str):
+        self._nome_modulo = nome_modulo
+        self._modulo = None
+
+    def __getattr__(self, nome: str):
+        if nome.startswith("_"):
+            raise AttributeError(nome)
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome_modulo)
+        atributo = getattr(self._modulo, nome)
+        if not callable(atributo):
+            return atributo
+
+        @wraps(atributo)
+        async def assincrona(*args, **kwargs):
+            return await executar(atributo, *args, **kwargs)
+
+        setattr(self, nome, assincrona)
+        return assincrona
+
+    def __repr__(self) -> str:
+        return f"RepoAsync({self._nome_modulo!r})"
+
+
+def encerrar_executor() -> None:
+    """Encerra o pool de threads do banco (usado no shutdown da aplicação)"""
+    global _executor
+    with _trava:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
@@ -1,11 +1,455 @@
+"""
+Gerenciamento de conexões com o banco SQLite
+
+As conexões são mantidas em um pool compartilhado pelo processo, com
+afinidade por thread: cada thread volta a receber a mesma conexão enquanto
+ela estiver livre, conexões ociosas por muito tempo são fechadas e o total
+de conexões abertas nunca passa do tamanho configurado.
+
+Toda conexão nova recebe o perfil de desempenho (PRAGMAs) definido no .env;
+o modo WAL é persistente no arquivo e aplicado na inicialização por
+aplicar_perfil_desempenho().
+
+contar_consultas() conta as instruções SQL executadas no contexto atual
+(inclusive nas threads de util.db_async), para detectar consultas N+1.
+ContadorConsultasMiddleware faz essa contagem por requisição e devolve o
+total no cabeçalho X-DB-Queries (DB_CONTAR_CONSULTAS, padrão: DEBUG).
+O tempo de cada instrução e o log de consultas lentas ficam em
+util/metricas_db.py.
+
+consultar_por_ids() busca várias linhas por id com `IN (...)`, dividindo a
+lista em lotes que respeitam o limite de parâmetros do SQLite; é a base
+das funções obter_por_ids() dos repositórios.
+"""
+import atexit
+import logging
+import os
 import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Hashable, Iterable, Optional
 
+from util.metricas_db import DB_METRICAS, ConexaoInstrumentada
 
-def get_connection():
-    conn = None
-    try:
-        conn = sqlite3.connect("dados.db")
+
+logger = logging.getLogger(__name__)
+
+
+DB_PATH = os.getenv("DB_PATH", "dados.db")
+DB_POOL_TAMANHO = int(os.getenv("DB_POOL_TAMANHO", "8"))
+DB_POOL_OCIOSO_SEGUNDOS = float(os.getenv("DB_POOL_OCIOSO_SEGUNDOS", "300"))
+DB_POOL_ESPERA_SEGUNDOS = float(os.getenv("DB_POOL_ESPERA_SEGUNDOS", "30"))
+DB_CONTAR_CONSULTAS = os.getenv("DB_CONTAR_CONSULTAS", os.getenv("DEBUG", "False")).lower() == "true"
+# Requisições com mais consultas que isso geram um aviso no log (0 desativa)
+DB_CONSULTAS_AVISO = int(os.getenv("DB_CONSULTAS_AVISO", "30"))
+
+MODOS_JOURNAL = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+MODOS_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+MODOS_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+VALORES_SYNCHRONOUS = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+VALORES_TEMP_STORE = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+def _opcao(nome: str, padrao: str, permitidos: set) -> str:
+    valor = os.getenv(nome, padrao).strip().upper()
+    if valor not in permitidos:
+        raise ValueError(f"{nome}={valor} inválido. Use um de: {', '.join(sorted(permitidos))}")
+    return valor
+
+
+def carregar_perfil_desempenho() -> dict:
+    """
+    Lê do ambiente o perfil de PRAGMAs aplicado às conexões
+
+    Returns:
+        Dicionário com journal_mode, synchronous, mmap_size, cache_size,
+        temp_store e busy_timeout (em milissegundos)
+    """
+    return {
+        "journal_mode": _opcao("DB_JOURNAL_MODE", "WAL", MODOS_JOURNAL),
+        "synchronous": _opcao("DB_SYNCHRONOUS", "NORMAL", MODOS_SYNCHRONOUS),
+        "mmap_size": int(os.getenv("DB_MMAP_SIZE", "134217728")),
+        "cache_size": int(os.getenv("DB_CACHE_SIZE", "-16000")),
+        "temp_store": _opcao("DB_TEMP_STORE", "MEMORY", MODOS_TEMP_STORE),
+        "busy_timeout": int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000")),
+    }
+
+
+PERFIL_DESEMPENHO = carregar_perfil_desempenho()
+
+# PRAGMAs que valem apenas para a conexão e precisam ser repetidos em cada uma
+PRAGMAS_POR_CONEXAO = ("busy_timeout", "synchronous", "cache_size", "mmap_size", "temp_store")
+
+# Parâmetros por instrução quando a conexão não informa o limite
+# (SQLITE_MAX_VARIABLE_NUMBER era 999 antes da versão 3.32)
+LIMITE_PARAMETROS_PADRAO = 999
+
+# Instruções contadas por contar_consultas() (BEGIN/COMMIT/PRAGMA ficam de fora)
+INSTRUCOES_CONTADAS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+class ContadorConsultas:
+    """
+    Conta as consultas executadas enquanto estiver ativo
+
+    Contadores aninhados (ex: o de um script em volta do
+    ContadorConsultasMiddleware) também repassam as consultas ao externo.
+
+    Uso:
+        with contar_consultas() as contador:
+            ...
+        print(contador.total, contador.instrucoes)
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.instrucoes: list[str] = []
+        self._token = None
+        self._externo: Optional["ContadorConsultas"] = None
+
+    def registrar(self, sql: str) -> None:
+        self.total += 1
+        self.instrucoes.append(sql)
+        if self._externo is not None:
+            self._externo.registrar(sql)
+
+    def __enter__(self) -> "ContadorConsultas":
+        self._externo = _contador_atual.get()
+        self._token = _contador_atual.set(self)
+        return self
+
+    def __exit__(self, tipo, valor, rastreio) -> bool:
+        _contador_atual.reset(self._token)
+        return False
+
+
+_contador_atual: ContextVar[Optional[ContadorConsultas]] = ContextVar("contador_consultas", default=None)
+
+
+def _rastrear_instrucao(sql: str) -> None:
+    """Trace callback das conexões: repassa a instrução ao contador ativo, se houver"""
+    contador = _contador_atual.get()
+    if contador is not None and sql.lstrip()[:7].upper().startswith(INSTRUCOES_CONTADAS):
+        contador.registrar(sql)
+
+
+def contar_consultas() -> ContadorConsultas:
+    """Retorna um contador de consultas para uso com `with`"""
+    return ContadorConsultas()
+
+
+class ContadorConsultasMiddleware:
+    """
+    Middleware ASGI que conta as consultas SQL de cada requisição
+
+    O total vai no cabeçalho X-DB-Queries da resposta, e requisições acima
+    de DB_CONSULTAS_AVISO consultas geram um [AVISO] com o caminho.
+
+    Args:
+        app: Aplicação ASGI
+        limite_aviso: Consultas a partir das quais avisar (0 desativa)
+    """
+
+    def __init__(self, app, limite_aviso: int = DB_CONSULTAS_AVISO):
+        self.app = app
+        self.limite_aviso = limite_aviso
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with contar_consultas() as contador:
+            async def enviar(mensagem):
+                if mensagem["type"] == "http.response.start":
+                    headers = list(mensagem.get("headers", []))
+                    headers.append((b"x-db-queries", str(contador.total).encode()))
+                    mensagem = {**mensagem, "headers": headers}
+                await send(mensagem)
+
+            await self.app(scope, receive, enviar)
+
+        if self.limite_aviso and contador.total > self.limite_aviso:
+            logger.warning("%s %s executou %s consultas", scope["method"], scope["path"], contador.total)
+
+
+class PoolConexoes:
+    """
+    Pool de conexões SQLite com reuso por thread e descarte de ociosas
+
+    Args:
+        caminho: Caminho do arquivo do banco
+        tamanho: Número máximo de conexões abertas ao mesmo tempo
+        ocioso_segundos: Tempo sem uso após o qual uma conexão livre é fechada
+        espera_segundos: Tempo máximo aguardando uma conexão livre
+        perfil: PRAGMAs aplicados a cada conexão nova (None = padrão do SQLite)
+    """
+
+    def __init__(self, caminho: str, tamanho: int = 8,
+                 ocioso_segundos: float = 300, espera_segundos: float = 30,
+                 perfil: Optional[dict] = None):
+        self.caminho = caminho
+        self.perfil = perfil or {}
+        self.tamanho = max(1, tamanho)
+        self.ocioso_segundos = ocioso_segundos
+        self.espera_segundos = espera_segundos
+        self._condicao = threading.Condition()
+        self._livres: dict[int, tuple[sqlite3.Connection, float]] = {}
+        self._dono: dict[int, int] = {}
+        self._total = 0
+        self._local = threading.local()
+
+    def _criar_conexao(self) -> sqlite3.Connection:
+        timeout = self.perfil.get("busy_timeout", 5000) / 1000
+        fabrica = ConexaoInstrumentada if DB_METRICAS else sqlite3.Connection
+        conn = sqlite3.connect(self.caminho, timeout=timeout, check_same_thread=False, factory=fabrica)
         conn.row_factory = sqlite3.Row
-    except sqlite3.Error as e:
-        print(e)
-    return conn
+        for pragma in PRAGMAS_POR_CONEXAO:
+            if pragma in self.perfil:
+                conn.execute(f"PRAGMA {pragma} = {self.perfil[pragma]}")
+        conn.set_trace_callback(_rastrear_instrucao)
+        return conn
+
+    def _descartar_ociosas(self, agora: float) -> None:
+        """Fecha conexões livres paradas há mais tempo que o limite (chamar com a trava)"""
+        for chave, (conn, ultimo_uso) in list(self._livres.items()):
+            if agora - ultimo_uso > self.ocioso_segundos:
+                del self._livres[chave]
+                self._dono.pop(chave, None)
+                self._total -= 1
+                conn.close()
+
+    def _retirar(self) -> sqlite3.Connection:
+        thread_id = threading.get_ident()
+        limite = time.monotonic() + self.espera_segundos
+        with self._condicao:
+            while True:
+                self._descartar_ociosas(time.monotonic())
+
+                # Prefere a conexão que esta thread usou por último
+                for chave, dono in self._dono.items():
+                    if dono == thread_id and chave in self._livres:
+                        return self._livres.pop(chave)[0]
+
+                if self._total < self.tamanho:
+                    conn = self._criar_conexao()
+                    self._total += 1
+                    self._dono[id(conn)] = thread_id
+                    return conn
+
+                if self._livres:
+                    chave = next(iter(self._livres))
+                    conn = self._livres.pop(chave)[0]
+                    self._dono[chave] = thread_id
+                    return conn
+
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Nenhuma conexão livre no pool após {self.espera_segundos}s"
+                    )
+                self._condicao.wait(restante)
+
+    def _devolver(self, conn: sqlite3.Connection) -> None:
+        with self._condicao:
+            if conn.in_transaction:
+                conn.rollback()
+            self._livres[id(conn)] = (conn, time.monotonic())
+            self._condicao.notify()
+
+    def conexao(self) -> "ConexaoPool":
+        """Retorna uma conexão do pool para uso com `with`"""
+        return ConexaoPool(self)
+
+    def fechar(self) -> None:
+        """Fecha todas as conexões livres do pool"""
+        with self._condicao:
+            for conn, _ in self._livres.values():
+                conn.close()
+                self._total -= 1
+            for chave in self._livres:
+                self._dono.pop(chave, None)
+            self._livres.clear()
+
+    def estatisticas(self) -> dict:
+        """Retorna o estado atual do pool"""
+        with self._condicao:
+            return {
+                "tamanho": self.tamanho,
+                "abertas": self._total,
+                "livres": len(self._livres),
+                "em_uso": self._total - len(self._livres),
+            }
+
+
+class ConexaoPool:
+    """
+    Conexão emprestada do pool
+
+    Funciona como a conexão do sqlite3 dentro de um `with`: faz commit ao
+    sair sem erro e rollback em caso de exceção, e depois devolve a conexão
+    ao pool. Chamadas aninhadas na mesma thread reutilizam a mesma conexão
+    dentro da transação do bloco externo: cada nível interno é um
+    SAVEPOINT, liberado ao sair sem erro e desfeito (ROLLBACK TO) em caso
+    de exceção. Só o bloco mais externo faz commit ou rollback.
+    """
+
+    def __init__(self, pool: PoolConexoes):
+        self._pool = pool
+        self._conn: Optional[sqlite3.Connection] = None
+        self._savepoint: Optional[str] = None
+
+    def __enter__(self) -> sqlite3.Connection:
+        local = self._pool._local
+        if getattr(local, "profundidade", 0) > 0:
+            local.profundidade += 1
+            self._conn = local.conn
+            # Sem transação aberta o SAVEPOINT iniciaria uma, e o RELEASE faria o commit
+            if not self._conn.in_transaction:
+                self._conn.execute("BEGIN")
+            self._savepoint = f"aninhada_{local.profundidade}"
+            self._conn.execute(f"SAVEPOINT {self._savepoint}")
+        else:
+            self._conn = self._pool._retirar()
+            local.conn = self._conn
+            local.profundidade = 1
+        return self._conn
+
+    def __exit__(self, tipo, valor, rastreio) -> bool:
+        local = self._pool._local
+        try:
+            if self._savepoint is None:
+                if tipo is None:
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+            elif self._conn.in_transaction:
+                # Um commit explícito dentro do bloco já encerrou a transação (e o savepoint)
+                if tipo is not None:
+                    self._conn.execute(f"ROLLBACK TO {self._savepoint}")
+                self._conn.execute(f"RELEASE {self._savepoint}")
+        finally:
+            local.profundidade -= 1
+            if local.profundidade == 0:
+                local.conn = None
+                self._pool._devolver(self._conn)
+        return False
+
+
+_pool = PoolConexoes(
+    DB_PATH,
+    tamanho=DB_POOL_TAMANHO,
+    ocioso_segundos=DB_POOL_OCIOSO_SEGUNDOS,
+    espera_segundos=DB_POOL_ESPERA_SEGUNDOS,
+    perfil=PERFIL_DESEMPENHO,
+)
+
+
+def get_connection() -> ConexaoPool:
+    """
+    Obtém uma conexão do pool compartilhado
+
+    Uso:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            ...
+    """
+    return _pool.conexao()
+
+
+def obter_pool() -> PoolConexoes:
+    """Retorna o pool de conexões do processo"""
+    return _pool
+
+
+def ler_perfil_efetivo(conn: sqlite3.Connection) -> dict:
+    """Lê da conexão os valores atuais dos PRAGMAs do perfil de desempenho"""
+    efetivo = {}
+    for pragma in PERFIL_DESEMPENHO:
+        efetivo[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+    efetivo["journal_mode"] = str(efetivo["journal_mode"]).upper()
+    efetivo["synchronous"] = VALORES_SYNCHRONOUS.get(efetivo["synchronous"], efetivo["synchronous"])
+    efetivo["temp_store"] = VALORES_TEMP_STORE.get(efetivo["temp_store"], efetivo["temp_store"])
+    return efetivo
+
+
+def aplicar_perfil_desempenho() -> dict:
+    """
+    Aplica o modo de journal configurado ao arquivo do banco
+
+    O journal_mode=WAL fica gravado no arquivo, então basta aplicá-lo uma
+    vez na inicialização; os demais PRAGMAs são aplicados pelo pool em cada
+    conexão nova.
+
+    Returns:
+        Perfil efetivo lido do banco após a aplicação
+    """
+    with get_connection() as conn:
+        conn.execute(f"PRAGMA journal_mode = {PERFIL_DESEMPENHO['journal_mode']}")
+        return ler_perfil_efetivo(conn)
+
+
+def verificar_perfil_desempenho() -> tuple[bool, dict]:
+    """
+    Compara o perfil efetivo do banco com o configurado
+
+    Returns:
+        Tupla (perfil confere, dicionário {pragma: (esperado, efetivo)})
+    """
+    with get_connection() as conn:
+        efetivo = ler_perfil_efetivo(conn)
+    comparacao = {
+        pragma: (esperado, efetivo[pragma])
+        for pragma, esperado in PERFIL_DESEMPENHO.items()
+    }
+    confere = all(str(esperado) == str(atual) for esperado, atual in comparacao.values())
+    return confere, comparacao
+
+
+def limite_parametros(conn: sqlite3.Connection) -> int:
+    """Número máximo de parâmetros (?) aceitos em uma instrução nesta conexão"""
+    try:
+        return conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    except AttributeError:
+        # getlimit só existe a partir do Python 3.11
+        return LIMITE_PARAMETROS_PADRAO
+
+
+def consultar_por_ids(sql: str, ids: Iterable[Hashable], tamanho_lote: Optional[int] = None) -> list[sqlite3.Row]:
+    """
+    Executa uma consulta `... IN ({marcadores})` para uma lista de ids, em lotes
+
+    Ids repetidos e None são ignorados. Cada lote usa no máximo o limite de
+    parâmetros da conexão, então a lista pode ter qualquer tamanho.
+
+    Args:
+        sql: Consulta com "{marcadores}" no lugar da lista de parâmetros
+        ids: Ids a buscar
+        tamanho_lote: Máximo de ids por instrução (padrão: limite do SQLite)
+
+    Returns:
+        Linhas encontradas, na ordem em que o banco devolveu cada lote
+
+    Exemplo:
+        rows = consultar_por_ids("SELECT * FROM usuario WHERE id IN ({marcadores})", [3, 1, 2])
+    """
+    unicos = list(dict.fromkeys(i for i in ids if i is not None))
+    if not unicos:
+        return []
+    with get_connection() as conn:
+        lote = min(tamanho_lote or limite_parametros(conn), limite_parametros(conn))
+        rows = []
+        for inicio in range(0, len(unicos), lote):
+            parte = unicos[inicio:inicio + lote]
+            marcadores = ", ".join("?" * len(parte))
+            rows.extend(conn.execute(sql.format(marcadores=marcadores), parte).fetchall())
+        return rows
+
+
+def fechar_conexoes() -> None:
+    """Fecha as conexões abertas pelo pool (usado no shutdown da aplicação)"""
+    _pool.fechar()
+
+
+atexit.register(fechar_conexoes)
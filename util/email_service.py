@@ -1,7 +1,10 @@
+import logging
 import os
 import resend
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 class EmailService:
     def __init__(self):
         self.api_key = os.getenv('RESEND_API_KEY')
@@ -22,7 +25,7 @@ class EmailService:
     ) -> bool:
         """Envia e-mail via Resend.com"""
         if not self.api_key:
-            print("RESEND_API_KEY não configurada")
+            logger.warning("RESEND_API_KEY não configurada")
             return False
 
         params = {
@@ -34,10 +37,10 @@ class EmailService:
 
         try:
             email = resend.Emails.send(params)  # type: ignore[arg-type]
-            print(f"E-mail enviado para {para_email} - ID: {email.get('id', 'N/A')}")
+            logger.info("E-mail enviado para %s - ID: %s", para_email, email.get('id', 'N/A'))
             return True
         except Exception as e:
-            print(f"Erro ao enviar e-mail: {e}")
+            logger.error("Erro ao enviar e-mail: %s", e)
             return False
 
     def enviar_recuperacao_senha(self, para_email: str, para_nome: str, token: str) -> bool:
@@ -1,4 +1,8 @@
 # util/email_service.py - VERSÃO MELHORADA
+#
+# Os métodos enviar_* só montam a mensagem e a gravam na fila de saída
+# (tabela email_saida); o envio é feito em segundo plano pelo
+# util/email_worker.py, reaproveitando uma conexão SMTP por lote.
 import smtplib
 import os
 from email.mime.text import MIMEText
@@ -6,48 +10,62 @@ from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr
 from typing import Optional
 import logging
+from data.repo import email_saida_repo
 
-# Configurar logging para debug
-logging.basicConfig(level=logging.INFO)
+# Handlers e nível dos logs: util/log_util.py (configurar_logs)
 logger = logging.getLogger(__name__)
 
 class EmailService:
     def __init__(self):
-        # Configurações do servidor SMTP
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
-        self.email = "bodyhealth619@gmail.com"
+        # Configurações do servidor SMTP (para testes locais, ex. com aiosmtpd:
+        # SMTP_SERVIDOR=localhost, SMTP_PORTA=8025, SMTP_STARTTLS=false e
+        # BODY_HEALTH_APP_PASSWORD vazio para não fazer login)
+        self.smtp_server = os.getenv("SMTP_SERVIDOR", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORTA", "587"))
+        self.usar_starttls = os.getenv("SMTP_STARTTLS", "true").strip().lower() in ("1", "true", "sim")
+        self.timeout = float(os.getenv("SMTP_TIMEOUT_SEGUNDOS", "10"))
+        self.email = os.getenv("BODY_HEALTH_EMAIL", "bodyhealth619@gmail.com")
         # Use o código de acesso fornecido como senha de app
-        self.password = "mlsn.db4526ae6121f8b073ce1e4114eec60fdfb114fe5943921ce62290543f6a4666"
-        
-        # Você também pode usar variáveis de ambiente se preferir
-        # self.password = os.getenv("BODY_HEALTH_APP_PASSWORD", "mlsn.db4526ae6121f8b073ce1e4114eec60fdfb114fe5943921ce62290543f6a4666")
+        self.password = os.getenv("BODY_HEALTH_APP_PASSWORD", "mlsn.db4526ae6121f8b073ce1e4114eec60fdfb114fe5943921ce62290543f6a4666")
     
-    def testar_conexao(self) -> bool:
-        """Testa a conexão com o servidor SMTP"""
+    def conectar(self) -> smtplib.SMTP:
+        """Abre uma conexão SMTP autenticada (quem chama deve fechar com quit())"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            if self.usar_starttls:
                 server.starttls()
+            if self.password:
                 server.login(self.email, self.password)
-                logger.info("Conexão SMTP testada com sucesso!")
-                return True
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def testar_conexao(self) -> bool:
+        """Testa a conexão com o servidor SMTP"""
+        try:
+            server = self.conectar()
+            server.quit()
+            logger.info("Conexão SMTP testada com sucesso!")
+            return True
         except Exception as e:
-            logger.error(f"Erro na conexão SMTP: {e}")
+            logger.error("Erro na conexão SMTP: %s", e)
             return False
     
+    def _enfileirar(self, msg: MIMEMultipart) -> int:
+        """Grava a mensagem na fila de saída; o envio fica com o email_worker"""
+        return email_saida_repo.enfileirar(msg['To'], msg['Subject'], msg.as_string())
+    
     def enviar_mensagem_suporte(self, nome: str, email_usuario: str, 
                                assunto: str, mensagem: str) -> tuple[bool, str]:
         """
-        Envia mensagem de suporte e retorna status e mensagem de resultado
+        Coloca a mensagem de suporte (e a confirmação ao usuário) na fila de
+        envio e retorna status e mensagem de resultado
         
         Returns:
             tuple: (sucesso: bool, mensagem: str)
         """
         try:
-            # Primeira verificação: testar conexão
-            if not self.testar_conexao():
-                return False, "Erro de conexão com servidor de email"
-            
             # Preparar mensagem para suporte
             msg = MIMEMultipart('alternative')
             msg['From'] = formataddr(("Body Health Sistema", self.email))
@@ -117,15 +135,11 @@ Para responder, use o email: {email_usuario}
             msg.attach(part_texto)
             msg.attach(part_html)
             
-            # Enviar mensagem para suporte
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email, self.password)
-                server.send_message(msg)
+            # Enfileirar mensagem para suporte
+            self._enfileirar(msg)
+            logger.info("Email de suporte de %s colocado na fila", email_usuario)
             
-            logger.info(f"Email de suporte enviado de {email_usuario}")
-            
-            # Enviar confirmação para o usuário
+            # Enfileirar confirmação para o usuário
             confirmacao_enviada = self._enviar_confirmacao(email_usuario, nome, assunto)
             
             if confirmacao_enviada:
@@ -133,18 +147,12 @@ Para responder, use o email: {email_usuario}
             else:
                 return True, "Mensagem enviada com sucesso!"
             
-        except smtplib.SMTPAuthenticationError:
-            logger.error("Erro de autenticação SMTP")
-            return False, "Erro de autenticação do servidor de email"
-        except smtplib.SMTPException as e:
-            logger.error(f"Erro SMTP: {e}")
-            return False, f"Erro no servidor de email: {str(e)}"
         except Exception as e:
-            logger.error(f"Erro inesperado ao enviar email: {e}")
+            logger.error("Erro inesperado ao enviar email: %s", e)
             return False, "Erro interno do sistema. Tente novamente."
     
     def _enviar_confirmacao(self, email_usuario: str, nome: str, assunto_original: str) -> bool:
-        """Envia email de confirmação para o usuário"""
+        """Coloca na fila o email de confirmação para o usuário"""
         try:
             msg = MIMEMultipart('alternative')
             msg['From'] = formataddr(("Body Health Suporte", self.email))
@@ -223,21 +231,18 @@ bodyhealth619@gmail.com
             msg.attach(part_texto)
             msg.attach(part_html)
             
-            # Enviar confirmação
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email, self.password)
-                server.send_message(msg)
+            # Enfileirar confirmação
+            self._enfileirar(msg)
             
-            logger.info(f"Confirmação enviada para {email_usuario}")
+            logger.info("Confirmação para %s colocada na fila", email_usuario)
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao enviar confirmação: {e}")
+            logger.error("Erro ao enviar confirmação: %s", e)
             return False
     
     def enviar_recuperacao_senha(self, email_usuario: str, nome: str, nova_senha: str) -> tuple[bool, str]:
-        """Envia email de recuperação de senha"""
+        """Coloca na fila o email de recuperação de senha"""
         try:
             msg = MIMEMultipart('alternative')
             msg['From'] = formataddr(("Body Health Sistema", self.email))
@@ -320,17 +325,80 @@ Equipe Body Health
             msg.attach(part_texto)
             msg.attach(part_html)
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email, self.password)
-                server.send_message(msg)
+            self._enfileirar(msg)
             
             return True, "Email de recuperação enviado com sucesso!"
             
         except Exception as e:
-            logger.error(f"Erro ao enviar recuperação: {e}")
+            logger.error("Erro ao enviar recuperação: %s", e)
             return False, "Erro ao enviar email de recuperação"
 
+    
+    def enviar_boas_vindas(self, email_usuario: str, nome: str) -> bool:
+        """Coloca na fila o email de boas-vindas"""
+        try:
+            msg = MIMEMultipart('alternative')
+            msg['From'] = formataddr(("Body Health Sistema", self.email))
+            msg['To'] = email_usuario
+            msg['Subject'] = "Bem-vindo ao Body Health"
+            
+            corpo_texto = f"""
+Olá {nome},
+
+Seu cadastro foi realizado com sucesso!
+
+Agora você pode acessar o sistema com seu e-mail e senha.
+
+Atenciosamente,
+Equipe Body Health
+"""
+            
+            corpo_html = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background: #28a745; color: white; padding: 20px; text-align: center; }}
+        .content {{ padding: 30px; background: #f8f9fa; }}
+        .footer {{ text-align: center; padding: 20px; color: #666; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>Bem-vindo(a)!</h2>
+        </div>
+        <div class="content">
+            <p>Olá <strong>{nome}</strong>,</p>
+            <p>Seu cadastro foi realizado com sucesso!</p>
+            <p>Agora você pode acessar o sistema com seu e-mail e senha.</p>
+        </div>
+        <div class="footer">
+            <strong>Equipe Body Health</strong><br>
+            📧 bodyhealth619@gmail.com
+        </div>
+    </div>
+</body>
+</html>
+"""
+            
+            part_texto = MIMEText(corpo_texto, 'plain', 'utf-8')
+            part_html = MIMEText(corpo_html, 'html', 'utf-8')
+            msg.attach(part_texto)
+            msg.attach(part_html)
+            
+            self._enfileirar(msg)
+            
+            logger.info("Boas-vindas para %s colocadas na fila", email_usuario)
+            return True
+            
+        except Exception as e:
+            logger.error("Erro ao enviar boas-vindas: %s", e)
+            return False
+
 
 # Instância global do serviço
 email_service_gmail = EmailService()
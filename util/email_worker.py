@@ -0,0 +1,241 @@
+"""
+Envio em segundo plano da fila de emails (tabela email_saida)
+
+As rotas só gravam as mensagens na fila (util/email_service_gmail.py). O
+EmailWorker, iniciado no startup da aplicação, reserva lotes de emails
+prontos e os envia por uma única conexão SMTP autenticada, que é mantida
+aberta entre lotes e fechada depois de EMAIL_SMTP_OCIOSO_SEGUNDOS sem uso.
+Falhas voltam para a fila com espera exponencial (EMAIL_BACKOFF_SEGUNDOS,
+dobrando a cada tentativa até EMAIL_BACKOFF_MAXIMO_SEGUNDOS); depois de
+EMAIL_MAX_TENTATIVAS o email fica com status 'falhou'. Servidor fora do
+ar (conexão ou autenticação) não conta como tentativa de nenhum email: o
+resto do lote volta à fila com a mesma espera exponencial, contada pelas
+falhas seguidas do servidor, e uma queda longa não esgota a fila.
+
+Como a fila está no SQLite, vários workers do uvicorn podem drenar a mesma
+fila: cada lote é reservado com um prazo, então um email não é enviado
+por dois processos ao mesmo tempo.
+
+Para testar sem enviar emails de verdade, suba um servidor SMTP local e
+aponte o serviço para ele:
+    python -m aiosmtpd -n -l localhost:8025
+    SMTP_SERVIDOR=localhost SMTP_PORTA=8025 SMTP_STARTTLS=false BODY_HEALTH_APP_PASSWORD= \\
+        python -m util.email_worker
+"""
+import asyncio
+import email as email_lib
+import logging
+import os
+import smtplib
+import threading
+import time
+from typing import Optional
+
+from data.repo import email_saida_repo
+from util.email_service_gmail import EmailService, email_service_gmail
+
+
+logger = logging.getLogger(__name__)
+
+
+EMAIL_INTERVALO_SEGUNDOS = float(os.getenv("EMAIL_INTERVALO_SEGUNDOS", "2"))
+EMAIL_LOTE = int(os.getenv("EMAIL_LOTE", "20"))
+EMAIL_MAX_TENTATIVAS = int(os.getenv("EMAIL_MAX_TENTATIVAS", "6"))
+EMAIL_BACKOFF_SEGUNDOS = int(os.getenv("EMAIL_BACKOFF_SEGUNDOS", "30"))
+EMAIL_BACKOFF_MAXIMO_SEGUNDOS = int(os.getenv("EMAIL_BACKOFF_MAXIMO_SEGUNDOS", "3600"))
+EMAIL_SMTP_OCIOSO_SEGUNDOS = float(os.getenv("EMAIL_SMTP_OCIOSO_SEGUNDOS", "60"))
+# Prazo da reserva de um lote: se o processo morrer enviando, o lote volta à fila
+EMAIL_PRAZO_RESERVA_SEGUNDOS = 300
+
+
+def calcular_espera(tentativas: int) -> int:
+    """Espera até a próxima tentativa, dobrando a cada falha"""
+    return min(EMAIL_BACKOFF_SEGUNDOS * 2 ** tentativas, EMAIL_BACKOFF_MAXIMO_SEGUNDOS)
+
+
+class EmailWorker:
+    """
+    Drena a fila de emails reaproveitando uma conexão SMTP
+
+    Args:
+        servico: EmailService com as configurações do servidor SMTP
+    """
+
+    def __init__(self, servico: EmailService):
+        self.servico = servico
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._ultimo_uso = 0.0
+        self._trava = threading.Lock()
+        self._tarefa: Optional[asyncio.Task] = None
+        self._acordar: Optional[asyncio.Event] = None
+        self._parando = False
+        self._falhas_servidor = 0
+        self.enviados = 0
+        self.falhas = 0
+
+    def _obter_smtp(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+            except smtplib.SMTPException:
+                self._fechar_smtp()
+        if self._smtp is None:
+            self._smtp = self.servico.conectar()
+        return self._smtp
+
+    def _fechar_smtp(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def _enviar(self, email: dict) -> None:
+        """Envia um email, reconectando uma vez se o servidor fechou a conexão"""
+        mensagem = email_lib.message_from_string(email["mensagem"])
+        for tentativa in range(2):
+            try:
+                self._obter_smtp().send_message(
+                    mensagem, from_addr=self.servico.email, to_addrs=[email["destinatario"]]
+                )
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                if tentativa == 1:
+                    raise
+
+    def _registrar_falha(self, email: dict, erro: Exception) -> None:
+        self.falhas += 1
+        tentativas = email["tentativas"] + 1
+        definitiva = tentativas >= EMAIL_MAX_TENTATIVAS
+        email_saida_repo.registrar_falha(email["id"], str(erro), calcular_espera(email["tentativas"]), definitiva)
+        logger.warning("Falha ao enviar email %s (tentativa %s): %s", email['id'], tentativas, erro)
+
+    def processar_lote(self) -> int:
+        """
+        Reserva e envia um lote de emails prontos
+
+        Returns:
+            Quantidade de emails reservados (0 se a fila está vazia)
+        """
+        with self._trava:
+            emails = email_saida_repo.reservar_lote(EMAIL_LOTE, EMAIL_PRAZO_RESERVA_SEGUNDOS)
+            if not emails:
+                if self._smtp is not None and time.monotonic() - self._ultimo_uso > EMAIL_SMTP_OCIOSO_SEGUNDOS:
+                    self._fechar_smtp()
+                return 0
+
+            for posicao, email in enumerate(emails):
+                try:
+                    self._enviar(email)
+                except smtplib.SMTPRecipientsRefused as e:
+                    # Destinatário recusado: tentar de novo não adianta
+                    self.falhas += 1
+                    email_saida_repo.registrar_falha(email["id"], str(e), 0, definitiva=True)
+                    logger.error("Email %s para %s recusado: %s", email['id'], email['destinatario'], e)
+                except (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError,
+                        smtplib.SMTPServerDisconnected) as e:
+                    self._adiar_restante(emails[posicao:], e)
+                    break
+                except smtplib.SMTPResponseException as e:
+                    # Erro do servidor só para esta mensagem; a conexão continua válida
+                    self._registrar_falha(email, e)
+                except OSError as e:
+                    # Rede: servidor inacessível ou conexão caiu (SMTPException também é OSError)
+                    self._adiar_restante(emails[posicao:], e)
+                    break
+                except Exception as e:
+                    self._fechar_smtp()
+                    self._registrar_falha(email, e)
+                else:
+                    self._falhas_servidor = 0
+                    self.enviados += 1
+                    email_saida_repo.marcar_enviado(email["id"])
+            self._ultimo_uso = time.monotonic()
+            return len(emails)
+
+    def _adiar_restante(self, emails: list, erro: Exception) -> None:
+        """Servidor indisponível: devolve o resto do lote à fila com espera, sem contar tentativa"""
+        self._fechar_smtp()
+        espera = calcular_espera(self._falhas_servidor)
+        self._falhas_servidor += 1
+        email_saida_repo.adiar([email["id"] for email in emails], str(erro), espera)
+        logger.warning("Servidor SMTP indisponível (%s falhas seguidas), %s emails adiados por %s s: %s",
+                       self._falhas_servidor, len(emails), espera, erro)
+
+    def processar_pendentes(self) -> int:
+        """Envia lotes até a fila não ter mais emails prontos; retorna quantos foram reservados"""
+        total = 0
+        while True:
+            quantidade = self.processar_lote()
+            total += quantidade
+            if quantidade < EMAIL_LOTE:
+                return total
+
+    def notificar(self) -> None:
+        """Acorda o worker antes do próximo intervalo (chamar no event loop)"""
+        if self._acordar is not None:
+            self._acordar.set()
+
+    async def _executar(self) -> None:
+        # Além do cancel(), parar() liga _parando: no Python 3.11, o wait_for
+        # engole o cancelamento se o evento for acordado na mesma iteração
+        while not self._parando:
+            try:
+                await asyncio.to_thread(self.processar_pendentes)
+            except Exception as e:
+                logger.error("Worker de email: %s", e)
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=EMAIL_INTERVALO_SEGUNDOS)
+            except asyncio.TimeoutError:
+                pass
+            self._acordar.clear()
+
+    async def iniciar(self) -> None:
+        """Inicia o envio em segundo plano (startup da aplicação)"""
+        if self._tarefa is None:
+            self._parando = False
+            self._acordar = asyncio.Event()
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        """Para o envio em segundo plano e fecha a conexão SMTP (shutdown)"""
+        if self._tarefa is not None:
+            self._parando = True
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+            self._acordar = None
+        self.fechar_conexao()
+
+    def fechar_conexao(self) -> None:
+        """Fecha a conexão SMTP mantida entre lotes"""
+        with self._trava:
+            self._fechar_smtp()
+
+    def estatisticas(self) -> dict:
+        """Contadores do processo e tamanho da fila por status"""
+        return {
+            "enviados": self.enviados,
+            "falhas": self.falhas,
+            "conexao_aberta": self._smtp is not None,
+            "fila": email_saida_repo.contar_por_status(),
+        }
+
+
+email_worker = EmailWorker(email_service_gmail)
+
+
+def main():
+    processados = email_worker.processar_pendentes()
+    email_worker.fechar_conexao()
+    print(f"Emails processados: {processados} | {email_worker.estatisticas()}")
+
+
+if __name__ == "__main__":
+    main()
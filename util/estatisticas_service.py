@@ -0,0 +1,47 @@
+import logging
+from data.repo_async import estatisticas_repo
+
+
+logger = logging.getLogger(__name__)
+
+
+class EstatisticasService:
+    """Estatísticas agregadas para os dashboards, calculadas no banco com COUNT"""
+
+    ESTATISTICAS_PERSONAL_VAZIAS = {
+        "total_alunos": 0,
+        "alunos_ativos": 0,
+        "total_treinos": 0,
+        "total_avaliacoes": 0
+    }
+
+    async def dashboard_personal(self, personal_id: int) -> dict:
+        """
+        Totais do dashboard de um personal em uma única consulta
+
+        Returns:
+            Dicionário com total_alunos, alunos_ativos, total_treinos e
+            total_avaliacoes (zeros se o personal não tiver alunos)
+        """
+        try:
+            return await estatisticas_repo.obter_estatisticas_personal(personal_id)
+        except Exception as e:
+            logger.error("Estatísticas do personal %s: %s", personal_id, e)
+            return dict(self.ESTATISTICAS_PERSONAL_VAZIAS)
+
+    async def dashboard_admin(self) -> dict:
+        """
+        Totais do dashboard do admin em uma única consulta
+
+        O resultado fica em cache por alguns segundos e é invalidado pelas
+        escritas em usuário, cliente, profissional e plano.
+
+        Returns:
+            Dicionário com total_usuarios, total_clientes,
+            total_profissionais, total_planos e profissionais_pendentes
+        """
+        return await estatisticas_repo.obter_estatisticas_admin()
+
+
+# Instância global do serviço
+estatisticas_service = EstatisticasService()
@@ -1,38 +1,147 @@
 # util/file_upload.py - NOVO ARQUIVO
+#
+# O upload é copiado em blocos de TAMANHO_BLOCO para um arquivo temporário
+# (aiofiles) e só depois renomeado para o nome final, então a memória usada
+# por upload é constante e nunca fica um arquivo pela metade em
+# static/uploads. O tipo é conferido pelos primeiros bytes do arquivo, não
+# pelo content_type enviado pelo navegador.
 import os
 import uuid
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
 from fastapi import UploadFile, HTTPException
+from starlette.responses import PlainTextResponse
+
+from util.imagem_util import agendar_derivadas
 
 UPLOAD_DIR = "static/uploads/profissionais"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+TAMANHO_MAXIMO_FOTO = int(os.getenv("MAX_FILE_SIZE", str(5 * 1024 * 1024)))
+TAMANHO_BLOCO = 64 * 1024
+
+# Assinaturas (magic bytes) dos formatos aceitos -> extensão salva
+ASSINATURAS_IMAGEM = {
+    b"\xff\xd8\xff": "jpg",
+    b"\x89PNG\r\n\x1a\n": "png",
+}
+TAMANHO_ASSINATURA = max(len(assinatura) for assinatura in ASSINATURAS_IMAGEM)
+
+
+def detectar_tipo_imagem(cabecalho: bytes) -> Optional[str]:
+    """Retorna a extensão ('jpg' ou 'png') pelos primeiros bytes, ou None se não for imagem aceita"""
+    for assinatura, extensao in ASSINATURAS_IMAGEM.items():
+        if cabecalho.startswith(assinatura):
+            return extensao
+    return None
+
+
 async def salvar_foto_registro(arquivo: UploadFile) -> str:
     """Salva foto de registro profissional e retorna o path"""
     
     if not arquivo or not arquivo.filename:
         raise HTTPException(400, "Arquivo obrigatório")
     
-    # Validar tipo
-    tipos_permitidos = ['image/jpeg', 'image/png', 'image/jpg']
-    if arquivo.content_type not in tipos_permitidos:
+    # Validar tipo pelo conteúdo (o nome e o content_type vêm do cliente)
+    await arquivo.seek(0)
+    bloco = await arquivo.read(TAMANHO_BLOCO)
+    extensao = detectar_tipo_imagem(bloco)
+    if not extensao:
         raise HTTPException(400, "Apenas imagens JPG/PNG são permitidas")
     
-    # Validar tamanho (máximo 5MB)
-    conteudo = await arquivo.read()
-    if len(conteudo) > 5 * 1024 * 1024:  # 5MB
-        raise HTTPException(400, "Arquivo muito grande (máximo 5MB)")
-    
     # Gerar nome único
-    extensao = arquivo.filename.split('.')[-1].lower()
     nome_arquivo = f"{uuid.uuid4().hex}.{extensao}"
     caminho_completo = os.path.join(UPLOAD_DIR, nome_arquivo)
+    caminho_temporario = os.path.join(UPLOAD_DIR, f".{nome_arquivo}.parcial")
+    
+    # Copiar em blocos, interrompendo assim que passar do tamanho máximo
+    try:
+        total = 0
+        async with aiofiles.open(caminho_temporario, "wb") as destino:
+            while bloco:
+                total += len(bloco)
+                if total > TAMANHO_MAXIMO_FOTO:
+                    raise HTTPException(400, f"Arquivo muito grande (máximo {TAMANHO_MAXIMO_FOTO // (1024 * 1024)}MB)")
+                await destino.write(bloco)
+                bloco = await arquivo.read(TAMANHO_BLOCO)
+        await aiofiles.os.replace(caminho_temporario, caminho_completo)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(caminho_temporario)
+        except FileNotFoundError:
+            pass
+        raise
     
-    # Salvar arquivo
-    with open(caminho_completo, "wb") as f:
-        f.write(conteudo)
+    # Miniaturas e WebP para as páginas de listagem, geradas em segundo plano
+    caminho_web = f"/static/uploads/profissionais/{nome_arquivo}"
+    agendar_derivadas(caminho_web)
     
     # Retornar path web
-    return f"/static/uploads/profissionais/{nome_arquivo}"
+    return caminho_web
+
+
+class LimiteUploadMiddleware:
+    """
+    Middleware ASGI que limita o tamanho do corpo das rotas de upload
+
+    O Starlette grava o upload inteiro em um arquivo temporário antes de
+    chamar a rota, então a verificação em salvar_foto_registro chega tarde
+    para uploads enormes. Aqui a requisição é recusada com 413 pelo
+    Content-Length ou, sem ele, assim que os bytes recebidos passam do
+    limite.
+
+    Args:
+        app: Aplicação ASGI
+        limites: Dicionário {caminho: tamanho máximo do corpo em bytes}
+    """
+
+    def __init__(self, app, limites: dict[str, int]):
+        self.app = app
+        self.limites = limites
+
+    async def __call__(self, scope, receive, send):
+        limite = self.limites.get(scope["path"]) if scope["type"] == "http" else None
+        if limite is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        resposta_muito_grande = PlainTextResponse("Arquivo muito grande.", status_code=413)
+        for nome, valor in scope["headers"]:
+            if nome == b"content-length" and valor.isdigit() and int(valor) > limite:
+                await resposta_muito_grande(scope, receive, send)
+                return
+
+        recebidos = 0
+        resposta_iniciada = False
+
+        async def receber_limitado():
+            nonlocal recebidos
+            mensagem = await receive()
+            if mensagem["type"] == "http.request":
+                recebidos += len(mensagem.get("body", b""))
+                if recebidos > limite:
+                    raise _CorpoMuitoGrande()
+            return mensagem
+
+        async def enviar(mensagem):
+            nonlocal resposta_iniciada
+            if mensagem["type"] == "http.response.start":
+                resposta_iniciada = True
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receber_limitado, enviar)
+        except _CorpoMuitoGrande:
+            if not resposta_iniciada:
+                await resposta_muito_grande(scope, receive, send)
+
+
+class _CorpoMuitoGrande(HTTPException):
+    # HTTPException para o FastAPI não converter em 400 ao ler o formulário
+    def __init__(self):
+        super().__init__(413, "Arquivo muito grande.")
 
 def validar_cpf_cnpj(documento: str) -> bool:
     """Validação básica de CPF/CNPJ"""
@@ -0,0 +1,275 @@
+"""
+Versões reduzidas (derivadas) das imagens do site
+
+Para cada imagem original (fotos de registro enviadas e imagens de
+static/img) são geradas versões WebP em alguns tamanhos, com o hash do
+conteúdo no nome do arquivo:
+    static/derivadas/carrossel2-grande-3f9a1c2b7d.webp
+
+O arquivo static/derivadas/manifest.json liga o caminho original às
+derivadas. Nos templates, a função imagem() devolve a derivada do tamanho
+pedido, ou o original enquanto ela ainda não existir:
+    <img src="{{ imagem(prof.foto_registro, 'mini') }}">
+
+Depende do Pillow (pip install Pillow). Sem ele nenhuma derivada é gerada
+e imagem() sempre devolve o original.
+
+Para gerar as derivadas das imagens que já existem:
+    python -m util.imagem_util
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+logger = logging.getLogger(__name__)
+
+
+DIRETORIO_DERIVADAS = "static/derivadas"
+CAMINHO_MANIFEST = os.path.join(DIRETORIO_DERIVADAS, "manifest.json")
+CAMINHO_TRAVA_MANIFEST = os.path.join(DIRETORIO_DERIVADAS, "manifest.lock")
+DIRETORIOS_ORIGINAIS = ["static/uploads/profissionais", "static/img"]
+EXTENSOES_ORIGINAIS = (".jpg", ".jpeg", ".png")
+
+# Maior lado de cada tamanho, em pixels (imagens menores não são ampliadas)
+TAMANHOS = {
+    "mini": 160,
+    "media": 480,
+    "grande": 1280,
+}
+QUALIDADE_WEBP = int(os.getenv("IMAGEM_QUALIDADE_WEBP", "80"))
+
+_trava = threading.Lock()
+_manifest: dict = {}
+_manifest_mtime: Optional[float] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_aviso_pillow = False
+
+
+def pillow_disponivel() -> bool:
+    """Indica se o Pillow está instalado; avisa uma vez quando não está"""
+    global _aviso_pillow
+    if Image is None and not _aviso_pillow:
+        _aviso_pillow = True
+        logger.warning("Pillow não instalado: versões reduzidas das imagens desativadas (pip install Pillow)")
+    return Image is not None
+
+
+def _caminho_arquivo(caminho_web: str) -> str:
+    return caminho_web.lstrip("/")
+
+
+def _caminho_web(caminho_arquivo: str) -> str:
+    return "/" + caminho_arquivo.replace(os.sep, "/")
+
+
+def _carregar_manifest() -> dict:
+    """Lê o manifest do disco se ele mudou desde a última leitura"""
+    global _manifest, _manifest_mtime
+    try:
+        mtime = os.stat(CAMINHO_MANIFEST).st_mtime
+    except FileNotFoundError:
+        return _manifest
+    if mtime != _manifest_mtime:
+        try:
+            with open(CAMINHO_MANIFEST, encoding="utf-8") as f:
+                _manifest = json.load(f)
+            _manifest_mtime = mtime
+        except (OSError, ValueError) as e:
+            logger.warning("Manifest de imagens ilegível: %s", e)
+    return _manifest
+
+
+@contextmanager
+def _trava_manifest():
+    """
+    Exclusão mútua na gravação do manifest entre threads e entre processos
+
+    Os workers do uvicorn são processos separados: a trava de threads não
+    basta, então a gravação também trava um arquivo (flock, ou
+    msvcrt.locking no Windows), liberado ao fechá-lo.
+    """
+    with _trava:
+        os.makedirs(DIRETORIO_DERIVADAS, exist_ok=True)
+        with open(CAMINHO_TRAVA_MANIFEST, "a+b") as arquivo:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+                yield
+                return
+            arquivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK desiste após ~10 s; outro processo ainda está gravando
+                    continue
+            try:
+                yield
+            finally:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _gravar_no_manifest(caminho_web: str, derivadas: dict) -> None:
+    """Atualiza uma entrada do manifest (relendo o arquivo, que outros workers também gravam)"""
+    global _manifest, _manifest_mtime
+    with _trava_manifest():
+        # Lê o arquivo mesmo que o mtime pareça igual: outra gravação no mesmo
+        # instante não mudaria o mtime na resolução do sistema de arquivos
+        try:
+            with open(CAMINHO_MANIFEST, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {}
+        except ValueError as e:
+            logger.warning("Manifest de imagens ilegível, regravado a partir da memória: %s", e)
+            manifest = dict(_manifest)
+        manifest[caminho_web] = derivadas
+        temporario = f"{CAMINHO_MANIFEST}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporario, CAMINHO_MANIFEST)
+        _manifest = manifest
+        _manifest_mtime = os.stat(CAMINHO_MANIFEST).st_mtime
+
+
+def imagem(caminho_web: Optional[str], tamanho: str = "media") -> Optional[str]:
+    """
+    Caminho da versão reduzida de uma imagem (uso nos templates)
+
+    Args:
+        caminho_web: Caminho original, ex: "/static/img/logo.png"
+        tamanho: "mini", "media" ou "grande"
+
+    Returns:
+        Caminho da derivada WebP, ou o original se ela não existir
+    """
+    if not caminho_web:
+        return caminho_web
+    return _carregar_manifest().get(caminho_web, {}).get(tamanho, caminho_web)
+
+
+def gerar_derivadas(caminho_web: str, forcar: bool = False) -> dict:
+    """
+    Gera as versões WebP de uma imagem e registra no manifest
+
+    Args:
+        caminho_web: Caminho original, ex: "/static/uploads/profissionais/abc.jpg"
+        forcar: Gera de novo mesmo se o manifest já tiver a imagem
+
+    Returns:
+        Dicionário {tamanho: caminho da derivada} (vazio sem Pillow ou se
+        o arquivo não for uma imagem válida)
+    """
+    if not pillow_disponivel():
+        return {}
+    existentes = _carregar_manifest().get(caminho_web)
+    if existentes and not forcar and all(os.path.exists(_caminho_arquivo(c)) for c in existentes.values()):
+        return existentes
+
+    origem = _caminho_arquivo(caminho_web)
+    with open(origem, "rb") as f:
+        resumo = hashlib.sha256(f.read()).hexdigest()[:10]
+    base = os.path.splitext(os.path.basename(origem))[0]
+    os.makedirs(DIRETORIO_DERIVADAS, exist_ok=True)
+
+    derivadas = {}
+    try:
+        with Image.open(origem) as original:
+            original.load()
+            if original.mode not in ("RGB", "RGBA"):
+                original = original.convert("RGBA" if "transparency" in original.info else "RGB")
+            for tamanho, lado in TAMANHOS.items():
+                destino = os.path.join(DIRETORIO_DERIVADAS, f"{base}-{tamanho}-{resumo}.webp")
+                if not os.path.exists(destino):
+                    copia = original.copy()
+                    copia.thumbnail((lado, lado))
+                    temporario = f"{destino}.tmp"
+                    copia.save(temporario, "WEBP", quality=QUALIDADE_WEBP, method=4)
+                    os.replace(temporario, destino)
+                derivadas[tamanho] = _caminho_web(destino)
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning("Não foi possível gerar versões de %s: %s", caminho_web, e)
+        return {}
+
+    _gravar_no_manifest(caminho_web, derivadas)
+    return derivadas
+
+
+def agendar_derivadas(caminho_web: str) -> None:
+    """Gera as derivadas em segundo plano, sem atrasar a requisição"""
+    global _executor
+    if not pillow_disponivel():
+        return
+    with _trava:
+        if _executor is None:
+            # Uma thread: redimensionar usa CPU e não deve competir com as requisições
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="imagem")
+        executor = _executor
+    executor.submit(_gerar_em_segundo_plano, caminho_web)
+
+
+def _gerar_em_segundo_plano(caminho_web: str) -> None:
+    try:
+        gerar_derivadas(caminho_web)
+    except Exception as e:
+        logger.error("Derivadas de %s: %s", caminho_web, e)
+
+
+def encerrar_executor_imagem() -> None:
+    """Espera as derivadas em andamento e encerra a thread (shutdown da aplicação)"""
+    global _executor
+    with _trava:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera as versões reduzidas (WebP) das imagens existentes")
+    parser.add_argument("--forcar", action="store_true", help="Gera de novo mesmo as já registradas no manifest")
+    args = parser.parse_args()
+
+    if not pillow_disponivel():
+        raise SystemExit("Instale o Pillow para gerar as imagens: pip install Pillow")
+
+    antes = depois = geradas = 0
+    for diretorio in DIRETORIOS_ORIGINAIS:
+        if not os.path.isdir(diretorio):
+            continue
+        for nome in sorted(os.listdir(diretorio)):
+            if not nome.lower().endswith(EXTENSOES_ORIGINAIS):
+                continue
+            caminho_web = _caminho_web(os.path.join(diretorio, nome))
+            derivadas = gerar_derivadas(caminho_web, forcar=args.forcar)
+            if not derivadas:
+                continue
+            geradas += 1
+            antes += os.path.getsize(_caminho_arquivo(caminho_web))
+            depois += os.path.getsize(_caminho_arquivo(derivadas["mini"]))
+            print(f"{caminho_web} -> {', '.join(derivadas.values())}")
+
+    print(f"Imagens processadas: {geradas} | originais: {antes / 1024:.0f} KB | "
+          f"miniaturas: {depois / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Logs da aplicação com formatação e escrita fora da thread da requisição
+
+configurar_logs() coloca um QueueHandler no logger raiz: a chamada de log
+(logger.info, logger.exception...) só monta o registro e o põe em uma
+fila. Uma thread do QueueListener formata (texto ou JSON, com o traceback)
+e escreve no stderr. Com a fila cheia, o registro é descartado e contado,
+sem bloquear a requisição.
+
+Cada registro leva o id da requisição (id_requisicao), preenchido por
+IdRequisicaoMiddleware a partir do cabeçalho X-Request-ID (ou gerado) e
+devolvido no mesmo cabeçalho da resposta.
+
+Configuração (.env):
+    LOG_NIVEL           nível dos módulos da aplicação (padrão: DEBUG com DEBUG=True,
+                        senão INFO); as bibliotecas ficam em INFO ou acima
+    LOG_NIVEIS          níveis por módulo, ex: "util.metricas_db=WARNING,routes=INFO"
+    LOG_FORMATO         "texto" ou "json" (um objeto por linha)
+    LOG_AMOSTRA_DEBUG   fração das requisições com logs DEBUG (1 = todas)
+    LOG_FILA_MAXIMA     registros aguardando escrita (0 = sem limite)
+
+Uso nos módulos:
+    import logging
+    logger = logging.getLogger(__name__)
+
+    logger.debug("IMC calculado: %s", imc)
+    try:
+        ...
+    except Exception as e:
+        logger.exception("Salvar avaliação: %s", e)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from typing import Optional
+
+
+DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+LOG_NIVEL = os.getenv("LOG_NIVEL", "DEBUG" if DEBUG else "INFO").upper()
+LOG_NIVEIS = os.getenv("LOG_NIVEIS", "")
+LOG_FORMATO = os.getenv("LOG_FORMATO", "texto").lower()
+LOG_AMOSTRA_DEBUG = float(os.getenv("LOG_AMOSTRA_DEBUG", "1"))
+LOG_FILA_MAXIMA = int(os.getenv("LOG_FILA_MAXIMA", "10000"))
+
+PACOTES_APLICACAO = ("main", "routes", "data", "util")
+CABECALHO_ID = "x-request-id"
+SEM_REQUISICAO = "-"
+_ID_VALIDO = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# Rótulos usados nos prints antigos ([AVISO], [ERRO]), mantidos no formato texto
+NOMES_NIVEIS = {
+    logging.DEBUG: "DEBUG",
+    logging.INFO: "INFO",
+    logging.WARNING: "AVISO",
+    logging.ERROR: "ERRO",
+    logging.CRITICAL: "CRÍTICO",
+}
+
+# Atributos do LogRecord; os demais vêm de extra={...} e vão para o JSON
+_ATRIBUTOS_REGISTRO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+id_requisicao: ContextVar[str] = ContextVar("id_requisicao", default=SEM_REQUISICAO)
+
+_trava = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_fila: Optional[queue.Queue] = None
+_descartados = 0
+
+
+class FiltroContexto(logging.Filter):
+    """Adiciona request_id ao registro e amostra os logs DEBUG por requisição"""
+
+    def __init__(self, amostra_debug: float = 1.0):
+        super().__init__()
+        self.amostra_debug = amostra_debug
+
+    def _debug_amostrado(self, id_atual: str) -> bool:
+        if self.amostra_debug >= 1:
+            return True
+        if self.amostra_debug <= 0:
+            return False
+        # Decisão pelo id: uma requisição amostrada tem todos os seus logs DEBUG
+        if id_atual == SEM_REQUISICAO:
+            return random.random() < self.amostra_debug
+        return zlib.crc32(id_atual.encode()) % 10000 < self.amostra_debug * 10000
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        id_atual = id_requisicao.get()
+        if record.levelno <= logging.DEBUG and not self._debug_amostrado(id_atual):
+            return False
+        record.request_id = id_atual
+        return True
+
+
+class QueueHandlerNaoBloqueante(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deixa a formatação para a thread do listener
+
+    O QueueHandler padrão formata a mensagem e o traceback antes de
+    enfileirar; aqui só os argumentos são aplicados (eles podem mudar
+    depois da chamada) e o traceback segue como exc_info.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _descartados
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with _trava:
+                _descartados += 1
+
+
+class FormatadorTexto(logging.Formatter):
+    """Linha `data [NÍVEL] modulo [request_id]: mensagem`"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s [%(nivel)s] %(name)s [%(request_id)s]: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.nivel = NOMES_NIVEIS.get(record.levelno, record.levelname)
+        if not hasattr(record, "request_id"):
+            record.request_id = SEM_REQUISICAO
+        return super().format(record)
+
+
+class FormatadorJson(logging.Formatter):
+    """Um objeto JSON por linha, com os campos de extra={...}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "quando": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+                      + f".{int(record.msecs):03d}",
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+            "request_id": getattr(record, "request_id", SEM_REQUISICAO),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_REGISTRO and chave not in dados:
+                dados[chave] = valor
+        if record.exc_info:
+            dados["excecao"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            dados["pilha"] = self.formatStack(record.stack_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+def _aplicar_niveis_modulos(niveis: str) -> None:
+    for item in niveis.split(","):
+        if "=" not in item:
+            continue
+        modulo, nivel = (parte.strip() for parte in item.split("=", 1))
+        if modulo and nivel:
+            logging.getLogger(modulo).setLevel(nivel.upper())
+
+
+def configurar_logs() -> None:
+    """
+    Direciona os logs para a fila e inicia a thread que os escreve
+
+    Chamada uma vez, no início de main.py (depois de carregar o .env);
+    substitui os handlers que já estiverem no logger raiz.
+    """
+    global _listener, _fila
+    with _trava:
+        if _listener is not None:
+            return
+        raiz = logging.getLogger()
+        saida = logging.StreamHandler(sys.stderr)
+        saida.setFormatter(FormatadorJson() if LOG_FORMATO == "json" else FormatadorTexto())
+
+        _fila = queue.Queue(maxsize=max(LOG_FILA_MAXIMA, 0))
+        entrada = QueueHandlerNaoBloqueante(_fila)
+        entrada.addFilter(FiltroContexto(LOG_AMOSTRA_DEBUG))
+
+        for handler in list(raiz.handlers):
+            raiz.removeHandler(handler)
+        raiz.addHandler(entrada)
+        # DEBUG de bibliotecas (asyncio, multipart) só com LOG_NIVEIS
+        raiz.setLevel(max(logging.getLevelName(LOG_NIVEL), logging.INFO))
+        for pacote in PACOTES_APLICACAO:
+            logging.getLogger(pacote).setLevel(LOG_NIVEL)
+        _aplicar_niveis_modulos(LOG_NIVEIS)
+
+        _listener = logging.handlers.QueueListener(_fila, saida, respect_handler_level=True)
+        _listener.start()
+    atexit.register(encerrar_logs)
+
+
+def encerrar_logs() -> None:
+    """Escreve o que ainda está na fila e para a thread (chamada na saída do processo)"""
+    global _listener
+    with _trava:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def estatisticas_logs() -> dict:
+    """Registros aguardando escrita e descartados por fila cheia"""
+    with _trava:
+        return {
+            "fila": _fila.qsize() if _fila is not None else 0,
+            "descartados": _descartados,
+        }
+
+
+class IdRequisicaoMiddleware:
+    """
+    Middleware ASGI que dá um id a cada requisição
+
+    Usa o X-Request-ID recebido (de um proxy, por exemplo) quando é
+    válido; senão gera um. O id fica em id_requisicao durante a
+    requisição e volta no cabeçalho X-Request-ID da resposta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recebido = None
+        for nome, valor in scope.get("headers", []):
+            if nome == CABECALHO_ID.encode():
+                recebido = valor.decode("latin-1")
+                break
+        atual = recebido if recebido and _ID_VALIDO.match(recebido) else uuid.uuid4().hex[:16]
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(CABECALHO_ID.encode(), atual.encode())]
+            await send(message)
+
+        token = id_requisicao.set(atual)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            id_requisicao.reset(token)
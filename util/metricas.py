@@ -0,0 +1,164 @@
+"""
+Métricas da aplicação no formato texto do Prometheus
+
+gerar_metricas_prometheus() junta em um único texto as métricas que cada
+parte da aplicação já mantém (requisições HTTP por rota, consultas SQL,
+pool de conexões, pool de senhas, fila de emails, fila de logs, cache de
+páginas e cache de catálogo). A rota
+/admin/metrics devolve esse texto; as rotas /admin/metricas/* continuam
+devolvendo o JSON de cada parte.
+
+Exemplo de saída:
+    # TYPE app_db_consulta_segundos_total counter
+    app_db_consulta_segundos_total{sql="SELECT ... FROM plano"} 0.0132
+"""
+import os
+from typing import Optional
+
+from util.cache_pagina import cache_paginas
+from util.cache_util import cache_catalogo
+from util.db_util import obter_pool
+from util.email_worker import email_worker
+from util.log_util import estatisticas_logs
+from util.metricas_db import obter_metricas_consultas
+from util.metricas_http import (
+    LIMITES_LATENCIA_SEGUNDOS, LIMITES_TAMANHO_BYTES, PERCENTIS, copiar_metricas_rotas, obter_em_andamento,
+)
+from util.security import obter_metricas_senha
+
+
+# Instruções SQL exportadas (as de maior tempo total)
+METRICAS_TOP_CONSULTAS = int(os.getenv("METRICAS_TOP_CONSULTAS", "50"))
+TAMANHO_MAXIMO_ROTULO = 200
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class TextoPrometheus:
+    """
+    Monta o texto de exposição do Prometheus, declarando cada métrica uma vez
+
+    Uso:
+        texto = TextoPrometheus()
+        texto.adicionar("app_pool_abertas", 3, ajuda="Conexões abertas")
+        texto.adicionar("app_requisicoes_total", 10, tipo="counter", rotulos={"rota": "/"})
+        print(texto.gerar())
+    """
+
+    def __init__(self):
+        self._metricas: dict[str, tuple[str, str, list[str]]] = {}
+
+    @staticmethod
+    def _amostra(nome: str, valor: float, rotulos: Optional[dict]) -> str:
+        texto_rotulos = ""
+        if rotulos:
+            pares = ",".join(f'{chave}="{_escapar(valor_rotulo)}"' for chave, valor_rotulo in rotulos.items())
+            texto_rotulos = "{" + pares + "}"
+        return f"{nome}{texto_rotulos} {float(valor):.10g}"
+
+    def adicionar(self, nome: str, valor: float, tipo: str = "gauge",
+                  ajuda: str = "", rotulos: Optional[dict] = None) -> None:
+        if nome not in self._metricas:
+            self._metricas[nome] = (tipo, ajuda, [])
+        self._metricas[nome][2].append(self._amostra(nome, valor, rotulos))
+
+    def adicionar_histograma(self, nome: str, acumulados: list, soma: float, contagem: int,
+                             ajuda: str = "", rotulos: Optional[dict] = None) -> None:
+        """
+        Adiciona um histograma (`<nome>_bucket`, `_sum` e `_count`)
+
+        Args:
+            acumulados: Pares (limite, amostras <= limite), em ordem crescente
+        """
+        if nome not in self._metricas:
+            self._metricas[nome] = ("histogram", ajuda, [])
+        amostras = self._metricas[nome][2]
+        rotulos = rotulos or {}
+        for limite, quantidade in acumulados:
+            amostras.append(self._amostra(f"{nome}_bucket", quantidade, {**rotulos, "le": f"{float(limite):.10g}"}))
+        amostras.append(self._amostra(f"{nome}_bucket", contagem, {**rotulos, "le": "+Inf"}))
+        amostras.append(self._amostra(f"{nome}_sum", soma, rotulos))
+        amostras.append(self._amostra(f"{nome}_count", contagem, rotulos))
+
+    def adicionar_dicionario(self, prefixo: str, dados: dict, rotulos: Optional[dict] = None) -> None:
+        """Adiciona cada valor numérico de um dicionário como gauge `<prefixo>_<chave>`"""
+        for chave, valor in dados.items():
+            if isinstance(valor, bool):
+                valor = int(valor)
+            if isinstance(valor, (int, float)):
+                self.adicionar(f"{prefixo}_{chave}", valor, rotulos=rotulos)
+
+    def gerar(self) -> str:
+        linhas = []
+        for nome, (tipo, ajuda, amostras) in self._metricas.items():
+            if ajuda:
+                linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            linhas.extend(amostras)
+        return "\n".join(linhas) + "\n"
+
+
+def _adicionar_consultas(texto: TextoPrometheus) -> None:
+    for consulta in obter_metricas_consultas(METRICAS_TOP_CONSULTAS):
+        rotulos = {"sql": consulta["sql"][:TAMANHO_MAXIMO_ROTULO]}
+        texto.adicionar("app_db_consulta_segundos_total", consulta["segundos"], "counter",
+                        "Tempo total (execução e leitura) por instrução SQL", rotulos)
+        texto.adicionar("app_db_consulta_chamadas_total", consulta["chamadas"], "counter",
+                        "Execuções por instrução SQL", rotulos)
+        texto.adicionar("app_db_consulta_linhas_total", consulta["linhas"], "counter",
+                        "Linhas lidas ou alteradas por instrução SQL", rotulos)
+        texto.adicionar("app_db_consulta_maximo_segundos", consulta["maximo_ms"] / 1000, "gauge",
+                        "Maior tempo de uma execução da instrução SQL", rotulos)
+
+
+def _adicionar_requisicoes(texto: TextoPrometheus) -> None:
+    em_andamento, maximo = obter_em_andamento()
+    texto.adicionar("app_http_em_andamento", em_andamento, ajuda="Requisições HTTP em andamento")
+    texto.adicionar("app_http_em_andamento_maximo", maximo, ajuda="Maior número de requisições simultâneas")
+    limites_us = tuple(limite * 1_000_000 for limite in LIMITES_LATENCIA_SEGUNDOS)
+    for rota, metricas in sorted(copiar_metricas_rotas().items()):
+        rotulos = {"rota": rota}
+        latencia = metricas.latencia_us
+        acumulados = [(limite, quantidade) for (_, quantidade), limite
+                      in zip(latencia.acumulado_ate(limites_us), LIMITES_LATENCIA_SEGUNDOS)]
+        texto.adicionar_histograma("app_http_duracao_segundos", acumulados, latencia.soma / 1_000_000,
+                                   latencia.contagem, "Duração das requisições por rota", rotulos)
+        for fracao in PERCENTIS:
+            texto.adicionar("app_http_duracao_percentil_segundos", latencia.percentil(fracao) / 1_000_000,
+                            ajuda="Percentis da duração (precisão de 1/16)",
+                            rotulos={**rotulos, "percentil": f"{fracao:g}"})
+        for status, quantidade in sorted(metricas.status.items()):
+            texto.adicionar("app_http_requisicoes_total", quantidade, "counter",
+                            "Requisições por rota e status", {**rotulos, "status": status})
+        texto.adicionar("app_http_db_segundos_total", metricas.db_segundos, "counter",
+                        "Tempo no banco (execução e leitura) por rota", rotulos)
+        texto.adicionar("app_http_render_segundos_total", metricas.render_segundos, "counter",
+                        "Tempo renderizando templates por rota", rotulos)
+        tamanho = metricas.tamanho_bytes
+        texto.adicionar_histograma("app_http_resposta_bytes", tamanho.acumulado_ate(LIMITES_TAMANHO_BYTES),
+                                   tamanho.soma, tamanho.contagem, "Tamanho do corpo das respostas", rotulos)
+
+
+def gerar_metricas_prometheus() -> str:
+    """
+    Texto com todas as métricas da aplicação (consulta o banco: rodar fora do loop)
+    """
+    texto = TextoPrometheus()
+    _adicionar_requisicoes(texto)
+    _adicionar_consultas(texto)
+    texto.adicionar_dicionario("app_db_pool", obter_pool().estatisticas())
+    texto.adicionar_dicionario("app_senha", obter_metricas_senha())
+
+    emails = email_worker.estatisticas()
+    texto.adicionar_dicionario("app_email", emails)
+    for status, quantidade in emails.get("fila", {}).items():
+        texto.adicionar("app_email_fila", quantidade, ajuda="Emails na fila por status", rotulos={"status": status})
+
+    texto.adicionar_dicionario("app_logs", estatisticas_logs())
+    texto.adicionar_dicionario("app_cache_paginas", cache_paginas.estatisticas())
+    for grupo, dados in cache_catalogo.estatisticas().items():
+        texto.adicionar_dicionario("app_cache_catalogo", dados, rotulos={"grupo": grupo})
+    return texto.gerar()
@@ -0,0 +1,336 @@
+"""
+Tempo das consultas SQL por instrução e log de consultas lentas
+
+As conexões do pool (util/db_util.py) são criadas com ConexaoInstrumentada,
+cujos cursores medem o tempo de cada instrução: a execução e também a
+leitura das linhas (fetchone/fetchmany/fetchall), onde o SQLite faz a
+maior parte do trabalho de um SELECT (linhas lidas iterando o cursor
+diretamente não entram no tempo). Para cada instrução (SQL com os
+espaços normalizados) ficam acumulados chamadas, tempo total e máximo,
+linhas e as rotas que a executaram.
+
+Uma execução acima de DB_CONSULTA_LENTA_MS gera um [AVISO] com o
+EXPLAIN QUERY PLAN e fica guardada entre as últimas consultas lentas.
+
+A rota de origem vem de escopo_requisicao, preenchido por
+RotaConsultasMiddleware (ou MetricasHttpMiddleware, de util/metricas_http.py)
+com o escopo ASGI da requisição; esse middleware também pode pedir o tempo
+de banco da requisição por tempos_db_requisicao.
+
+O profiler (util/profiler.py) amostra de outra thread e não enxerga as
+ContextVars: o escopo em andamento também é publicado por thread (threads
+do banco, util/db_async.py) e por tarefa asyncio (event loop, onde várias
+requisições se alternam), e escopo_da_thread() o encontra pelo id da
+thread amostrada.
+
+Configuração (.env):
+    DB_METRICAS            instrumenta as conexões (padrão: true)
+    DB_CONSULTA_LENTA_MS   limite para o log de consulta lenta (0 desativa)
+"""
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+DB_METRICAS = os.getenv("DB_METRICAS", "true").lower() == "true"
+DB_CONSULTA_LENTA_MS = float(os.getenv("DB_CONSULTA_LENTA_MS", "100"))
+# Instruções diferentes guardadas (as demais são somadas em uma entrada só)
+DB_METRICAS_MAXIMO = int(os.getenv("DB_METRICAS_MAXIMO", "1000"))
+CONSULTAS_LENTAS_GUARDADAS = 50
+
+INSTRUCOES_MEDIDAS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+SEM_ROTA = "(fora de requisição)"
+OUTRAS_INSTRUCOES = "(outras instruções)"
+
+_ESPACOS = re.compile(r"\s+")
+# Listas IN (?, ?, ...) de tamanhos diferentes contam como a mesma instrução
+_LISTA_PARAMETROS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+
+escopo_requisicao: ContextVar[Optional[dict]] = ContextVar("escopo_requisicao", default=None)
+# Lista que recebe o tempo de cada execução/leitura da requisição em andamento
+tempos_db_requisicao: ContextVar[Optional[list]] = ContextVar("tempos_db_requisicao", default=None)
+
+# Escopo em andamento por thread e por tarefa, e o event loop de cada thread
+# (operações simples de dict: o profiler lê sem trava)
+_escopos_por_thread: dict[int, dict] = {}
+_escopos_por_tarefa: dict[asyncio.Task, dict] = {}
+_loops_por_thread: dict[int, asyncio.AbstractEventLoop] = {}
+
+_trava = threading.Lock()
+_instrucoes: dict[str, dict] = {}
+_consultas_lentas: deque = deque(maxlen=CONSULTAS_LENTAS_GUARDADAS)
+_rotas_por_endpoint: dict = {}
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(sql: str) -> str:
+    """SQL em uma linha, com listas IN de qualquer tamanho como IN (?...)"""
+    return _LISTA_PARAMETROS.sub("IN (?...)", _ESPACOS.sub(" ", sql).strip())
+
+
+def publicar_escopo_thread(escopo: dict) -> None:
+    """Associa o escopo à thread atual até retirar_escopo_thread()"""
+    _escopos_por_thread[threading.get_ident()] = escopo
+
+
+def retirar_escopo_thread() -> None:
+    _escopos_por_thread.pop(threading.get_ident(), None)
+
+
+def publicar_escopo_tarefa(escopo: dict) -> Optional[asyncio.Task]:
+    """Associa o escopo à tarefa asyncio atual; devolve a tarefa para retirar_escopo_tarefa()"""
+    tarefa = asyncio.current_task()
+    if tarefa is not None:
+        _escopos_por_tarefa[tarefa] = escopo
+        _loops_por_thread[threading.get_ident()] = tarefa.get_loop()
+    return tarefa
+
+
+def retirar_escopo_tarefa(tarefa: Optional[asyncio.Task]) -> None:
+    if tarefa is not None:
+        _escopos_por_tarefa.pop(tarefa, None)
+
+
+def escopo_da_thread(ident: int) -> Optional[dict]:
+    """
+    Escopo da requisição que a thread está executando agora (ou None)
+
+    Pode ser chamada de outra thread: na thread de um event loop, a tarefa
+    em execução vem de asyncio.current_task(loop), que só consulta o
+    dicionário de tarefas correntes do asyncio.
+    """
+    escopo = _escopos_por_thread.get(ident)
+    if escopo is None:
+        loop = _loops_por_thread.get(ident)
+        if loop is not None:
+            tarefa = asyncio.current_task(loop)
+            if tarefa is not None:
+                escopo = _escopos_por_tarefa.get(tarefa)
+    return escopo
+
+
+def rota_do_escopo(escopo: Optional[dict]) -> str:
+    """
+    Modelo de caminho da rota (ex: "/personal/alunos/{aluno_id}") de um escopo ASGI
+
+    Antes do roteamento, ou para caminhos sem rota, devolve o método e o
+    caminho sem o modelo.
+    """
+    if escopo is None:
+        return SEM_ROTA
+    endpoint = escopo.get("endpoint")
+    app = escopo.get("app")
+    if endpoint is not None and app is not None:
+        rota = _rotas_por_endpoint.get(endpoint)
+        if rota is None:
+            for item in getattr(app, "routes", []):
+                # Rotas têm endpoint; montagens (/static) só o app
+                alvo = getattr(item, "endpoint", None) or getattr(item, "app", None)
+                if alvo is not None:
+                    _rotas_por_endpoint[alvo] = item.path
+            rota = _rotas_por_endpoint.get(endpoint)
+        if rota is not None:
+            return f"{escopo.get('method', '')} {rota}".strip()
+    if escopo.get("type") != "http":
+        return SEM_ROTA
+    # Sem modelo (404): não usa o caminho para não criar uma série por URL
+    return f"{escopo.get('method', '')} (sem rota)"
+
+
+def _registrar(sql: str, segundos: float, total_execucao: float, linhas: int, chamada: bool) -> None:
+    chave = normalizar_sql(sql)
+    rota = rota_do_escopo(escopo_requisicao.get())
+    tempos = tempos_db_requisicao.get()
+    if tempos is not None:
+        tempos.append(segundos)
+    with _trava:
+        dados = _instrucoes.get(chave)
+        if dados is None:
+            if len(_instrucoes) >= DB_METRICAS_MAXIMO:
+                chave = OUTRAS_INSTRUCOES
+                dados = _instrucoes.get(chave)
+            if dados is None:
+                dados = _instrucoes[chave] = {
+                    "chamadas": 0, "segundos": 0.0, "maximo_segundos": 0.0, "linhas": 0, "rotas": Counter(),
+                }
+        dados["segundos"] += segundos
+        dados["maximo_segundos"] = max(dados["maximo_segundos"], total_execucao)
+        dados["linhas"] += linhas
+        if chamada:
+            dados["chamadas"] += 1
+            dados["rotas"][rota] += 1
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que mede execução e leitura de cada instrução"""
+
+    _sql: Optional[str] = None
+    _parametros = ()
+    _segundos = 0.0
+    _lenta_registrada = False
+
+    def _medir(self, inicio: float, linhas: int, chamada: bool) -> None:
+        if self._sql is None:
+            return
+        segundos = time.perf_counter() - inicio
+        self._segundos += segundos
+        _registrar(self._sql, segundos, self._segundos, linhas, chamada)
+        if (DB_CONSULTA_LENTA_MS and not self._lenta_registrada
+                and self._segundos * 1000 >= DB_CONSULTA_LENTA_MS):
+            self._lenta_registrada = True
+            _registrar_lenta(self.connection, self._sql, self._parametros, self._segundos)
+
+    def execute(self, sql, parametros=()):
+        medir = sql.lstrip()[:7].upper().startswith(INSTRUCOES_MEDIDAS)
+        self._sql = sql if medir else None
+        self._parametros = parametros
+        self._segundos = 0.0
+        self._lenta_registrada = False
+        inicio = time.perf_counter()
+        resultado = super().execute(sql, parametros)
+        self._medir(inicio, max(self.rowcount, 0), True)
+        return resultado
+
+    def executemany(self, sql, sequencia):
+        medir = sql.lstrip()[:7].upper().startswith(INSTRUCOES_MEDIDAS)
+        # Sem EXPLAIN para executemany: os parâmetros já foram consumidos
+        self._sql = sql if medir else None
+        self._parametros = None
+        self._segundos = 0.0
+        self._lenta_registrada = False
+        inicio = time.perf_counter()
+        resultado = super().executemany(sql, sequencia)
+        self._medir(inicio, max(self.rowcount, 0), True)
+        return resultado
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        linha = super().fetchone()
+        self._medir(inicio, 0 if linha is None else 1, False)
+        return linha
+
+    def fetchmany(self, size=None):
+        inicio = time.perf_counter()
+        linhas = super().fetchmany(self.arraysize if size is None else size)
+        self._medir(inicio, len(linhas), False)
+        return linhas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        linhas = super().fetchall()
+        self._medir(inicio, len(linhas), False)
+        return linhas
+
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de conn.execute) são instrumentados"""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self.cursor().executemany(sql, sequencia)
+
+
+def _registrar_lenta(conn: sqlite3.Connection, sql: str, parametros, segundos: float) -> None:
+    """Guarda e avisa uma consulta lenta, com o plano do SQLite"""
+    plano = []
+    if parametros is not None:
+        try:
+            # Cursor comum: o EXPLAIN não entra nas métricas
+            cursor = sqlite3.Cursor(conn)
+            plano = [linha[3] for linha in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros).fetchall()]
+            cursor.close()
+        except sqlite3.Error as e:
+            plano = [f"(EXPLAIN falhou: {e})"]
+    rota = rota_do_escopo(escopo_requisicao.get())
+    sql_normalizado = normalizar_sql(sql)
+    with _trava:
+        _consultas_lentas.append({
+            "sql": sql_normalizado,
+            "rota": rota,
+            "milissegundos": round(segundos * 1000, 1),
+            "plano": plano,
+            "quando": time.time(),
+        })
+    detalhes = "".join(f"\n    {passo}" for passo in plano)
+    logger.warning("Consulta lenta (%.1f ms, %s): %s%s", segundos * 1000, rota, sql_normalizado, detalhes)
+
+
+def obter_metricas_consultas(limite: int = 20) -> list[dict]:
+    """
+    Instruções com maior tempo total
+
+    Args:
+        limite: Quantidade de instruções devolvidas
+
+    Returns:
+        Lista ordenada por tempo total, com chamadas, tempos, linhas e as
+        rotas que mais executaram cada instrução
+    """
+    with _trava:
+        itens = sorted(_instrucoes.items(), key=lambda item: item[1]["segundos"], reverse=True)[:limite]
+        return [
+            {
+                "sql": sql,
+                "chamadas": dados["chamadas"],
+                "segundos": dados["segundos"],
+                "media_ms": dados["segundos"] * 1000 / dados["chamadas"] if dados["chamadas"] else 0.0,
+                "maximo_ms": dados["maximo_segundos"] * 1000,
+                "linhas": dados["linhas"],
+                "rotas": dict(dados["rotas"].most_common(5)),
+            }
+            for sql, dados in itens
+        ]
+
+
+def obter_consultas_lentas() -> list[dict]:
+    """Últimas consultas lentas, da mais recente para a mais antiga"""
+    with _trava:
+        return list(reversed(_consultas_lentas))
+
+
+def zerar_metricas_consultas() -> None:
+    """Descarta os contadores e as consultas lentas guardadas"""
+    with _trava:
+        _instrucoes.clear()
+        _consultas_lentas.clear()
+
+
+class RotaConsultasMiddleware:
+    """
+    Middleware ASGI que associa as consultas à requisição em andamento
+
+    Guarda o escopo ASGI em escopo_requisicao; depois do roteamento o
+    Starlette preenche o endpoint no mesmo dicionário, e as métricas usam
+    o modelo de caminho da rota.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = escopo_requisicao.set(scope)
+        tarefa = publicar_escopo_tarefa(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            retirar_escopo_tarefa(tarefa)
+            escopo_requisicao.reset(token)
@@ -0,0 +1,264 @@
+"""
+Latência, status, tamanho e concorrência das requisições HTTP por rota
+
+MetricasHttpMiddleware mede cada requisição da chegada até o último
+pedaço do corpo da resposta e acumula, por modelo de caminho da rota
+(ex: "GET /personal/alunos/{aluno_id}"):
+
+- histograma de latência log-linear (estilo HDR: 16 baldes por potência
+  de 2, erro relativo de no máximo 1/16), de onde saem p50/p95/p99;
+- requisições por status e histograma do tamanho das respostas;
+- tempo no banco (somado pelas conexões de util/metricas_db.py) e tempo
+  renderizando templates (TemplateMedido de util/template_util.py).
+
+Também mantém o número de requisições em andamento e preenche
+escopo_requisicao, que associa as consultas SQL à rota (substitui
+RotaConsultasMiddleware quando está ativo).
+
+Configuração (.env):
+    METRICAS_HTTP   ativa o middleware (padrão: true)
+"""
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from util.metricas_db import (
+    escopo_requisicao, publicar_escopo_tarefa, retirar_escopo_tarefa, rota_do_escopo, tempos_db_requisicao,
+)
+
+
+METRICAS_HTTP = os.getenv("METRICAS_HTTP", "true").lower() == "true"
+
+# Limites (le) exportados no formato histogram do Prometheus
+LIMITES_LATENCIA_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_TAMANHO_BYTES = (1024, 4096, 16384, 65536, 262144, 1048576)
+PERCENTIS = (0.5, 0.95, 0.99)
+
+_BITS_PRECISAO = 5
+_SUBBALDES = 1 << (_BITS_PRECISAO - 1)
+
+
+class Histograma:
+    """
+    Histograma de inteiros não negativos com precisão relativa constante
+
+    Valores abaixo de 32 têm um balde cada; acima, cada potência de 2 é
+    dividida em 16 baldes. Não é thread-safe: o chamador sincroniza.
+    """
+
+    __slots__ = ("baldes", "contagem", "soma", "maximo")
+
+    def __init__(self):
+        self.baldes: dict[int, int] = {}
+        self.contagem = 0
+        self.soma = 0
+        self.maximo = 0
+
+    @staticmethod
+    def _indice(valor: int) -> int:
+        if valor < 2 * _SUBBALDES:
+            return valor
+        expoente = valor.bit_length() - _BITS_PRECISAO
+        return expoente * _SUBBALDES + (valor >> expoente)
+
+    @staticmethod
+    def _limite_superior(indice: int) -> int:
+        if indice < 2 * _SUBBALDES:
+            return indice
+        expoente = indice // _SUBBALDES - 1
+        mantissa = indice % _SUBBALDES + _SUBBALDES
+        return ((mantissa + 1) << expoente) - 1
+
+    def registrar(self, valor: int) -> None:
+        valor = max(int(valor), 0)
+        indice = self._indice(valor)
+        self.baldes[indice] = self.baldes.get(indice, 0) + 1
+        self.contagem += 1
+        self.soma += valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, fracao: float) -> int:
+        """Menor valor que cobre a fração pedida das amostras (limite superior do balde)"""
+        if not self.contagem:
+            return 0
+        alvo = fracao * self.contagem
+        acumulado = 0
+        for indice in sorted(self.baldes):
+            acumulado += self.baldes[indice]
+            if acumulado >= alvo:
+                return min(self._limite_superior(indice), self.maximo)
+        return self.maximo
+
+    def acumulado_ate(self, limites: tuple) -> list[tuple[float, int]]:
+        """Contagem acumulada de amostras <= cada limite (aproximada pela precisão dos baldes)"""
+        itens = sorted(self.baldes.items())
+        resultado = []
+        posicao = acumulado = 0
+        for limite in limites:
+            while posicao < len(itens) and self._limite_superior(itens[posicao][0]) <= limite:
+                acumulado += itens[posicao][1]
+                posicao += 1
+            resultado.append((limite, acumulado))
+        return resultado
+
+
+class MetricasRota:
+    """Acumulado das requisições de uma rota"""
+
+    __slots__ = ("latencia_us", "tamanho_bytes", "status", "db_segundos", "render_segundos")
+
+    def __init__(self):
+        self.latencia_us = Histograma()
+        self.tamanho_bytes = Histograma()
+        self.status: Counter = Counter()
+        self.db_segundos = 0.0
+        self.render_segundos = 0.0
+
+
+class MedicaoRequisicao:
+    """Tempo de renderização de templates da requisição em andamento"""
+
+    __slots__ = ("render_segundos",)
+
+    def __init__(self):
+        self.render_segundos = 0.0
+
+
+medicao_requisicao: ContextVar[Optional[MedicaoRequisicao]] = ContextVar("medicao_requisicao", default=None)
+
+_trava = threading.Lock()
+_rotas: dict[str, MetricasRota] = {}
+_em_andamento = 0
+_maximo_em_andamento = 0
+
+
+def registrar_render(segundos: float) -> None:
+    """Soma o tempo de uma renderização de template à requisição em andamento"""
+    medicao = medicao_requisicao.get()
+    if medicao is not None:
+        medicao.render_segundos += segundos
+
+
+def _registrar(rota: str, status: int, segundos: float, tamanho: int,
+               db_segundos: float, render_segundos: float) -> None:
+    with _trava:
+        metricas = _rotas.get(rota)
+        if metricas is None:
+            metricas = _rotas[rota] = MetricasRota()
+        metricas.latencia_us.registrar(segundos * 1_000_000)
+        metricas.tamanho_bytes.registrar(tamanho)
+        metricas.status[status] += 1
+        metricas.db_segundos += db_segundos
+        metricas.render_segundos += render_segundos
+
+
+class MetricasHttpMiddleware:
+    """
+    Middleware ASGI que mede as requisições HTTP por rota
+
+    O modelo de caminho só é conhecido depois do roteamento (o Starlette
+    preenche o endpoint no escopo), então a rota é lida ao final.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _em_andamento, _maximo_em_andamento
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        tamanho = 0
+        tempos_db: list[float] = []
+        medicao = MedicaoRequisicao()
+
+        async def enviar(mensagem):
+            nonlocal status, tamanho
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            elif mensagem["type"] == "http.response.body":
+                tamanho += len(mensagem.get("body", b""))
+            await send(mensagem)
+
+        tokens = (
+            escopo_requisicao.set(scope),
+            tempos_db_requisicao.set(tempos_db),
+            medicao_requisicao.set(medicao),
+        )
+        tarefa = publicar_escopo_tarefa(scope)
+        with _trava:
+            _em_andamento += 1
+            _maximo_em_andamento = max(_maximo_em_andamento, _em_andamento)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            segundos = time.perf_counter() - inicio
+            retirar_escopo_tarefa(tarefa)
+            with _trava:
+                _em_andamento -= 1
+            medicao_requisicao.reset(tokens[2])
+            tempos_db_requisicao.reset(tokens[1])
+            escopo_requisicao.reset(tokens[0])
+            _registrar(rota_do_escopo(scope), status, segundos, tamanho, sum(tempos_db), medicao.render_segundos)
+
+
+def obter_metricas_requisicoes() -> dict:
+    """
+    Requisições em andamento e, por rota, contagem, percentis de latência,
+    status, tempo médio no banco e renderizando, e tamanho das respostas
+    """
+    rotas = {}
+    for rota, metricas in sorted(copiar_metricas_rotas().items()):
+        latencia = metricas.latencia_us
+        quantidade = latencia.contagem or 1
+        rotas[rota] = {
+            "requisicoes": latencia.contagem,
+            "status": dict(metricas.status),
+            **{f"p{int(fracao * 100)}_ms": latencia.percentil(fracao) / 1000 for fracao in PERCENTIS},
+            "media_ms": round(latencia.soma / quantidade / 1000, 3),
+            "maximo_ms": latencia.maximo / 1000,
+            "db_media_ms": round(metricas.db_segundos * 1000 / quantidade, 3),
+            "render_media_ms": round(metricas.render_segundos * 1000 / quantidade, 3),
+            "bytes_media": round(metricas.tamanho_bytes.soma / quantidade),
+            "bytes_maximo": metricas.tamanho_bytes.maximo,
+        }
+    em_andamento, maximo = obter_em_andamento()
+    return {"em_andamento": em_andamento, "maximo_em_andamento": maximo, "rotas": rotas}
+
+
+def copiar_metricas_rotas() -> dict[str, MetricasRota]:
+    """Cópia do acumulado por rota (para exportação sem segurar a trava)"""
+    copia = {}
+    with _trava:
+        for rota, metricas in _rotas.items():
+            nova = MetricasRota()
+            for origem, destino in ((metricas.latencia_us, nova.latencia_us),
+                                    (metricas.tamanho_bytes, nova.tamanho_bytes)):
+                destino.baldes = dict(origem.baldes)
+                destino.contagem, destino.soma, destino.maximo = origem.contagem, origem.soma, origem.maximo
+            nova.status = Counter(metricas.status)
+            nova.db_segundos = metricas.db_segundos
+            nova.render_segundos = metricas.render_segundos
+            copia[rota] = nova
+    return copia
+
+
+def obter_em_andamento() -> tuple[int, int]:
+    """Requisições em andamento agora e o maior valor já observado"""
+    with _trava:
+        return _em_andamento, _maximo_em_andamento
+
+
+def zerar_metricas_requisicoes() -> None:
+    """Descarta o acumulado por rota"""
+    global _maximo_em_andamento
+    with _trava:
+        _rotas.clear()
+        _maximo_em_andamento = _em_andamento
@@ -0,0 +1,214 @@
+"""
+Migrações versionadas do banco SQLite
+
+Cada migração tem um número de versão, uma descrição e uma lista de
+instruções (tabela, SQL). A versão aplicada fica registrada na tabela
+schema_version, e aplicar_migracoes() executa, em ordem e cada uma na sua
+transação, só as migrações com versão maior que a registrada.
+
+Instruções cuja tabela ainda não existe no banco são adiadas (com aviso):
+ficam na tabela migracao_pendente e rodam na primeira execução em que a
+tabela existir, mesmo com a versão da migração já registrada. Por isso
+instruções com tabela devem ser idempotentes (CREATE INDEX IF NOT
+EXISTS). Instruções com tabela None (ex: CREATE TABLE) sempre rodam.
+
+verificar_planos_consulta() roda EXPLAIN QUERY PLAN nas consultas mais
+usadas pelas rotas e aponta as que fazem SCAN de tabela.
+
+Uso pela linha de comando (aplica e verifica, sai com erro se houver SCAN):
+    python -m util.migracoes
+"""
+import logging
+import sqlite3
+import sys
+
+from data.sql.migracao_sql import *
+from data.sql import (
+    avaliacao_fisica_sql, cache_versao_sql, email_saida_sql, estatisticas_sql, exercicio_sessao_sql,
+    nutricionista_sql, personal_aluno_sql, personal_sql, plano_sql, profissional_sql, progresso_aluno_sql,
+    sessao_sql, sessao_treino_sql, treino_personalizado, usuario_sql,
+)
+from util.db_util import get_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+MIGRACOES = [
+    (1, "Índices secundários de chaves estrangeiras e filtros", INDICES_SECUNDARIOS),
+    (2, "Fila de emails (outbox)", [
+        (None, email_saida_sql.CRIAR_TABELA_EMAIL_SAIDA),
+        (None, email_saida_sql.CRIAR_INDICE_EMAIL_SAIDA_FILA),
+    ]),
+    (3, "Versões do cache de catálogo (plano, dieta, artigo)", [
+        (None, cache_versao_sql.CRIAR_TABELA_CACHE_VERSAO),
+        (None, cache_versao_sql.INSERIR_GRUPOS_CACHE_VERSAO),
+    ]),
+    (4, "Sessões de login no servidor", [
+        (None, sessao_sql.CRIAR_TABELA_SESSAO),
+        (None, sessao_sql.CRIAR_INDICE_SESSAO_USUARIO),
+        (None, sessao_sql.CRIAR_INDICE_SESSAO_EXPIRA),
+    ]),
+    (5, "Versão do cache do contexto do profissional", [
+        (None, cache_versao_sql.INSERIR_GRUPO_PROFISSIONAL_CACHE_VERSAO),
+    ]),
+    (6, "Texto dos emails enviados ou com falha definitiva apagado", [
+        ("email_saida", email_saida_sql.APAGAR_MENSAGENS_FINALIZADAS_EMAIL_SAIDA),
+    ]),
+]
+
+# Consultas executadas a cada requisição das rotas: (nome, SQL, parâmetros de exemplo)
+CONSULTAS_QUENTES = [
+    ("usuario.obter_por_email", usuario_sql.OBTER_POR_EMAIL, ("a@a.com",)),
+    ("usuario.obter_todos_por_perfil", usuario_sql.OBTER_TODOS_POR_PERFIL, ("cliente",)),
+    ("usuario.obter_pagina", usuario_sql.OBTER_PAGINA_USUARIO, ("", 0, 51)),
+    ("usuario.obter_pagina_por_perfil", usuario_sql.OBTER_PAGINA_USUARIO_POR_PERFIL, ("cliente", "", 0, 51)),
+    ("profissional.obter_pendentes", profissional_sql.OBTER_PENDENTES, ()),
+    ("profissional.obter_pagina_com_status", profissional_sql.OBTER_PAGINA_COM_STATUS, ("", 0, 51)),
+    ("profissional.obter_pagina_com_status_por_status",
+     profissional_sql.OBTER_PAGINA_COM_STATUS_POR_STATUS, ("aprovado", "", 0, 51)),
+    ("profissional.obter_pendentes_recentes", profissional_sql.OBTER_PENDENTES_RECENTES, (5,)),
+    ("plano.obter_todos", plano_sql.OBTER_TODOS_PLANO, ()),
+    ("personal.obter_por_profissional", personal_sql.OBTER_POR_PROFISSIONAL, (1,)),
+    ("personal_aluno.obter_alunos_por_personal", personal_aluno_sql.OBTER_ALUNOS_POR_PERSONAL, (1,)),
+    ("personal_aluno.obter_alunos_detalhados_por_personal",
+     personal_aluno_sql.OBTER_ALUNOS_DETALHADOS_POR_PERSONAL, (1,)),
+    ("treino_personalizado.obter_por_aluno", treino_personalizado.OBTER_POR_ALUNO, (1,)),
+    ("treino_personalizado.obter_por_personal", treino_personalizado.OBTER_TREINOS_POR_PERSONAL, (1,)),
+    ("avaliacao_fisica.obter_por_aluno", avaliacao_fisica_sql.OBTER_POR_ALUNO, (1,)),
+    ("avaliacao_fisica.obter_por_personal", avaliacao_fisica_sql.OBTER_AVALIACOES_POR_PERSONAL, (1,)),
+    ("progresso_aluno.obter_por_aluno", progresso_aluno_sql.OBTER_POR_ALUNO, (1,)),
+    ("progresso_aluno.obter_por_personal", progresso_aluno_sql.OBTER_PROGRESSOS_POR_PERSONAL, (1,)),
+    ("estatisticas.dashboard_personal", estatisticas_sql.ESTATISTICAS_DASHBOARD_PERSONAL, (1, 1, 1)),
+    ("sessao_treino.obter_por_treino", sessao_treino_sql.OBTER_POR_TREINO, (1,)),
+    ("exercicio_sessao.obter_por_sessao", exercicio_sessao_sql.OBTER_POR_SESSAO, (1,)),
+    ("nutricionista.obter_por_profissional", nutricionista_sql.OBTER_POR_PROFISSIONAL, (1,)),
+    ("email_saida.reservar_lote", email_saida_sql.RESERVAR_LOTE_EMAIL_SAIDA, ("+300 seconds", 20)),
+    ("sessao.obter_com_usuario", sessao_sql.OBTER_SESSAO_COM_USUARIO, ("x",)),
+]
+
+
+def _tabela_existe(conn: sqlite3.Connection, tabela: str) -> bool:
+    return conn.execute(TABELA_EXISTE, (tabela,)).fetchone() is not None
+
+
+def obter_versao_atual() -> int:
+    """Retorna a última versão de migração aplicada (0 se nenhuma)"""
+    with get_connection() as conn:
+        conn.execute(CRIAR_TABELA_SCHEMA_VERSION)
+        return conn.execute(OBTER_VERSAO_ATUAL).fetchone()["versao"]
+
+
+def _executar_instrucoes(conn: sqlite3.Connection, versao: int, instrucoes: list) -> None:
+    for tabela, sql in instrucoes:
+        if tabela is not None and not _tabela_existe(conn, tabela):
+            logger.warning("Migração %s: tabela '%s' não existe, instrução adiada", versao, tabela)
+            conn.execute(REGISTRAR_PENDENTE, (versao, tabela, sql))
+            continue
+        conn.execute(sql)
+
+
+def _aplicar_pendentes(conn: sqlite3.Connection) -> None:
+    """Executa as instruções adiadas cuja tabela já existe (chamar dentro da transação)"""
+    if not _tabela_existe(conn, "migracao_pendente"):
+        conn.execute(CRIAR_TABELA_MIGRACAO_PENDENTE)
+        # Banco migrado antes do registro de pendentes: não se sabe o que foi
+        # pulado, então as instruções com tabela das versões aplicadas rodam de novo
+        versao_atual = conn.execute(OBTER_VERSAO_ATUAL).fetchone()["versao"]
+        for versao, _, instrucoes in sorted(MIGRACOES, key=lambda m: m[0]):
+            if versao <= versao_atual:
+                _executar_instrucoes(conn, versao, [(t, sql) for t, sql in instrucoes if t is not None])
+
+    for pendente in conn.execute(OBTER_PENDENTES).fetchall():
+        if _tabela_existe(conn, pendente["tabela"]):
+            conn.execute(pendente["instrucao"])
+            conn.execute(REMOVER_PENDENTE, (pendente["id"],))
+            logger.info("Migração %s: instrução adiada aplicada em '%s'", pendente["versao"], pendente["tabela"])
+
+
+def obter_pendentes() -> list[tuple[int, str]]:
+    """(versão, tabela) das instruções ainda adiadas por falta da tabela"""
+    with get_connection() as conn:
+        if not _tabela_existe(conn, "migracao_pendente"):
+            return []
+        return [(linha["versao"], linha["tabela"]) for linha in conn.execute(OBTER_PENDENTES)]
+
+
+def aplicar_migracoes() -> list[int]:
+    """
+    Aplica as migrações pendentes, em ordem de versão, e as instruções
+    adiadas de migrações anteriores cuja tabela passou a existir
+
+    Returns:
+        Lista das versões aplicadas nesta execução
+    """
+    aplicadas = []
+    versao_atual = obter_versao_atual()
+
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        _aplicar_pendentes(conn)
+
+    for versao, descricao, instrucoes in sorted(MIGRACOES, key=lambda m: m[0]):
+        if versao <= versao_atual:
+            continue
+
+        with get_connection() as conn:
+            # BEGIN IMMEDIATE serializa workers iniciando juntos; quem esperar
+            # a trava relê a versão e não reaplica a migração
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute(OBTER_VERSAO_ATUAL).fetchone()["versao"] >= versao:
+                continue
+            _executar_instrucoes(conn, versao, instrucoes)
+            conn.execute(REGISTRAR_VERSAO, (versao, descricao))
+
+        logger.info("Migração %s aplicada: %s", versao, descricao)
+        aplicadas.append(versao)
+
+    return aplicadas
+
+
+def verificar_planos_consulta() -> list[str]:
+    """
+    Roda EXPLAIN QUERY PLAN nas consultas de CONSULTAS_QUENTES
+
+    Consultas sobre tabelas que não existem no banco são ignoradas.
+
+    Returns:
+        Lista de problemas no formato "consulta: detalhe do plano" para cada
+        passo que faz SCAN (vazia se todas usam índice)
+    """
+    problemas = []
+    with get_connection() as conn:
+        for nome, sql, parametros in CONSULTAS_QUENTES:
+            try:
+                plano = conn.execute(f"EXPLAIN QUERY PLAN {sql}", parametros).fetchall()
+            except sqlite3.OperationalError as e:
+                if "no such table" in str(e):
+                    continue
+                raise
+            for linha in plano:
+                detalhe = linha["detail"]
+                if detalhe.startswith("SCAN"):
+                    problemas.append(f"{nome}: {detalhe}")
+    return problemas
+
+
+def main():
+    aplicadas = aplicar_migracoes()
+    print(f"Versão do schema: {obter_versao_atual()} (aplicadas agora: {aplicadas or 'nenhuma'})")
+    pendentes = obter_pendentes()
+    if pendentes:
+        tabelas = sorted({tabela for _, tabela in pendentes})
+        print(f"{len(pendentes)} instruções adiadas até as tabelas existirem: {', '.join(tabelas)}")
+
+    problemas = verificar_planos_consulta()
+    for problema in problemas:
+        print(f"[SCAN] {problema}")
+    if problemas:
+        sys.exit(1)
+    print(f"Planos de consulta OK ({len(CONSULTAS_QUENTES)} consultas verificadas)")
+
+
+if __name__ == "__main__":
+    main()
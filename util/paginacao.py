@@ -0,0 +1,64 @@
+"""
+Paginação por cursor (keyset)
+
+As listagens grandes são ordenadas por (nome, id) e cada página começa
+depois do último item da anterior: WHERE (nome, id) > (?, ?) LIMIT ?.
+Assim a consulta usa o índice de nome e custa o mesmo em qualquer página,
+ao contrário de OFFSET, que percorre todas as linhas puladas.
+
+Exemplo de uso:
+    pagina = usuario_repo.obter_pagina(perfil="cliente", tamanho=50)
+    for usuario in pagina.itens:
+        ...
+    if pagina.tem_proxima:
+        proxima = usuario_repo.obter_pagina(
+            perfil="cliente", apos_nome=pagina.proximo_nome, apos_id=pagina.proximo_id
+        )
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+TAMANHO_PAGINA_PADRAO = 50
+TAMANHO_PAGINA_MAXIMO = 100
+
+
+@dataclass
+class Pagina:
+    itens: list
+    tamanho: int
+    proximo_nome: Optional[str] = None
+    proximo_id: Optional[int] = None
+
+    @property
+    def tem_proxima(self) -> bool:
+        return self.proximo_id is not None
+
+
+def limitar_tamanho(tamanho: Optional[int]) -> int:
+    """Garante um tamanho de página entre 1 e TAMANHO_PAGINA_MAXIMO"""
+    if not tamanho or tamanho < 1:
+        return TAMANHO_PAGINA_PADRAO
+    return min(tamanho, TAMANHO_PAGINA_MAXIMO)
+
+
+def montar_pagina(itens: list, tamanho: int, chave: Callable[[Any], tuple]) -> Pagina:
+    """
+    Monta a página a partir de uma consulta feita com LIMIT tamanho + 1
+
+    A linha a mais só indica que existe próxima página; ela é descartada e
+    o cursor aponta para o último item exibido.
+
+    Args:
+        itens: Linhas retornadas (até tamanho + 1)
+        tamanho: Tamanho da página
+        chave: Função que extrai (nome, id) de um item
+
+    Returns:
+        Pagina com no máximo `tamanho` itens
+    """
+    if len(itens) <= tamanho:
+        return Pagina(itens=itens, tamanho=tamanho)
+    itens = itens[:tamanho]
+    proximo_nome, proximo_id = chave(itens[-1])
+    return Pagina(itens=itens, tamanho=tamanho, proximo_nome=proximo_nome, proximo_id=proximo_id)
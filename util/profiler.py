@@ -0,0 +1,195 @@
+"""
+Profiler por amostragem para capturar o caminho quente no servidor em produção
+
+perfilar() lê, a intervalos fixos, a pilha de todas as threads do
+processo (sys._current_frames) e conta as pilhas iguais. O resultado sai
+no formato "collapsed" (uma pilha por linha, frames separados por ";" e a
+contagem no fim), aceito por flamegraph.pl, speedscope e inferno:
+
+    MainThread;GET /admin;run (asyncio/runners.py:118);...;admin_dashboard (routes/...:40) 12
+
+Cada pilha começa pelo nome da thread e, quando a amostra pertence a uma
+requisição, pela rota. A rota vem do escopo ASGI que os middlewares de
+métricas (thread do event loop, por tarefa) e util/db_async.py (threads
+do banco) publicam em util/metricas_db.py; a amostra o encontra pelo id
+da thread, sem ler variáveis dos frames.
+
+Só um perfil roda por vez, a duração é limitada e nada é medido fora dele:
+fica ativo em produção sem custo. Disparo:
+- rota /admin/profiler (só admin), que devolve o arquivo;
+- sinal SIGUSR2 no processo do worker (kill -USR2 <pid>), que grava o
+  arquivo em PROFILER_DIRETORIO.
+
+Configuração (.env):
+    PROFILER                 ativa a rota e o sinal (padrão: true)
+    PROFILER_INTERVALO_MS    intervalo entre amostras (padrão: 10)
+    PROFILER_MAXIMO_SEGUNDOS duração máxima de um perfil (padrão: 60)
+    PROFILER_SINAL_SEGUNDOS  duração do perfil disparado pelo sinal (padrão: 30)
+    PROFILER_DIRETORIO       pasta dos perfis gravados pelo sinal
+"""
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from util.metricas_db import escopo_da_thread, rota_do_escopo
+
+
+logger = logging.getLogger(__name__)
+
+
+PROFILER = os.getenv("PROFILER", "true").lower() == "true"
+PROFILER_INTERVALO_MS = float(os.getenv("PROFILER_INTERVALO_MS", "10"))
+PROFILER_MAXIMO_SEGUNDOS = float(os.getenv("PROFILER_MAXIMO_SEGUNDOS", "60"))
+PROFILER_SINAL_SEGUNDOS = float(os.getenv("PROFILER_SINAL_SEGUNDOS", "30"))
+PROFILER_DIRETORIO = os.getenv("PROFILER_DIRETORIO", ".cache/perfis")
+
+INTERVALO_MINIMO_MS = 1
+PROFUNDIDADE_MAXIMA = 200
+
+_trava_perfil = threading.Lock()
+_rotulos: dict = {}
+_raiz = os.getcwd() + os.sep
+
+
+class ProfilerOcupadoError(Exception):
+    """Já existe um perfil em andamento neste processo"""
+
+
+@dataclass
+class ResultadoPerfil:
+    pilhas: Counter = field(default_factory=Counter)
+    amostras: int = 0
+    segundos: float = 0.0
+    intervalo_ms: float = PROFILER_INTERVALO_MS
+    rota: Optional[str] = None
+
+    def texto(self) -> str:
+        """Pilhas no formato collapsed, da mais frequente para a menos"""
+        return "".join(f"{pilha} {quantidade}\n" for pilha, quantidade in self.pilhas.most_common())
+
+
+def _rotulo(codigo) -> str:
+    rotulo = _rotulos.get(codigo)
+    if rotulo is None:
+        arquivo = codigo.co_filename
+        if arquivo.startswith(_raiz):
+            arquivo = arquivo[len(_raiz):]
+        else:
+            # Bibliotecas: só pacote/arquivo
+            arquivo = os.sep.join(arquivo.split(os.sep)[-2:])
+        nome = getattr(codigo, "co_qualname", codigo.co_name)
+        rotulo = _rotulos[codigo] = f"{nome} ({arquivo}:{codigo.co_firstlineno})".replace(";", ",")
+    return rotulo
+
+
+def _pilha(frame) -> list[str]:
+    """Rótulos da pilha, da base para o topo"""
+    rotulos = []
+    while frame is not None and len(rotulos) < PROFUNDIDADE_MAXIMA:
+        rotulos.append(_rotulo(frame.f_code))
+        frame = frame.f_back
+    rotulos.reverse()
+    return rotulos
+
+
+def _rota_da_thread(ident: int) -> Optional[str]:
+    """Rota da requisição que a thread executa agora, se houver"""
+    escopo = escopo_da_thread(ident)
+    return rota_do_escopo(escopo) if escopo is not None else None
+
+
+def _rota_confere(rota_amostra: Optional[str], filtro: str) -> bool:
+    if rota_amostra is None:
+        return False
+    return rota_amostra == filtro or rota_amostra.split(" ", 1)[-1] == filtro
+
+
+def perfilar(segundos: float, intervalo_ms: float = PROFILER_INTERVALO_MS,
+             rota: Optional[str] = None) -> ResultadoPerfil:
+    """
+    Amostra as pilhas de todas as threads durante alguns segundos (bloqueia a thread atual)
+
+    Args:
+        segundos: Duração (limitada a PROFILER_MAXIMO_SEGUNDOS)
+        intervalo_ms: Intervalo entre amostras
+        rota: Só guarda amostras desta rota ("/personal/progressos/{id}" ou "GET /admin")
+
+    Raises:
+        ProfilerOcupadoError: Outro perfil está em andamento
+    """
+    if not _trava_perfil.acquire(blocking=False):
+        raise ProfilerOcupadoError("Já existe um perfil em andamento")
+    try:
+        segundos = min(max(segundos, 0.1), PROFILER_MAXIMO_SEGUNDOS)
+        intervalo = max(intervalo_ms, INTERVALO_MINIMO_MS) / 1000
+        resultado = ResultadoPerfil(intervalo_ms=intervalo * 1000, rota=rota)
+        propria = threading.get_ident()
+        inicio = time.perf_counter()
+        fim = inicio + segundos
+        proxima = inicio
+        while True:
+            nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == propria:
+                    continue
+                rota_amostra = _rota_da_thread(ident)
+                if rota is not None and not _rota_confere(rota_amostra, rota):
+                    continue
+                rotulos = _pilha(frame)
+                prefixo = [nomes.get(ident, str(ident))]
+                if rota_amostra is not None:
+                    prefixo.append(rota_amostra.replace(";", ","))
+                resultado.pilhas[";".join(prefixo + rotulos)] += 1
+            frame = None
+            resultado.amostras += 1
+            proxima += intervalo
+            agora = time.perf_counter()
+            if agora >= fim:
+                break
+            if proxima > agora:
+                time.sleep(proxima - agora)
+            else:
+                # Amostra mais lenta que o intervalo: não acumula atraso
+                proxima = agora
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+    finally:
+        _trava_perfil.release()
+
+
+def _perfilar_para_arquivo(segundos: float) -> None:
+    try:
+        resultado = perfilar(segundos)
+    except ProfilerOcupadoError:
+        logger.warning("SIGUSR2 ignorado: já existe um perfil em andamento")
+        return
+    os.makedirs(PROFILER_DIRETORIO, exist_ok=True)
+    caminho = os.path.join(PROFILER_DIRETORIO, f"perfil-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(resultado.texto())
+    logger.info("Perfil de %.1f s (%s amostras) gravado em %s", resultado.segundos, resultado.amostras, caminho)
+
+
+def _iniciar_perfil_do_sinal() -> None:
+    # Chamado pelo event loop (add_signal_handler), não dentro do tratador de sinal
+    logger.info("SIGUSR2 recebido: perfil de %.0f s", PROFILER_SINAL_SEGUNDOS)
+    threading.Thread(target=_perfilar_para_arquivo, args=(PROFILER_SINAL_SEGUNDOS,),
+                     name="profiler", daemon=True).start()
+
+
+def instalar_sinal_profiler() -> None:
+    """Liga o SIGUSR2 ao profiler (startup da aplicação, com o event loop rodando)"""
+    if not PROFILER or not hasattr(signal, "SIGUSR2"):
+        return
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, _iniciar_perfil_do_sinal)
+    except (RuntimeError, ValueError, NotImplementedError) as e:
+        # Loop fora da thread principal (ex: TestClient) ou plataforma sem sinais
+        logger.info("Sinal do profiler não instalado: %s", e)
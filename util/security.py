@@ -1,14 +1,57 @@
 """
 Módulo de segurança para gerenciar senhas e tokens
+
+O bcrypt leva de 100 a 300 ms por senha. Nas rotas assíncronas use
+criar_hash_senha_async e verificar_senha_async, que executam o bcrypt em
+um pool de threads próprio (o bcrypt libera o GIL, então as threads usam
+todos os núcleos) sem bloquear o event loop. O pool aceita no máximo
+SENHA_FILA_MAXIMA senhas pendentes; acima disso é lançada
+SenhaSobrecarregadaError, que a aplicação responde com 503 e Retry-After.
 """
+import asyncio
+import math
+import os
 import secrets
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Optional
 from passlib.context import CryptContext
 
 # Contexto para hash de senhas usando bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Pool de hashing de senhas
+SENHA_THREADS = int(os.getenv("SENHA_THREADS", str(os.cpu_count() or 1)))
+SENHA_FILA_MAXIMA = int(os.getenv("SENHA_FILA_MAXIMA", str(SENHA_THREADS * 8)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_trava = threading.Lock()
+_metricas = {
+    "pendentes": 0,
+    "concluidas": 0,
+    "rejeitadas": 0,
+    "tempo_total_segundos": 0.0,
+    "tempo_maximo_segundos": 0.0,
+    "espera_total_segundos": 0.0,
+}
+
+
+class SenhaSobrecarregadaError(Exception):
+    """
+    O pool de hashing de senhas está com a fila cheia
+
+    Attributes:
+        retry_after: Segundos estimados até a fila esvaziar
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Fila de verificação de senhas cheia (tente em {retry_after}s)")
+        self.retry_after = retry_after
+
 
 def criar_hash_senha(senha: str) -> str:
     """
@@ -40,6 +83,105 @@ def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
         return False
 
 
+def _obter_executor() -> ThreadPoolExecutor:
+    """Cria o pool de threads de senha no primeiro uso (ou após um shutdown)"""
+    global _executor
+    with _trava:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SENHA_THREADS, thread_name_prefix="senha")
+        return _executor
+
+
+def _tempo_medio() -> float:
+    """Tempo médio de um hash bcrypt já medido (0.2 s antes da primeira medição)"""
+    if not _metricas["concluidas"]:
+        return 0.2
+    return _metricas["tempo_total_segundos"] / _metricas["concluidas"]
+
+
+def _executar_medindo(funcao: Callable, enfileirada_em: float, *args) -> Any:
+    inicio = time.perf_counter()
+    try:
+        return funcao(*args)
+    finally:
+        fim = time.perf_counter()
+        with _trava:
+            _metricas["concluidas"] += 1
+            _metricas["tempo_total_segundos"] += fim - inicio
+            _metricas["tempo_maximo_segundos"] = max(_metricas["tempo_maximo_segundos"], fim - inicio)
+            _metricas["espera_total_segundos"] += inicio - enfileirada_em
+
+
+async def _executar_no_pool(funcao: Callable, *args) -> Any:
+    """
+    Executa uma função de senha no pool, recusando quando a fila está cheia
+
+    Raises:
+        SenhaSobrecarregadaError: Já há SENHA_FILA_MAXIMA senhas pendentes
+    """
+    with _trava:
+        pendentes = _metricas["pendentes"]
+        if pendentes >= SENHA_FILA_MAXIMA:
+            _metricas["rejeitadas"] += 1
+            # Tempo para o pool processar a fila atual, pelo tempo médio medido
+            retry_after = max(1, math.ceil(pendentes / SENHA_THREADS * _tempo_medio()))
+            raise SenhaSobrecarregadaError(retry_after)
+        _metricas["pendentes"] = pendentes + 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _obter_executor(), partial(_executar_medindo, funcao, time.perf_counter(), *args)
+        )
+    finally:
+        with _trava:
+            _metricas["pendentes"] -= 1
+
+
+async def criar_hash_senha_async(senha: str) -> str:
+    """
+    Versão de criar_hash_senha que roda no pool de senhas
+
+    Raises:
+        SenhaSobrecarregadaError: Fila do pool cheia
+    """
+    return await _executar_no_pool(criar_hash_senha, senha)
+
+
+async def verificar_senha_async(senha_plana: str, senha_hash: str) -> bool:
+    """
+    Versão de verificar_senha que roda no pool de senhas
+
+    Raises:
+        SenhaSobrecarregadaError: Fila do pool cheia
+    """
+    return await _executar_no_pool(verificar_senha, senha_plana, senha_hash)
+
+
+def obter_metricas_senha() -> dict:
+    """Retorna uma cópia das métricas do pool de senhas"""
+    with _trava:
+        metricas = dict(_metricas)
+    metricas["threads"] = SENHA_THREADS
+    metricas["fila_maxima"] = SENHA_FILA_MAXIMA
+    metricas["tempo_medio_segundos"] = (
+        metricas["tempo_total_segundos"] / metricas["concluidas"] if metricas["concluidas"] else 0.0
+    )
+    metricas["espera_media_segundos"] = (
+        metricas["espera_total_segundos"] / metricas["concluidas"] if metricas["concluidas"] else 0.0
+    )
+    return metricas
+
+
+def encerrar_executor_senha() -> None:
+    """Encerra o pool de senhas (usado no shutdown da aplicação)"""
+    global _executor
+    with _trava:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
 def gerar_token_redefinicao(tamanho: int = 32) -> str:
     """
     Gera um token aleatório seguro para redefinição de senha
@@ -1,52 +1,149 @@
+"""
+Ambiente Jinja2 único da aplicação
+
+Todas as rotas usam o mesmo objeto `templates`, então cada template é lido
+e compilado uma vez por processo, não uma vez por módulo de rotas. O código
+compilado também é gravado em disco (TEMPLATES_CACHE_DIR), e um processo
+novo carrega esse bytecode em vez de compilar tudo de novo.
+
+Configuração (.env):
+    TEMPLATES_CACHE_DIR      pasta do bytecode (vazio desativa)
+    TEMPLATES_AUTO_RELOAD    checa se o arquivo mudou a cada uso; padrão: DEBUG
+    TEMPLATES_PRECOMPILAR    compila todos os templates no startup
+
+Uso nas rotas:
+    from util.template_util import templates
+"""
+import logging
+import os
+import time
 from typing import List, Optional, Union
-from jinja2 import FileSystemLoader
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 from fastapi.templating import Jinja2Templates
 
+from util.asset_util import asset
+from util.auth_decorator import obter_usuario_logado
+from util.imagem_util import imagem
+from util.metricas_http import registrar_render
+
+
+logger = logging.getLogger(__name__)
+
+
+DIRETORIO_TEMPLATES = "templates"
+DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+TEMPLATES_CACHE_DIR = os.getenv("TEMPLATES_CACHE_DIR", ".cache/jinja")
+TEMPLATES_AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", str(DEBUG)).lower() == "true"
+TEMPLATES_PRECOMPILAR = os.getenv("TEMPLATES_PRECOMPILAR", "true").lower() == "true"
+
+_bytecode_cache: Optional[FileSystemBytecodeCache] = None
+
+
+def _obter_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    global _bytecode_cache
+    if _bytecode_cache is None and TEMPLATES_CACHE_DIR:
+        os.makedirs(TEMPLATES_CACHE_DIR, exist_ok=True)
+        _bytecode_cache = FileSystemBytecodeCache(TEMPLATES_CACHE_DIR)
+    return _bytecode_cache
+
+
+class TemplateMedido(Template):
+    """Template que soma o tempo de render() às métricas da requisição"""
+
+    def render(self, *args, **kwargs) -> str:
+        inicio = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            registrar_render(time.perf_counter() - inicio)
+
+
+def _criar_ambiente(diretorios: List[str]) -> Environment:
+    """Environment com bytecode em disco e os globais usados pelos templates"""
+    env = Environment(
+        loader=FileSystemLoader(diretorios),
+        autoescape=True,
+        bytecode_cache=_obter_bytecode_cache(),
+        auto_reload=TEMPLATES_AUTO_RELOAD,
+        # Sem limite: o conjunto de templates é fixo e todos ficam compilados na memória
+        cache_size=-1,
+    )
+    env.template_class = TemplateMedido
+    env.globals["imagem"] = imagem
+    env.globals["asset"] = asset
+    env.globals["usuario_logado"] = obter_usuario_logado
+    return env
+
 
 def criar_templates(diretorio_especifico: Optional[Union[str, List[str]]] = None) -> Jinja2Templates:
     """
     Cria um objeto Jinja2Templates configurado com múltiplos diretórios.
-    
+
     O diretório raiz "templates" é sempre incluído automaticamente para garantir
-    acesso aos templates base como base.html.
-    
+    acesso aos templates base como base.html. Sem diretórios específicos,
+    devolve o objeto compartilhado `templates`.
+
     Args:
         diretorio_especifico: Diretório(s) específico(s) além do raiz.
                              Pode ser uma string única ou lista de strings.
                              Exemplo: "templates/admin/categorias" ou
                                      ["templates/admin", "templates/public"]
-    
+
     Returns:
         Objeto Jinja2Templates configurado com os diretórios especificados
-    
+
     Exemplo de uso:
         # Para um diretório específico
         templates = criar_templates("templates/admin/categorias")
-        
+
         # Para múltiplos diretórios
         templates = criar_templates(["templates/admin", "templates/admin/produtos"])
-        
-        # Apenas com o diretório raiz
+
+        # Apenas com o diretório raiz (objeto compartilhado)
         templates = criar_templates()
     """
+    if not diretorio_especifico:
+        return templates
+
     # Sempre incluir o diretório raiz onde estão os templates base
-    diretorios = ["templates"]
-    
-    # Adicionar diretórios específicos se fornecidos
-    if diretorio_especifico:
-        if isinstance(diretorio_especifico, str):
-            # Se for uma string única, adiciona à lista
-            diretorios.append(diretorio_especifico)
-        elif isinstance(diretorio_especifico, list):
-            # Se for uma lista, estende a lista de diretórios
-            diretorios.extend(diretorio_especifico)
-    
-    # Criar o objeto Jinja2Templates com diretório base como "."
-    # Isso é necessário para que o FileSystemLoader funcione corretamente
-    templates = Jinja2Templates(directory=".")
-    
-    # Configurar o loader com múltiplos diretórios
+    diretorios = [DIRETORIO_TEMPLATES]
+
+    # Adicionar diretórios específicos
+    if isinstance(diretorio_especifico, str):
+        # Se for uma string única, adiciona à lista
+        diretorios.append(diretorio_especifico)
+    elif isinstance(diretorio_especifico, list):
+        # Se for uma lista, estende a lista de diretórios
+        diretorios.extend(diretorio_especifico)
+
     # O FileSystemLoader tentará encontrar templates em ordem nos diretórios listados
-    templates.env.loader = FileSystemLoader(diretorios)
-    
-    return templates
\ No newline at end of file
+    return Jinja2Templates(env=_criar_ambiente(diretorios))
+
+
+def precompilar_templates() -> int:
+    """
+    Compila todos os templates .html de uma vez (startup da aplicação)
+
+    Com o bytecode em disco de uma execução anterior, só carrega o código
+    já compilado. Desativado com TEMPLATES_PRECOMPILAR=false.
+
+    Returns:
+        Quantidade de templates carregados
+    """
+    if not TEMPLATES_PRECOMPILAR:
+        return 0
+    inicio = time.perf_counter()
+    env = templates.env
+    quantidade = 0
+    for nome in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(nome)
+            quantidade += 1
+        except Exception as e:
+            logger.warning("Template %s não compilou: %s", nome, e)
+    logger.info("%s templates pré-compilados em %.0f ms", quantidade, (time.perf_counter() - inicio) * 1000)
+    return quantidade
+
+
+templates = Jinja2Templates(env=_criar_ambiente([DIRETORIO_TEMPLATES]))